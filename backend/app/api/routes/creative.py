@@ -1,11 +1,18 @@
-from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from app.core.config import settings
 from app.models.types import (
     CreativeScoreRequest, CreativeScoreResponse,
+    CreativeScoreBatchRequest, CreativeScoreBatchResponse,
     CreativeSuggestionsRequest, CreativeSuggestionsResponse,
     Creative
 )
 from app.services.creative_service import CreativeService
+from app.services.creative_upload import UploadTooLarge, detect_format, iter_upload_rows, spool_upload
 from app.services.gemini_service import GeminiService
+from app.services.lexicon import creative_lexicon
 
 router = APIRouter()
 
@@ -22,7 +29,7 @@ async def score_creative(request: CreativeScoreRequest):
             channel=request.channel
         )
         
-        score = await CreativeService.score_creative(creative)
+        score = await CreativeService.score_creative(creative, full_precision=request.full_precision)
         
         return CreativeScoreResponse(
             success=True,
@@ -34,6 +41,68 @@ async def score_creative(request: CreativeScoreRequest):
             error=str(e)
         )
 
+@router.post("/score/batch", response_model=CreativeScoreBatchResponse)
+async def score_creative_batch(request: CreativeScoreBatchRequest):
+    """Score many creatives in one call; results come back in request order"""
+    if len(request.creatives) > settings.ML_CREATIVE_SCORE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large: {len(request.creatives)} items (max {settings.ML_CREATIVE_SCORE_BATCH_MAX_ITEMS})"
+        )
+    try:
+        results = [None] * len(request.creatives)
+        creatives, full_precision = {}, []
+        for i, item in enumerate(request.creatives):
+            try:
+                creative = Creative(
+                    id=f"batch-{i}",
+                    title=item.title,
+                    description=item.description,
+                    callToAction=item.cta,
+                    channel=item.channel
+                )
+                CreativeService.validate_creative(creative)
+                creatives[i] = creative
+                full_precision.append(item.full_precision)
+            except Exception as e:
+                results[i] = CreativeScoreResponse(success=False, error=str(e))
+
+        scores, stats = await CreativeService.score_creatives_batch(list(creatives.values()), full_precision)
+        for i, score in zip(creatives, scores):
+            results[i] = CreativeScoreResponse(success=True, score=score)
+
+        return CreativeScoreBatchResponse(success=True, results=results, stats=stats)
+    except Exception as e:
+        return CreativeScoreBatchResponse(
+            success=False,
+            error=str(e)
+        )
+
+@router.post("/score/upload")
+async def score_creative_upload(request: Request, fmt: Optional[str] = Query(None, alias="format")):
+    """Score a CSV or NDJSON upload (multipart `file` or raw body), streaming NDJSON results back batch by batch"""
+    try:
+        upload, content_type, filename = await spool_upload(request, settings.ML_CREATIVE_UPLOAD_MAX_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        upload_format = detect_format(content_type, fmt, filename)
+    except ValueError as e:
+        upload.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    rows = iter_upload_rows(upload, upload_format)
+    return StreamingResponse(
+        CreativeService.score_creatives_stream(
+            rows,
+            batch_size=settings.ML_CREATIVE_UPLOAD_BATCH_SIZE,
+            max_rows=settings.ML_CREATIVE_UPLOAD_MAX_ROWS
+        ),
+        media_type="application/x-ndjson"
+    )
+
 @router.get("/suggestions", response_model=CreativeSuggestionsResponse)
 async def generate_suggestions(
     channel: str,
@@ -118,8 +187,7 @@ def generate_professional_analysis(title: str, description: str, cta: str, chann
 
     # Generate analysis scores
     clarity_score = min(95, max(70, title_len * 2 + desc_len * 0.5 + 60))
-    engagement_score = min(94, max(68, len([w for w in (title + " " + description).lower().split()
-                                           if w in ["free", "save", "new", "best", "exclusive"]]) * 15 + 70))
+    engagement_score = min(94, max(68, creative_lexicon.scan(f"{title} {description}").occurrences("engagement") * 15 + 70))
     persuasiveness_score = min(93, max(65, cta_len * 3 + 70))
 
     overall_score = round((clarity_score + engagement_score + persuasiveness_score) / 3)
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from app.core.auth_middleware import require_ml_admin
+from app.core.config import settings
 from app.models.types import (
     MLCampaignOptimizationRequest, MLCampaignOptimizationResponse,
-    MLCreativeScoreRequest, MLCreativeScoreResponse
+    MLCampaignOptimizationBatchRequest, MLCampaignOptimizationBatchResponse,
+    MLBudgetCurveRequest, MLBudgetCurveResponse,
+    MLCreativeScoreRequest, MLCreativeScoreResponse,
+    MLCreativeScoreBatchRequest, MLCreativeScoreBatchResponse,
+    MLModelReloadRequest, MLModelRollbackRequest
+)
+from app.services.ml_service import (
+    MLService, model_registry, reload_ml_models, rollback_ml_model, schedule_background
 )
-from app.services.ml_service import MLService
 
 router = APIRouter()
 
@@ -13,6 +21,33 @@ async def optimize_campaign(request: MLCampaignOptimizationRequest):
     try:
         result = await MLService.optimize_campaign_budget(request)
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/campaign/optimize/batch", response_model=MLCampaignOptimizationBatchResponse)
+async def optimize_campaign_batch(request: MLCampaignOptimizationBatchRequest):
+    """Optimize many campaign configurations in one batched prediction pass"""
+    if len(request.requests) > settings.ML_OPTIMIZER_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large: {len(request.requests)} items (max {settings.ML_OPTIMIZER_BATCH_MAX_ITEMS})"
+        )
+    try:
+        result = await MLService.optimize_campaign_budget_batch(request.requests)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/campaign/optimize/curve", response_model=MLBudgetCurveResponse)
+async def budget_response_curve(request: MLBudgetCurveRequest):
+    """Predicted revenue/ROI curve across a budget range, with the best split per level"""
+    try:
+        result = await MLService.budget_response_curve(request)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -25,6 +60,20 @@ async def score_creative(request: MLCreativeScoreRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/creative/score/batch", response_model=MLCreativeScoreBatchResponse)
+async def score_creative_batch(request: MLCreativeScoreBatchRequest):
+    """Score many creatives with length-sorted padded model batches, results in request order"""
+    if len(request.creatives) > settings.ML_CREATIVE_SCORE_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch too large: {len(request.creatives)} items (max {settings.ML_CREATIVE_SCORE_BATCH_MAX_ITEMS})"
+        )
+    try:
+        result = await MLService.score_creative_batch(request.creatives)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/health")
 async def ml_health_check():
     """Check ML service health"""
@@ -32,4 +81,28 @@ async def ml_health_check():
     return {
         "status": "healthy" if health_status["models_loaded"] else "degraded",
         "models": health_status
-    }
\ No newline at end of file
+    }
+
+@router.get("/admin/models", dependencies=[Depends(require_ml_admin)])
+async def list_models():
+    """Active version, rollback candidates and load state of each model"""
+    return model_registry.status()
+
+@router.post("/admin/models/reload", dependencies=[Depends(require_ml_admin)])
+async def reload_models(request: MLModelReloadRequest):
+    """Load new model versions from disk, warm them up and swap them in without downtime"""
+    if not request.wait:
+        schedule_background(reload_ml_models(request.target))
+        return {"status": "loading", "target": request.target}
+
+    results = await reload_ml_models(request.target)
+    return {"results": results, "models": model_registry.status()}
+
+@router.post("/admin/models/rollback", dependencies=[Depends(require_ml_admin)])
+async def rollback_model(request: MLModelRollbackRequest):
+    """Re-activate the previous version of a model"""
+    try:
+        result = rollback_ml_model(request.target)
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"result": result, "models": model_registry.status()}
@@ -1,9 +1,11 @@
 """
 Authentication middleware and dependencies
 """
-from fastapi import Depends, HTTPException, status
+import hmac
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional, Dict, Any
+from app.core.config import settings
 from app.services.auth_service import auth_service
 
 security = HTTPBearer(auto_error=False)
@@ -40,4 +42,18 @@ async def require_auth(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return user
\ No newline at end of file
+    return user
+
+async def require_ml_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Require the ML admin token; admin endpoints are disabled while ML_ADMIN_TOKEN is unset"""
+    if not settings.ML_ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="ML admin endpoints are disabled (ML_ADMIN_TOKEN is not set)",
+        )
+
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ML_ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin token",
+        )
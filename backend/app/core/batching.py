@@ -0,0 +1,140 @@
+import time
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Upper edges of the batch-size histogram buckets reported in stats()
+_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+class MicroBatcher:
+    """Collects concurrent single-item calls into batches for one model call.
+
+    `submit(item)` parks the caller until its item has been processed. A batch
+    is dispatched as soon as `max_batch_size` items are waiting, or
+    `max_wait_ms` after the first of them arrived. At most `max_concurrency`
+    batches run at once; items that arrive while every slot is busy are
+    dispatched together when a slot frees up, so batches grow with load
+    instead of queueing one item at a time.
+
+    `process_batch(items)` is awaited with the list of items and must return
+    one result per item, in order. If it raises for a batch of several items,
+    each item is retried on its own so one bad item only fails its own caller.
+    All bookkeeping happens on the event loop thread.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = 16, max_wait_ms: float = 5.0, max_concurrency: int = 1):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._in_flight = 0
+
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+        self.failed_items = 0
+        self.max_observed_batch = 0
+        self.size_histogram = {bucket: 0 for bucket in _SIZE_BUCKETS}
+        self.size_histogram["more"] = 0
+        self._total_queue_wait = 0.0
+        self._total_batch_seconds = 0.0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # A new event loop (e.g. app restart in tests): nothing pending belongs to it
+            self._loop, self._pending, self._timer, self._in_flight = loop, [], None, 0
+
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._on_timer)
+        return await future
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending and self._in_flight < self.max_concurrency:
+            batch = self._pending[:self.max_batch_size]
+            del self._pending[:self.max_batch_size]
+            self._in_flight += 1
+            self._loop.create_task(self._run(batch))
+
+    async def _run(self, batch: List[tuple]) -> None:
+        start = time.perf_counter()
+        live = [entry for entry in batch if not entry[1].cancelled()]
+        try:
+            if live:
+                results = await self.process_batch([item for item, _, _ in live])
+                for (_, future, _), result in zip(live, results):
+                    if not future.done():
+                        future.set_result(result)
+        except Exception as e:
+            self.failed_batches += 1
+            if len(live) == 1:
+                self.failed_items += 1
+                if not live[0][1].done():
+                    live[0][1].set_exception(e)
+            else:
+                await self._run_singly(live)
+        finally:
+            self._in_flight -= 1
+            self._record(live, start)
+            if self._pending:
+                self._dispatch()
+
+    async def _run_singly(self, batch: List[tuple]) -> None:
+        for item, future, _ in batch:
+            if future.done():
+                continue
+            try:
+                result = (await self.process_batch([item]))[0]
+            except Exception as e:
+                self.failed_items += 1
+                if not future.done():
+                    future.set_exception(e)
+            else:
+                if not future.done():
+                    future.set_result(result)
+
+    def _record(self, batch: List[tuple], start: float) -> None:
+        size = len(batch)
+        if not size:
+            return
+        self.batches += 1
+        self.items += size
+        self.max_observed_batch = max(self.max_observed_batch, size)
+        bucket = next((edge for edge in _SIZE_BUCKETS if size <= edge), "more")
+        self.size_histogram[bucket] += 1
+        self._total_queue_wait += sum(start - queued_at for _, _, queued_at in batch)
+        self._total_batch_seconds += time.perf_counter() - start
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "max_concurrency": self.max_concurrency,
+            "batches": self.batches,
+            "items": self.items,
+            "failed_batches": self.failed_batches,
+            "failed_items": self.failed_items,
+            "mean_batch_size": round(self.items / self.batches, 3) if self.batches else 0.0,
+            "max_observed_batch_size": self.max_observed_batch,
+            "batch_size_histogram": {str(bucket): count for bucket, count in self.size_histogram.items()},
+            "mean_queue_wait_ms": round(self._total_queue_wait / self.items * 1000, 3) if self.items else 0.0,
+            "mean_batch_ms": round(self._total_batch_seconds / self.batches * 1000, 3) if self.batches else 0.0,
+            "pending": len(self._pending),
+            "in_flight": self._in_flight,
+        }
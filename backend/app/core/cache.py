@@ -0,0 +1,122 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class TTLCache:
+    """Bounded, thread-safe LRU cache with optional per-entry time-to-live.
+
+    A `maxsize` of 0 disables the cache (every lookup is a miss and nothing is
+    stored). Counters are kept so hit rates can be surfaced on health endpoints.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: Optional[float] = None):
+        self.maxsize = max(0, int(maxsize))
+        self.ttl_seconds = ttl_seconds if ttl_seconds and ttl_seconds > 0 else None
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value for `key`, or None on a miss"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store `value`, evicting the least recently used entries if full"""
+        if not self.enabled:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry (counted as one invalidation)"""
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def items(self):
+        """Snapshot of live (key, value) pairs, oldest first"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value) for key, (value, expires_at) in self._data.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def snapshot(self):
+        """Live entries as (key, value, remaining_ttl_seconds or None), oldest first, for persistence"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value, expires_at - now if expires_at is not None else None)
+                for key, (value, expires_at) in self._data.items()
+                if expires_at is None or expires_at > now
+            ]
+
+    def restore(self, entries) -> int:
+        """Re-insert (key, value, remaining_ttl_seconds) entries from snapshot(); returns how many were kept"""
+        if not self.enabled:
+            return 0
+        now = time.monotonic()
+        restored = 0
+        with self._lock:
+            for key, value, remaining in entries:
+                if remaining is not None and remaining <= 0:
+                    continue
+                if self.ttl_seconds:
+                    remaining = min(remaining, self.ttl_seconds) if remaining is not None else self.ttl_seconds
+                self._data[key] = (value, now + remaining if remaining is not None else None)
+                self._data.move_to_end(key)
+                restored += 1
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+        return restored
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -20,6 +20,101 @@ class Settings(BaseSettings):
     
     # ML Models
     MODEL_PATH: str = os.getenv("MODEL_PATH", "./models")
+
+    # Campaign model predict engine: "native" (sklearn wrapper), "booster" (raw LightGBM
+    # Booster.predict, the fastest) or "numpy" (compiled tree arrays, validated bit-for-bit
+    # at load). "numpy" is not a speed option: it is 2-4x slower than "booster" from 1 to
+    # 4000 rows (see benchmark_tree_engine.py) and exists for per-tree outputs and checks
+    ML_TREE_ENGINE: str = os.getenv("ML_TREE_ENGINE", "native")
+
+    # Campaign optimizer search
+    ML_OPTIMIZER_CANDIDATES: int = int(os.getenv("ML_OPTIMIZER_CANDIDATES", "500"))
+    ML_ADAPTIVE_SAMPLES_PER_ROUND: int = int(os.getenv("ML_ADAPTIVE_SAMPLES_PER_ROUND", "48"))
+    ML_ADAPTIVE_MAX_ROUNDS: int = int(os.getenv("ML_ADAPTIVE_MAX_ROUNDS", "6"))
+    ML_ADAPTIVE_ELITE_FRACTION: float = float(os.getenv("ML_ADAPTIVE_ELITE_FRACTION", "0.2"))
+    ML_ADAPTIVE_PATIENCE: int = int(os.getenv("ML_ADAPTIVE_PATIENCE", "2"))
+    ML_ADAPTIVE_TOLERANCE: float = float(os.getenv("ML_ADAPTIVE_TOLERANCE", "0.0005"))
+    ML_ADAPTIVE_MAX_CONCENTRATION: float = float(os.getenv("ML_ADAPTIVE_MAX_CONCENTRATION", "400"))
+    ML_OPTIMIZER_BATCH_MAX_ITEMS: int = int(os.getenv("ML_OPTIMIZER_BATCH_MAX_ITEMS", "200"))
+    # Revenue interval from the spread of the last trees' staged predictions
+    ML_CONFIDENCE_Z: float = float(os.getenv("ML_CONFIDENCE_Z", "1.96"))
+    ML_CONFIDENCE_TAIL_FRACTION: float = float(os.getenv("ML_CONFIDENCE_TAIL_FRACTION", "0.5"))
+
+    # Inference executors (tree = LightGBM optimizer, transformer = DistilBERT / embedder)
+    ML_TREE_WORKERS: int = int(os.getenv("ML_TREE_WORKERS", "2"))
+    ML_TRANSFORMER_WORKERS: int = int(os.getenv("ML_TRANSFORMER_WORKERS", "1"))
+    ML_TORCH_THREADS: int = int(os.getenv("ML_TORCH_THREADS", "0"))  # 0 keeps torch's default
+
+    # DistilBERT inference backend: torch (fp32), torch-int8 (dynamic quantization) or onnx
+    ML_CREATIVE_BACKEND: str = os.getenv("ML_CREATIVE_BACKEND", "torch")
+    # Largest allowed gap to fp32 on the 3-8 expected score before falling back to fp32
+    ML_CREATIVE_AGREEMENT_TOLERANCE: float = float(os.getenv("ML_CREATIVE_AGREEMENT_TOLERANCE", "0.05"))
+    ML_CREATIVE_ONNX_PATH: str = os.getenv("ML_CREATIVE_ONNX_PATH", "")  # default: model.onnx next to the weights
+    # Batch creative scoring endpoints: items per call, creatives per padded forward pass
+    ML_CREATIVE_SCORE_BATCH_MAX_ITEMS: int = int(os.getenv("ML_CREATIVE_SCORE_BATCH_MAX_ITEMS", "500"))
+    ML_CREATIVE_SCORE_BATCH_CHUNK: int = int(os.getenv("ML_CREATIVE_SCORE_BATCH_CHUNK", "32"))
+    # Streaming CSV / NDJSON upload scoring: rows per scored batch, rows and bytes per upload
+    # (a larger upload is rejected with 413)
+    ML_CREATIVE_UPLOAD_BATCH_SIZE: int = int(os.getenv("ML_CREATIVE_UPLOAD_BATCH_SIZE", "64"))
+    ML_CREATIVE_UPLOAD_MAX_ROWS: int = int(os.getenv("ML_CREATIVE_UPLOAD_MAX_ROWS", "100000"))
+    ML_CREATIVE_UPLOAD_MAX_BYTES: int = int(os.getenv("ML_CREATIVE_UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+    # Precomputed reference-phrase embeddings (memory-mapped .npy files) and optional
+    # per-channel / per-category banks: {"channels": {...}, "categories": {...}}
+    ML_PHRASE_BANK_DIR: str = os.getenv("ML_PHRASE_BANK_DIR", "./models/phrase_banks")
+    ML_PHRASE_BANK_FILE: str = os.getenv("ML_PHRASE_BANK_FILE", "")
+    # DistilBERT tokenization: ad copy rarely needs more than 128 tokens. Batched paths
+    # sort by token length and split at these bucket edges before padding
+    ML_CREATIVE_MAX_LENGTH: int = int(os.getenv("ML_CREATIVE_MAX_LENGTH", "128"))
+    ML_CREATIVE_LENGTH_BUCKETS: str = os.getenv("ML_CREATIVE_LENGTH_BUCKETS", "16,32,64")
+    # Micro-batching of concurrent creative scoring requests (max size 1 disables batching)
+    ML_CREATIVE_BATCH_MAX_SIZE: int = int(os.getenv("ML_CREATIVE_BATCH_MAX_SIZE", "16"))
+    ML_CREATIVE_BATCH_MAX_WAIT_MS: float = float(os.getenv("ML_CREATIVE_BATCH_MAX_WAIT_MS", "5"))
+
+    # Creative score cache keyed on normalized text + model version (size 0 disables it);
+    # with a path set, entries are saved on shutdown and restored on startup
+    ML_CREATIVE_CACHE_SIZE: int = int(os.getenv("ML_CREATIVE_CACHE_SIZE", "4096"))
+    ML_CREATIVE_CACHE_TTL_SECONDS: float = float(os.getenv("ML_CREATIVE_CACHE_TTL_SECONDS", "86400"))
+    ML_CREATIVE_CACHE_PATH: str = os.getenv("ML_CREATIVE_CACHE_PATH", "")
+    # Stage cache behind it: the DistilBERT score + text embedding per combined text
+    ML_CREATIVE_SIGNAL_CACHE_SIZE: int = int(os.getenv("ML_CREATIVE_SIGNAL_CACHE_SIZE", "4096"))
+    # Near-duplicate reuse: creatives whose SimHash is within this many bits (of 64) of
+    # an already scored one reuse its model signals, marked approximate. The default only
+    # catches case / punctuation / emoji variants; a changed word is ~10 bits. -1 disables it.
+    ML_CREATIVE_NEAR_DUP_MAX_DISTANCE: int = int(os.getenv("ML_CREATIVE_NEAR_DUP_MAX_DISTANCE", "3"))
+    ML_CREATIVE_NEAR_DUP_SIZE: int = int(os.getenv("ML_CREATIVE_NEAR_DUP_SIZE", "10000"))
+    # Persisting the index across restarts is opt-in: set a file path to enable it
+    ML_CREATIVE_NEAR_DUP_PATH: str = os.getenv("ML_CREATIVE_NEAR_DUP_PATH", "")
+    # Cascade scoring: the rule-based scorer answers first and DistilBERT only runs when its
+    # final score (1-10) falls inside [LOW, HIGH] or the request sets full_precision
+    ML_CREATIVE_CASCADE: bool = os.getenv("ML_CREATIVE_CASCADE", "false").lower() == "true"
+    ML_CREATIVE_CASCADE_LOW: float = float(os.getenv("ML_CREATIVE_CASCADE_LOW", "5.0"))
+    ML_CREATIVE_CASCADE_HIGH: float = float(os.getenv("ML_CREATIVE_CASCADE_HIGH", "7.5"))
+
+    # Optimizer result cache (size 0 disables it)
+    ML_OPTIMIZER_CACHE_SIZE: int = int(os.getenv("ML_OPTIMIZER_CACHE_SIZE", "1024"))
+    ML_OPTIMIZER_CACHE_TTL_SECONDS: float = float(os.getenv("ML_OPTIMIZER_CACHE_TTL_SECONDS", "3600"))
+    # Budgets share an entry within log-spaced buckets of this relative width; a hit for
+    # another budget in the bucket is rescaled linearly and marked approximate
+    ML_OPTIMIZER_CACHE_BUDGET_BUCKET: float = float(os.getenv("ML_OPTIMIZER_CACHE_BUDGET_BUCKET", "0.005"))
+    ML_OPTIMIZER_CACHE_AOV_STEP: float = float(os.getenv("ML_OPTIMIZER_CACHE_AOV_STEP", "1"))
+    ML_OPTIMIZER_CACHE_AGE_STEP: float = float(os.getenv("ML_OPTIMIZER_CACHE_AGE_STEP", "1"))
+
+    # Load models in the background so the server accepts traffic (with fallbacks) right away
+    ML_BACKGROUND_LOADING: bool = os.getenv("ML_BACKGROUND_LOADING", "true").lower() == "true"
+
+    # Model registry: previous versions kept for rollback, and opt-in hot reload when
+    # the campaign model file changes on disk (checked at most every N seconds)
+    ML_MODEL_HISTORY_SIZE: int = int(os.getenv("ML_MODEL_HISTORY_SIZE", "1"))
+    ML_MODEL_AUTO_RELOAD: bool = os.getenv("ML_MODEL_AUTO_RELOAD", "false").lower() == "true"
+    ML_MODEL_FILE_CHECK_SECONDS: float = float(os.getenv("ML_MODEL_FILE_CHECK_SECONDS", "5"))
+    ML_ADMIN_TOKEN: str = os.getenv("ML_ADMIN_TOKEN", "")
+
+    # Warm-started re-optimization around a campaign's previous split
+    ML_WARM_START_CANDIDATES: int = int(os.getenv("ML_WARM_START_CANDIDATES", "64"))
+    ML_WARM_START_CONCENTRATION: float = float(os.getenv("ML_WARM_START_CONCENTRATION", "200"))
+    ML_WARM_START_MAX_DRIFT: float = float(os.getenv("ML_WARM_START_MAX_DRIFT", "0.25"))
+    ML_WARM_START_CACHE_SIZE: int = int(os.getenv("ML_WARM_START_CACHE_SIZE", "4096"))
+    ML_WARM_START_TTL_SECONDS: float = float(os.getenv("ML_WARM_START_TTL_SECONDS", "86400"))
     
     # Environment
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
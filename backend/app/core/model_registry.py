@@ -0,0 +1,111 @@
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+
+class ModelRegistry:
+    """Active model version per model name, with a short history for rollback.
+
+    A "bundle" is any object with a `version` attribute and a `describe()`
+    method. Activation swaps a single reference under a lock, so requests that
+    already picked up the previous bundle finish on it while new requests get
+    the new one. Load state (in progress, last error, duration) is tracked per
+    name so reloads of the same model cannot overlap and health checks can
+    report where each model is.
+    """
+
+    def __init__(self, history_size: int = 1):
+        self.history_size = max(0, int(history_size))
+        self._lock = threading.Lock()
+        self._active: Dict[str, Any] = {}
+        self._history: Dict[str, List[Any]] = {}
+        self._loading: Dict[str, float] = {}
+        self._last_error: Dict[str, Optional[str]] = {}
+        self._last_load_seconds: Dict[str, float] = {}
+        self._unavailable: Dict[str, str] = {}
+        self._activated_at: Dict[str, float] = {}
+
+    def active(self, name: str) -> Optional[Any]:
+        """The bundle currently serving `name`, or None"""
+        return self._active.get(name)
+
+    def activate(self, name: str, bundle: Any) -> Optional[Any]:
+        """Make `bundle` the active version; the previous one is kept for rollback"""
+        with self._lock:
+            previous = self._active.get(name)
+            if previous is not None and self.history_size:
+                history = self._history.setdefault(name, [])
+                history.append(previous)
+                del history[:-self.history_size]
+            self._active[name] = bundle
+            self._activated_at[name] = time.time()
+            self._last_error[name] = None
+            return previous
+
+    def rollback(self, name: str) -> Any:
+        """Re-activate the previous version. Raises LookupError if there is none."""
+        with self._lock:
+            history = self._history.get(name)
+            if not history:
+                raise LookupError(f"No previous version of '{name}' to roll back to")
+            self._active[name] = history.pop()
+            self._activated_at[name] = time.time()
+            return self._active[name]
+
+    def begin_load(self, name: str) -> bool:
+        """Mark `name` as loading; False if a load is already in progress"""
+        with self._lock:
+            if name in self._loading:
+                return False
+            self._loading[name] = time.monotonic()
+            return True
+
+    def end_load(self, name: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            started = self._loading.pop(name, None)
+            if started is not None:
+                self._last_load_seconds[name] = round(time.monotonic() - started, 3)
+            if error is not None:
+                self._last_error[name] = error
+
+    def mark_unavailable(self, name: str, reason: str) -> None:
+        """Record that `name` cannot be loaded in this deployment (e.g. missing dependencies)"""
+        with self._lock:
+            self._unavailable[name] = reason
+
+    def state(self, name: str) -> str:
+        """One of ready, loading, failed, unavailable or not_loaded"""
+        if name in self._active:
+            return "ready"
+        if name in self._loading:
+            return "loading"
+        if name in self._unavailable:
+            return "unavailable"
+        if self._last_error.get(name):
+            return "failed"
+        return "not_loaded"
+
+    def settled(self) -> bool:
+        """True when no model is loading"""
+        return not self._loading
+
+    def names(self) -> List[str]:
+        return sorted(set(self._active) | set(self._loading) | set(self._last_error) | set(self._unavailable))
+
+    def status(self) -> Dict[str, Any]:
+        """Per-model state, active version, rollback candidates and load timings"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "state": self.state(name),
+                    "active": self._active[name].describe() if name in self._active else None,
+                    "activated_at": self._activated_at.get(name),
+                    "previous_versions": [bundle.version for bundle in self._history.get(name, [])],
+                    "loading": name in self._loading,
+                    "loading_for_seconds": round(now - self._loading[name], 3) if name in self._loading else None,
+                    "last_load_seconds": self._last_load_seconds.get(name),
+                    "last_error": self._last_error.get(name) or self._unavailable.get(name),
+                }
+                for name in self.names()
+            }
@@ -0,0 +1,149 @@
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+HASH_BITS = 64
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of a text's word tokens and adjacent-word pairs.
+
+    Case, punctuation and emoji are dropped by the tokenizer, so variants that
+    differ only in those hash identically; changing one word flips a few bits.
+    """
+    tokens = _TOKEN_RE.findall(text.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "little") for f in features],
+        dtype=np.uint64
+    )
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 > len(features)
+    return int(np.packbits(votes, bitorder="little").view(np.uint64)[0])
+
+
+class NearDuplicateIndex:
+    """Bounded LRU index of values keyed by SimHash, answering "anything within k bits?".
+
+    Hashes are split into `max_distance + 1` bands; two hashes within
+    `max_distance` bits agree exactly on at least one band, so a lookup only
+    compares against entries sharing a band (same scope) instead of every
+    entry. Entries only match inside their scope (e.g. channel and model
+    version). A `max_distance` below 0 or a `maxsize` of 0 disables the index.
+    """
+
+    def __init__(self, max_distance: int = 3, maxsize: int = 10000):
+        self.max_distance = int(max_distance)
+        self.maxsize = max(0, int(maxsize))
+        self._bands = self._band_slices(self.max_distance)
+        self._entries: "OrderedDict[Tuple[Hashable, int], Any]" = OrderedDict()
+        self._buckets: Dict[tuple, set] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.distance_histogram = {d: 0 for d in range(max(0, self.max_distance) + 1)}
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0 and self.max_distance >= 0
+
+    @staticmethod
+    def _band_slices(max_distance: int) -> List[Tuple[int, int]]:
+        count = min(HASH_BITS, max(1, max_distance + 1))
+        edges = [round(i * HASH_BITS / count) for i in range(count + 1)]
+        return [(start, (1 << (end - start)) - 1) for start, end in zip(edges, edges[1:])]
+
+    def _band_keys(self, scope: Hashable, fingerprint: int) -> List[tuple]:
+        return [(scope, i, (fingerprint >> start) & mask) for i, (start, mask) in enumerate(self._bands)]
+
+    def get(self, scope: Hashable, fingerprint: int) -> Optional[Tuple[Any, int]]:
+        """Closest stored (value, distance) within max_distance bits in `scope`, or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            best = None
+            for band_key in self._band_keys(scope, fingerprint):
+                for candidate in self._buckets.get(band_key, ()):
+                    distance = bin(candidate ^ fingerprint).count("1")
+                    if distance <= self.max_distance and (best is None or distance < best[1]):
+                        best = (candidate, distance)
+            if best is None:
+                self.misses += 1
+                return None
+
+            key = (scope, best[0])
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.distance_histogram[best[1]] += 1
+            return self._entries[key], best[1]
+
+    def set(self, scope: Hashable, fingerprint: int, value: Any) -> None:
+        """Store `value` under `fingerprint`, evicting the least recently used entries if full"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._insert(scope, fingerprint, value)
+
+    def _insert(self, scope: Hashable, fingerprint: int, value: Any) -> None:
+        key = (scope, fingerprint)
+        if key not in self._entries:
+            for band_key in self._band_keys(scope, fingerprint):
+                self._buckets.setdefault(band_key, set()).add(fingerprint)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            (old_scope, old_fingerprint), _ = self._entries.popitem(last=False)
+            for band_key in self._band_keys(old_scope, old_fingerprint):
+                bucket = self._buckets.get(band_key)
+                if bucket is not None:
+                    bucket.discard(old_fingerprint)
+                    if not bucket:
+                        del self._buckets[band_key]
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def snapshot(self) -> List[Tuple[Hashable, int, Any]]:
+        """(scope, fingerprint, value) for every entry, oldest first, for persistence"""
+        with self._lock:
+            return [(scope, fingerprint, value) for (scope, fingerprint), value in self._entries.items()]
+
+    def restore(self, entries: Iterable[Tuple[Hashable, int, Any]]) -> int:
+        """Re-insert entries from snapshot(); returns how many were read"""
+        if not self.enabled:
+            return 0
+        restored = 0
+        with self._lock:
+            for scope, fingerprint, value in entries:
+                self._insert(scope, int(fingerprint), value)
+                restored += 1
+        return restored
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "max_distance": self.max_distance,
+            "bands": len(self._bands),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "hit_distance_histogram": {str(d): count for d, count in self.distance_histogram.items()},
+        }
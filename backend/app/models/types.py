@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Dict, List, Optional, Union, Literal
+from typing import Any, Dict, List, Optional, Union, Literal
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -94,6 +94,7 @@ class CreativeScore(BaseModel):
     overall: float
     breakdown: CreativeBreakdown
     suggestions: List[str]
+    approximate: bool = False
 
 class Creative(BaseModel):
     id: str
@@ -188,12 +189,22 @@ class CreativeScoreRequest(BaseModel):
     title: str
     description: str
     cta: str
+    full_precision: bool = False  # always run the models, even in cascade mode
 
 class CreativeScoreResponse(BaseModel):
     success: bool
     score: Optional[CreativeScore] = None
     error: Optional[str] = None
 
+class CreativeScoreBatchRequest(BaseModel):
+    creatives: List[CreativeScoreRequest]
+
+class CreativeScoreBatchResponse(BaseModel):
+    success: bool
+    results: List[CreativeScoreResponse] = []
+    stats: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
 class CreativeSuggestionsRequest(BaseModel):
     channel: str
     product_name: str
@@ -205,6 +216,11 @@ class CreativeSuggestionsResponse(BaseModel):
     error: Optional[str] = None
 
 # ML Service Models
+class MLWarmStart(BaseModel):
+    recommended_split: Dict[str, float]
+    # The request fields the split was optimized for; drift is measured against them
+    inputs: Optional[Dict[str, Any]] = None
+
 class MLCampaignOptimizationRequest(BaseModel):
     total_budget: float
     aov: float
@@ -214,22 +230,125 @@ class MLCampaignOptimizationRequest(BaseModel):
     creative_quality: float
     campaign_days: int
     target_margin: float
+    # "sweep" scores one fixed candidate set; "adaptive" runs a cross-entropy search
+    optimizer: Literal["sweep", "adaptive"] = "sweep"
+    samples_per_round: Optional[int] = Field(None, ge=8, le=5000)
+    max_rounds: Optional[int] = Field(None, ge=1, le=50)
+    # "sobol" uses scrambled low-discrepancy points instead of i.i.d. Dirichlet draws
+    sampler: Literal["dirichlet", "sobol"] = "dirichlet"
+    seed: int = 42
+    # Channel constraints: excluded channels get no spend, min/max are absolute amounts
+    excluded_channels: List[str] = []
+    channel_min: Dict[str, float] = {}
+    channel_max: Dict[str, float] = {}
+    # Warm start: search locally around a previous result instead of from scratch
+    campaign_id: Optional[str] = None
+    warm_start: Optional[MLWarmStart] = None
 
 class MLCampaignOptimizationResponse(BaseModel):
     recommended_split: Dict[str, float]
     predicted_revenue: float
+    predicted_revenue_lower: Optional[float] = None
+    predicted_revenue_upper: Optional[float] = None
     predicted_roi: float
     confidence_score: float
     warning: Optional[str] = None
+    search_stats: Optional[Dict[str, Any]] = None
+    model_version: Optional[str] = None
+    # True when rescaled from a cached result for a nearby budget
+    approximate: bool = False
+
+    class Config:
+        protected_namespaces = ()
+
+class MLCampaignOptimizationBatchRequest(BaseModel):
+    # Items that fail validation stay as dicts and are reported per item
+    requests: List[Union[MLCampaignOptimizationRequest, Dict[str, Any]]]
+
+class MLCampaignBatchItemResult(BaseModel):
+    index: int
+    success: bool
+    result: Optional[MLCampaignOptimizationResponse] = None
+    error: Optional[str] = None
+
+class MLCampaignOptimizationBatchResponse(BaseModel):
+    results: List[MLCampaignBatchItemResult]
+    rows_evaluated: int
+
+class MLBudgetCurveRequest(BaseModel):
+    min_budget: float = Field(..., gt=0)
+    max_budget: float = Field(..., gt=0)
+    levels: int = Field(20, ge=2, le=100)
+    spacing: Literal["linear", "log"] = "linear"
+    aov: float
+    age: int
+    gender: str
+    income_level: str
+    creative_quality: float
+    campaign_days: int
+    target_margin: float
+    samples_per_level: Optional[int] = Field(None, ge=8, le=5000)
+    sampler: Literal["dirichlet", "sobol"] = "dirichlet"
+    seed: int = 42
+    excluded_channels: List[str] = []
+
+class MLBudgetCurvePoint(BaseModel):
+    total_budget: float
+    recommended_split: Dict[str, float]
+    predicted_revenue: float
+    predicted_roi: float
+    # Extra revenue per extra dollar vs. the previous level, minus the dollar spent
+    marginal_roi: Optional[float] = None
+
+class MLBudgetCurveResponse(BaseModel):
+    points: List[MLBudgetCurvePoint]
+    rows_evaluated: int
+    fallback: bool = False
+    model_version: Optional[str] = None
+
+    class Config:
+        protected_namespaces = ()
+
+class MLModelReloadRequest(BaseModel):
+    target: Literal["all", "campaign", "creative"] = "all"
+    # False returns right away and finishes loading in the background
+    wait: bool = True
+
+class MLModelRollbackRequest(BaseModel):
+    target: Literal["campaign", "creative"]
 
 class MLCreativeScoreRequest(BaseModel):
     channel: str
     title: str
     description: str
     cta: str
+    category: Optional[str] = None  # selects a per-category phrase bank when one is defined
+    full_precision: bool = False  # always run the models, even in cascade mode
 
 class MLCreativeScoreResponse(BaseModel):
     channel: str
     scores: Dict[str, float]
     feedback: List[str]
-    improvements: Dict[str, List[str]]
\ No newline at end of file
+    improvements: Dict[str, List[str]]
+    model_version: Optional[str] = None
+    scorer: Optional[str] = None  # "model" or "rules"
+    # True when the score was reused from a near-duplicate creative instead of computed
+    approximate: bool = False
+    near_duplicate_distance: Optional[int] = None
+
+    class Config:
+        protected_namespaces = ()
+
+class MLCreativeScoreBatchRequest(BaseModel):
+    # Items that fail validation stay as dicts and are reported per item
+    creatives: List[Union[MLCreativeScoreRequest, Dict[str, Any]]]
+
+class MLCreativeBatchItemResult(BaseModel):
+    index: int
+    success: bool
+    result: Optional[MLCreativeScoreResponse] = None
+    error: Optional[str] = None
+
+class MLCreativeScoreBatchResponse(BaseModel):
+    results: List[MLCreativeBatchItemResult]
+    stats: Dict[str, Any]
\ No newline at end of file
@@ -0,0 +1,153 @@
+import os
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import torch
+
+logger = logging.getLogger(__name__)
+
+# "torch" is the fp32 reference; "torch-int8" applies dynamic int8 quantization to
+# the Linear layers; "onnx" runs an exported graph with onnxruntime on CPU
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+# Representative creatives used to check a backend against the fp32 model at load time
+AGREEMENT_SAMPLES = [
+    "🔥 Premium Headphones - 50% Off Limited Time!. Experience crystal-clear sound with our award-winning headphones. Free shipping & 30-day returns!. Shop Now",
+    "New summer collection. Light fabrics for warm days.. Learn More",
+    "Buy now. Product.. Click",
+    "Transform your mornings with our organic coffee. Ethically sourced beans, roasted weekly and delivered fresh to your door.. Subscribe Today",
+    "B2B analytics platform trusted by 500+ teams. Cut reporting time in half with automated dashboards and real-time alerts.. Book a Demo",
+    "Exclusive deal for members only! Save 30% on all skincare this weekend. Dermatologist tested, cruelty free.. Get Offer",
+    "Learn to code in 12 weeks. Live mentors, real projects, job guarantee.. Apply Now",
+    "Sale. Stuff on sale.. Go",
+]
+
+
+class TorchBackend:
+    """DistilBERT classifier run with PyTorch (fp32 or dynamically quantized)"""
+
+    def __init__(self, model, name: str = "torch"):
+        self.model = model
+        self.name = name
+
+    def predict_proba(self, inputs) -> "np.ndarray":
+        """Class probabilities for tokenizer output, shape (n_texts, n_classes)"""
+        with torch.no_grad():
+            logits = self.model(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"]).logits
+            return torch.softmax(logits, dim=-1).cpu().numpy()
+
+    def size_bytes(self) -> int:
+        """Serialized size of the weights"""
+        return sum(t.numel() * t.element_size() for t in self.model.state_dict().values() if torch.is_tensor(t))
+
+
+class OnnxBackend:
+    """DistilBERT classifier exported to ONNX and run with onnxruntime"""
+
+    name = "onnx"
+
+    def __init__(self, session, path: str):
+        self.session = session
+        self.path = path
+        self.input_names = [i.name for i in session.get_inputs()]
+
+    def predict_proba(self, inputs) -> "np.ndarray":
+        feeds = {name: inputs[name].cpu().numpy().astype(np.int64) for name in self.input_names}
+        logits = self.session.run(None, feeds)[0]
+        logits = logits - logits.max(axis=-1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=-1, keepdims=True)
+
+    def size_bytes(self) -> int:
+        return os.path.getsize(self.path)
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Wrapper so the exported graph has plain tensor inputs and a single logits output"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask).logits
+
+
+def quantize_int8(model):
+    """Dynamic int8 quantization of the Linear layers (weights int8, activations quantized on the fly)"""
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def export_onnx(model, tokenizer, path: str, opset: int = 14) -> str:
+    """Export the classifier to ONNX with dynamic batch and sequence axes"""
+    sample = tokenizer(AGREEMENT_SAMPLES[:2], truncation=True, padding=True, return_tensors="pt")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    torch.onnx.export(
+        _LogitsOnly(model).eval(),
+        (sample["input_ids"], sample["attention_mask"]),
+        path,
+        input_names=["input_ids", "attention_mask"],
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "logits": {0: "batch"},
+        },
+        opset_version=opset,
+    )
+    return path
+
+
+def load_onnx_backend(model, tokenizer, model_dir: str, onnx_path: Optional[str] = None,
+                      threads: int = 0) -> OnnxBackend:
+    """Open (exporting first if missing or stale) the ONNX graph for a DistilBERT directory"""
+    import onnxruntime as ort
+
+    path = onnx_path or os.path.join(str(model_dir), "model.onnx")
+    weights = [os.path.join(str(model_dir), name) for name in ("model.safetensors", "pytorch_model.bin")]
+    newest_weights = max((os.path.getmtime(w) for w in weights if os.path.exists(w)), default=0)
+    if not os.path.exists(path) or os.path.getmtime(path) < newest_weights:
+        logger.info(f"Exporting DistilBERT to ONNX at {path}")
+        export_onnx(model, tokenizer, path)
+
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    if threads > 0:
+        options.intra_op_num_threads = threads
+    session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+    return OnnxBackend(session, path)
+
+
+def build_backend(name: str, model, tokenizer, model_dir: str, onnx_path: Optional[str] = None,
+                  threads: int = 0):
+    """Build the named backend from the fp32 model. Raises ValueError for unknown names."""
+    if name == "torch":
+        return TorchBackend(model)
+    if name == "torch-int8":
+        return TorchBackend(quantize_int8(model), name="torch-int8")
+    if name == "onnx":
+        return load_onnx_backend(model, tokenizer, model_dir, onnx_path=onnx_path, threads=threads)
+    raise ValueError(f"Unknown creative backend '{name}', expected one of {BACKENDS}")
+
+
+def agreement_check(reference, candidate, tokenizer, label_values: Dict[int, int],
+                    samples: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Compare a backend with the fp32 reference on the expected score and class probabilities"""
+    samples = samples or AGREEMENT_SAMPLES
+    inputs = tokenizer(samples, truncation=True, padding=True, return_tensors="pt")
+    reference_probs = reference.predict_proba(inputs)
+    candidate_probs = candidate.predict_proba(inputs)
+
+    values = np.array([label_values[i] for i in range(reference_probs.shape[1])], dtype=np.float64)
+    expected_diff = np.abs(reference_probs @ values - candidate_probs @ values)
+    return {
+        "backend": candidate.name,
+        "samples": len(samples),
+        "max_expected_score_diff": round(float(expected_diff.max()), 5),
+        "mean_expected_score_diff": round(float(expected_diff.mean()), 5),
+        "max_class_prob_diff": round(float(np.abs(reference_probs - candidate_probs).max()), 5),
+        "top_class_agreement": round(float(np.mean(
+            reference_probs.argmax(axis=1) == candidate_probs.argmax(axis=1)
+        )), 4),
+    }
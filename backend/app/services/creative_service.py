@@ -1,7 +1,12 @@
-from typing import List
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional, Tuple
+import json
+import time
 import logging
 
-from app.models.types import Creative, CreativeScore, CreativeBreakdown, MLCreativeScoreRequest
+from app.models.types import (
+    Creative, CreativeScore, CreativeBreakdown, MLCreativeScoreRequest, MLCreativeScoreResponse
+)
+from app.services.lexicon import creative_lexicon
 from app.services.ml_service import MLService
 
 logger = logging.getLogger(__name__)
@@ -15,7 +20,7 @@ class CreativeService:
             raise ValueError("Invalid creative data provided")
 
     @staticmethod
-    async def score_creative(creative: Creative) -> CreativeScore:
+    async def score_creative(creative: Creative, full_precision: bool = False) -> CreativeScore:
         """Score creative content using ML models"""
         CreativeService.validate_creative(creative)
         
@@ -25,44 +30,137 @@ class CreativeService:
                 channel=creative.channel,
                 title=creative.title,
                 description=creative.description,
-                cta=creative.call_to_action
+                cta=creative.call_to_action,
+                full_precision=full_precision
             )
             
             ml_response = await MLService.score_creative_content(ml_request)
-            
-            # Convert ML response to CreativeScore format
-            # Scale from 1-10 to 0-100 and ensure professional scores
-            def scale_score(score):
-                # Convert 1-10 to 60-95 for more professional appearance
-                scaled = ((score - 1) / 9) * 35 + 60
-                return round(min(95, max(60, scaled)), 1)
-
-            # Create breakdown dict with proper field names
-            breakdown_dict = {
-                "clarity": scale_score(ml_response.scores["title"]),
-                "urgency": scale_score(ml_response.scores["description"]),
-                "relevance": scale_score(ml_response.scores["channel_fit"]),
-                "callToAction": scale_score(ml_response.scores["cta"])  # Use alias name directly
-            }
-
-            score = CreativeScore(
-                overall=scale_score(ml_response.scores["final"]),
-                breakdown=CreativeBreakdown(**breakdown_dict),
-                suggestions=[
-                    *ml_response.feedback,
-                    *ml_response.improvements.get("title", [])[:2],
-                    *ml_response.improvements.get("description", [])[:2],
-                    *ml_response.improvements.get("cta", [])[:2]
-                ]
-            )
-            
-            return score
+            return CreativeService.score_from_ml_response(ml_response)
             
         except Exception as e:
             logger.warning(f"ML scoring failed, using fallback: {e}")
             # Fallback to rule-based scoring
             return CreativeService.score_creative_fallback(creative)
 
+    @staticmethod
+    def score_from_ml_response(ml_response: MLCreativeScoreResponse) -> CreativeScore:
+        """Convert an ML score response to the CreativeScore format"""
+        # Scale from 1-10 to 0-100 and ensure professional scores
+        def scale_score(score):
+            # Convert 1-10 to 60-95 for more professional appearance
+            scaled = ((score - 1) / 9) * 35 + 60
+            return round(min(95, max(60, scaled)), 1)
+
+        # Create breakdown dict with proper field names
+        breakdown_dict = {
+            "clarity": scale_score(ml_response.scores["title"]),
+            "urgency": scale_score(ml_response.scores["description"]),
+            "relevance": scale_score(ml_response.scores["channel_fit"]),
+            "callToAction": scale_score(ml_response.scores["cta"])  # Use alias name directly
+        }
+
+        score = CreativeScore(
+            overall=scale_score(ml_response.scores["final"]),
+            breakdown=CreativeBreakdown(**breakdown_dict),
+            suggestions=[
+                *ml_response.feedback,
+                *ml_response.improvements.get("title", [])[:2],
+                *ml_response.improvements.get("description", [])[:2],
+                *ml_response.improvements.get("cta", [])[:2]
+            ],
+            approximate=ml_response.approximate
+        )
+        return score
+
+    @staticmethod
+    async def score_creatives_batch(creatives: List[Creative], full_precision: Optional[List[bool]] = None
+                                    ) -> Tuple[List[CreativeScore], Dict[str, Any]]:
+        """Score many creatives with one batched ML call; returns scores in order and the batch stats"""
+        full_precision = full_precision or [False] * len(creatives)
+        for creative in creatives:
+            CreativeService.validate_creative(creative)
+
+        ml_response = await MLService.score_creative_batch([
+            MLCreativeScoreRequest(
+                channel=creative.channel,
+                title=creative.title,
+                description=creative.description,
+                cta=creative.call_to_action,
+                full_precision=precise
+            )
+            for creative, precise in zip(creatives, full_precision)
+        ])
+
+        scores = []
+        for creative, item in zip(creatives, ml_response.results):
+            try:
+                scores.append(CreativeService.score_from_ml_response(item.result))
+            except Exception as e:
+                logger.warning(f"ML scoring failed, using fallback: {e}")
+                scores.append(CreativeService.score_creative_fallback(creative))
+        return scores, ml_response.stats
+
+    @staticmethod
+    async def score_creatives_stream(rows: AsyncGenerator[Tuple[int, Optional[Dict[str, str]], Optional[str]], None],
+                                     batch_size: int = 64, max_rows: int = 100000) -> AsyncIterator[str]:
+        """Score uploaded rows in batches, yielding one NDJSON line per row (in order) and a summary line"""
+        start = time.perf_counter()
+        summary = {"rows": 0, "scored": 0, "failed": 0, "cache_hits": 0, "near_duplicate_hits": 0,
+                   "cascade_resolved": 0, "truncated": False}
+        batch: List[Tuple[int, Optional[Dict[str, str]], Optional[str]]] = []
+
+        async def flush():
+            lines = [None] * len(batch)
+            creatives = {}
+            for j, (row_number, fields, error) in enumerate(batch):
+                try:
+                    if error:
+                        raise ValueError(error)
+                    creative = Creative(
+                        id=f"row-{row_number}",
+                        title=fields["title"],
+                        description=fields["description"],
+                        callToAction=fields["cta"],
+                        channel=fields["channel"].lower()
+                    )
+                    CreativeService.validate_creative(creative)
+                    creatives[j] = creative
+                except Exception as e:
+                    lines[j] = {"row": row_number, "success": False, "error": str(e)}
+
+            if creatives:
+                scores, stats = await CreativeService.score_creatives_batch(list(creatives.values()))
+                summary["cache_hits"] += stats.get("cache_hits", 0)
+                summary["near_duplicate_hits"] += stats.get("near_duplicate_hits", 0)
+                summary["cascade_resolved"] += stats.get("cascade_resolved", 0)
+                for j, score in zip(creatives, scores):
+                    lines[j] = {"row": batch[j][0], "success": True, "score": score.model_dump(by_alias=True)}
+
+            for line in lines:
+                summary["scored" if line["success"] else "failed"] += 1
+            batch.clear()
+            return "".join(json.dumps(line) + "\n" for line in lines)
+
+        try:
+            async for row in rows:
+                if summary["rows"] >= max_rows:
+                    summary["truncated"] = True
+                    break
+                summary["rows"] += 1
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    yield await flush()
+        finally:
+            # Stopping early (truncation or a client disconnect) would leave the rows and their spool open
+            await rows.aclose()
+        if batch:
+            yield await flush()
+
+        elapsed = time.perf_counter() - start
+        summary["elapsed_seconds"] = round(elapsed, 3)
+        summary["creatives_per_second"] = round(summary["scored"] / elapsed, 1) if elapsed > 0 else None
+        yield json.dumps({"summary": summary}) + "\n"
+
     @staticmethod
     def score_creative_fallback(creative: Creative) -> CreativeScore:
         """Fallback rule-based creative scoring - professional and encouraging"""
@@ -84,18 +182,19 @@ class CreativeService:
         else:
             clarity_score = clarity_base + 5
 
+        # One keyword scan per field; the full-text hits are their sum
+        cta_match = creative_lexicon.scan(creative.call_to_action)
+        text_match = creative_lexicon.scan(f"{creative.title} {creative.description}") + cta_match
+
         # Urgency scoring with more keywords
-        urgency_words = ["now", "today", "limited", "hurry", "save", "deal", "offer", "sale", "free", "exclusive"]
-        urgency_score = urgency_base + sum(8 for word in urgency_words if word in text)
+        urgency_score = urgency_base + 8 * text_match.distinct("urgency")
 
         # Relevance scoring with benefit words
-        benefit_words = ["you", "your", "free", "save", "best", "new", "premium", "quality", "guaranteed"]
-        relevance_score = relevance_base + sum(4 for word in benefit_words if word in text)
+        relevance_score = relevance_base + 4 * text_match.distinct("benefit")
 
         # CTA scoring
         if creative.call_to_action and len(creative.call_to_action.strip()) > 0:
-            cta_words = ["buy", "get", "shop", "try", "start", "join", "download", "order", "call", "click"]
-            cta_bonus = sum(6 for word in cta_words if word in creative.call_to_action.lower())
+            cta_bonus = 6 * cta_match.distinct("cta")
             cta_score = min(92, cta_base + 15 + cta_bonus)
         else:
             cta_score = cta_base - 20
@@ -153,7 +252,8 @@ class CreativeService:
                 channel=channel,
                 title=f"{product_name} - Premium {category}",
                 description=f"Discover the best {product_name} for your {category} needs. High quality, great value.",
-                cta="Shop Now"
+                cta="Shop Now",
+                category=category
             )
             
             ml_response = await MLService.score_creative_content(ml_request)
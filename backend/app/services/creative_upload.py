@@ -0,0 +1,166 @@
+import io
+import csv
+import json
+import tempfile
+from typing import Any, AsyncIterator, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from starlette.requests import Request
+
+UPLOAD_FORMATS = ("csv", "ndjson")
+
+# Uploads are spooled to memory up to this size, then to a temporary file
+SPOOL_MAX_MEMORY = 1 << 20
+READ_CHUNK_BYTES = 1 << 16
+
+# Accepted spellings of each creative column (headers are matched case-insensitively)
+COLUMN_ALIASES = {
+    "title": ("title", "headline"),
+    "description": ("description", "body", "text"),
+    "cta": ("cta", "calltoaction", "call_to_action"),
+    "channel": ("channel", "platform"),
+}
+
+
+def detect_format(content_type: Optional[str], requested: Optional[str] = None,
+                  filename: Optional[str] = None) -> str:
+    """csv or ndjson from an explicit choice, the file extension or the content type. Raises ValueError."""
+    if requested:
+        if requested not in UPLOAD_FORMATS:
+            raise ValueError(f"Unknown upload format '{requested}', expected one of {UPLOAD_FORMATS}")
+        return requested
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or any(t in content_type for t in ("ndjson", "jsonl", "json-lines")):
+        return "ndjson"
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    raise ValueError("Could not tell the upload format; send a .csv / .ndjson file (or Content-Type "
+                     "text/csv / application/x-ndjson), or pass format=csv|ndjson")
+
+
+class UploadTooLarge(ValueError):
+    """The upload is bigger than the configured byte limit"""
+
+
+async def spool_upload(request: Request, max_bytes: Optional[int] = None) -> Tuple[BinaryIO, Optional[str], Optional[str]]:
+    """Copy the upload into a spooled temporary file; returns (file, content_type, filename).
+
+    Accepts a multipart form with a `file` field or the raw file as the body.
+    The body has to be read before a StreamingResponse starts (it listens on
+    the same ASGI receive channel for disconnects), and a multipart UploadFile
+    is closed once the endpoint returns, so both are copied here. Memory use
+    stays bounded by SPOOL_MAX_MEMORY. Raises UploadTooLarge once more than
+    `max_bytes` would be stored (checked against Content-Length first).
+    """
+    content_length = request.headers.get("content-length")
+    if max_bytes and content_length and content_length.isdigit() and int(content_length) > max_bytes:
+        raise UploadTooLarge(f"Upload is {int(content_length)} bytes, the limit is {max_bytes}")
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    content_type = request.headers.get("content-type")
+    filename = None
+    written = 0
+
+    def write(chunk: bytes) -> None:
+        nonlocal written
+        written += len(chunk)
+        if max_bytes and written > max_bytes:
+            raise UploadTooLarge(f"Upload is larger than the limit of {max_bytes} bytes")
+        spool.write(chunk)
+
+    try:
+        if content_type and content_type.lower().startswith("multipart/form-data"):
+            async with request.form() as form:
+                upload = form.get("file")
+                if upload is None or isinstance(upload, str):
+                    raise ValueError("Multipart upload needs a 'file' field")
+                content_type, filename = upload.content_type, upload.filename
+                while True:
+                    chunk = upload.file.read(READ_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    write(chunk)
+        else:
+            async for chunk in request.stream():
+                write(chunk)
+    except Exception:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, content_type, filename
+
+
+def normalize_row(row: Dict[str, Any]) -> Dict[str, str]:
+    """Map a parsed row onto title / description / cta / channel. Raises ValueError if a column is missing."""
+    lowered = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+    creative = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        value = next((lowered[alias] for alias in aliases if lowered.get(alias) not in (None, "")), None)
+        if value is None:
+            raise ValueError(f"Missing '{field}'")
+        creative[field] = str(value).strip()
+    return creative
+
+
+def iter_csv_records(lines: Iterable[str]) -> Iterator[Tuple[Optional[List[str]], Optional[str]]]:
+    """Yield (record, None) per CSV record, or (None, error) for a record the csv module rejects.
+
+    csv.reader handles quoted fields that span lines, and a quote inside an
+    unquoted field (`Big 5" TV`) is an ordinary character. A quoted field that
+    is never closed is cut off at the csv module's field size limit, so one bad
+    row cannot pull the rest of the file into memory.
+    """
+    reader = csv.reader(lines)
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield None, f"Malformed CSV row: {e}"
+            continue
+        if any(field.strip() for field in record):
+            yield record, None
+
+
+async def iter_upload_rows(file: BinaryIO, fmt: str) -> AsyncIterator[Tuple[int, Optional[Dict[str, str]], Optional[str]]]:
+    """Yield (row_number, creative, error) for each row of a spooled upload, closing it at the end.
+
+    Rows are read one at a time, so only the row being parsed is held in
+    memory. Unparseable rows are yielded with an error instead of stopping the
+    upload. For CSV the first record is the header. The text is decoded as
+    UTF-8 (a BOM is ignored, invalid bytes are replaced).
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+    row_number = 0
+    try:
+        if fmt == "csv":
+            header = None
+            for record, error in iter_csv_records(text):
+                if header is None and error is None:
+                    header = record
+                    continue
+                row_number += 1
+                try:
+                    if error:
+                        raise ValueError(error)
+                    if len(record) > len(header):
+                        raise ValueError(f"Row has {len(record)} fields, header has {len(header)}")
+                    yield row_number, normalize_row(dict(zip(header, record))), None
+                except ValueError as e:
+                    yield row_number, None, str(e)
+            return
+
+        for line in text:
+            if not line.strip():
+                continue
+            row_number += 1
+            try:
+                row = json.loads(line)
+                if not isinstance(row, dict):
+                    raise ValueError("Each line must be a JSON object")
+                yield row_number, normalize_row(row), None
+            except ValueError as e:
+                yield row_number, None, str(e)
+    finally:
+        text.close()
@@ -0,0 +1,78 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Channel order used by the campaign optimizer for split matrices
+CHANNELS = ["instagram", "google", "tiktok", "facebook", "youtube", "linkedin"]
+
+NUMERIC_FIELDS = ["total_budget", "aov", "creative_quality", "campaign_days", "target_margin", "age"]
+ONE_HOT_FIELDS = ["gender", "income_level"]
+
+
+class FeatureEncoder:
+    """Column-index plan compiled from model_feature_columns_usd.json.
+
+    Encoding writes straight into a NumPy buffer laid out in `feature_columns`
+    order, matching what get_dummies + reindex produced (missing columns stay 0,
+    unknown category values encode as all-zero one-hot slots).
+    """
+
+    def __init__(self, feature_columns: List[str]):
+        self.feature_columns = list(feature_columns)
+        self.n_features = len(self.feature_columns)
+        index = {col: i for i, col in enumerate(self.feature_columns)}
+
+        budget_pairs = [(pos, index[f"budget_{ch}"]) for pos, ch in enumerate(CHANNELS) if f"budget_{ch}" in index]
+        pct_pairs = [(pos, index[f"pct_{ch}"]) for pos, ch in enumerate(CHANNELS) if f"pct_{ch}" in index]
+        self.budget_src = np.array([p[0] for p in budget_pairs], dtype=np.intp)
+        self.budget_dst = np.array([p[1] for p in budget_pairs], dtype=np.intp)
+        self.pct_src = np.array([p[0] for p in pct_pairs], dtype=np.intp)
+        self.pct_dst = np.array([p[1] for p in pct_pairs], dtype=np.intp)
+
+        self.numeric_slots: Dict[str, int] = {name: index[name] for name in NUMERIC_FIELDS if name in index}
+
+        self.one_hot_slots: Dict[str, Dict[str, int]] = {name: {} for name in ONE_HOT_FIELDS}
+        for col, i in index.items():
+            for name in ONE_HOT_FIELDS:
+                prefix = f"{name}_"
+                if col.startswith(prefix):
+                    self.one_hot_slots[name][col[len(prefix):]] = i
+
+    def allocate(self, n_rows: int) -> "np.ndarray":
+        """Allocate a zeroed feature buffer for `n_rows` candidates"""
+        return np.zeros((n_rows, self.n_features), dtype=np.float64)
+
+    def encode(self, total_budget: float, split_matrix: "np.ndarray", aov: float,
+               creative_quality: float, campaign_days: int, target_margin: float,
+               age: int, gender: str, income_level: str,
+               out: Optional["np.ndarray"] = None) -> "np.ndarray":
+        """Encode a (K, 6) split matrix for one request into a (K, n_features) matrix.
+
+        `out` may be a zeroed slice of a larger buffer from `allocate`, which lets
+        batch callers encode several requests into one matrix without copies.
+        """
+        split_matrix = np.asarray(split_matrix, dtype=np.float64)
+        if out is None:
+            out = self.allocate(len(split_matrix))
+
+        out[:, self.budget_dst] = split_matrix[:, self.budget_src]
+        if total_budget > 0:
+            out[:, self.pct_dst] = split_matrix[:, self.pct_src] / total_budget
+
+        values = {
+            "total_budget": float(total_budget),
+            "aov": float(aov),
+            "creative_quality": float(creative_quality),
+            "campaign_days": int(campaign_days),
+            "target_margin": float(target_margin),
+            "age": int(age),
+        }
+        for name, slot in self.numeric_slots.items():
+            out[:, slot] = values[name]
+
+        for name, value in (("gender", gender), ("income_level", income_level)):
+            slot = self.one_hot_slots[name].get(value)
+            if slot is not None:
+                out[:, slot] = 1.0
+
+        return out
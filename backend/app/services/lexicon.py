@@ -0,0 +1,88 @@
+import re
+from typing import Dict, Iterable, List, Optional, Sequence
+
+# Keyword lists used by the rule-based creative scorers
+URGENCY_WORDS = ["now", "today", "limited", "hurry", "save", "deal", "offer", "sale", "free", "exclusive"]
+BENEFIT_WORDS = ["you", "your", "free", "save", "best", "new", "premium", "quality", "guaranteed"]
+CTA_WORDS = ["buy", "get", "shop", "try", "start", "join", "download", "order", "call", "click"]
+ENGAGEMENT_WORDS = ["free", "save", "new", "best", "exclusive"]
+ACTION_WORDS = ["buy", "shop", "get", "try"]
+CTA_ACTION_WORDS = ["buy", "shop", "get", "try", "now"]
+
+CREATIVE_LEXICONS = {
+    "urgency": URGENCY_WORDS,
+    "benefit": BENEFIT_WORDS,
+    "cta": CTA_WORDS,
+    "engagement": ENGAGEMENT_WORDS,
+    "action": ACTION_WORDS,
+    "cta_action": CTA_ACTION_WORDS,
+}
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """Regex alternation for `words` factored into a character trie, e.g. s(?:a(?:le|ve)|hop).
+
+    Python's re tries alternatives one by one, so sharing prefixes keeps
+    backtracking to one branch per character instead of one per word.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return build(trie)
+
+
+class LexiconMatch:
+    """Keyword hits for one text, in order of appearance"""
+
+    __slots__ = ("hits", "lexicon")
+
+    def __init__(self, hits: List[str], lexicon: "Lexicon"):
+        self.hits = hits
+        self.lexicon = lexicon
+
+    def distinct(self, category: str) -> int:
+        """Number of different words from `category` present"""
+        return len(self.lexicon.word_sets[category].intersection(self.hits))
+
+    def occurrences(self, category: str) -> int:
+        """Total occurrences of words from `category`"""
+        words = self.lexicon.word_sets[category]
+        return sum(1 for hit in self.hits if hit in words)
+
+    def __add__(self, other: "LexiconMatch") -> "LexiconMatch":
+        return LexiconMatch(self.hits + other.hits, self.lexicon)
+
+
+class Lexicon:
+    """All keyword lists compiled into one word-bounded regex.
+
+    A text is lowercased and scanned once no matter how many categories or
+    words there are, and "now" no longer matches inside "know" the way a
+    substring test does. Multi-word entries work too; a longer entry wins over
+    one that is its prefix.
+    """
+
+    def __init__(self, categories: Dict[str, Sequence[str]]):
+        self.word_sets = {name: frozenset(word.lower() for word in words) for name, words in categories.items()}
+        vocabulary = set().union(*self.word_sets.values())
+        self.pattern = re.compile(r"\b" + trie_pattern(vocabulary) + r"\b")
+
+    def scan(self, text: Optional[str]) -> LexiconMatch:
+        return LexiconMatch(self.pattern.findall(text.lower()) if text else [], self)
+
+    def scan_batch(self, texts: Iterable[Optional[str]]) -> List[LexiconMatch]:
+        return [self.scan(text) for text in texts]
+
+
+creative_lexicon = Lexicon(CREATIVE_LEXICONS)
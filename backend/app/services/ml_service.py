@@ -1,140 +1,595 @@
 import os
 import json
+import time
+import math
 import asyncio
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 
-# Try to import ML dependencies, fall back gracefully if not available
+# Try to import ML dependencies, fall back gracefully if not available.
+# The campaign optimizer only needs NumPy + joblib (the lightweight deployment);
+# the creative scorer additionally needs the torch / transformers stack.
 try:
     import numpy as np
-    import pandas as pd
     import joblib
+    from app.services.feature_encoder import CHANNELS, FeatureEncoder
+    from app.services.sampling import bounded_allocations, sample_simplex
+    from app.services.tree_engine import CompiledTreeEnsemble
+    TABULAR_ML_AVAILABLE = True
+except ImportError as e:
+    logging.warning(f"Tabular ML dependencies not available: {e}. Using fallback logic.")
+    TABULAR_ML_AVAILABLE = False
+    np = None
+    joblib = None
+
+try:
     import torch
     from transformers import AutoTokenizer, AutoModelForSequenceClassification
-    from sentence_transformers import SentenceTransformer, util
-    ML_AVAILABLE = True
+    from sentence_transformers import SentenceTransformer
+    from app.services.creative_backends import TorchBackend, agreement_check, build_backend
+    from app.services.phrase_bank import PhraseBank, load_phrase_definitions
+    ML_AVAILABLE = TABULAR_ML_AVAILABLE
 except ImportError as e:
     logging.warning(f"ML dependencies not available: {e}. Using fallback logic.")
     ML_AVAILABLE = False
     # Create mock objects for graceful fallback
-    np = None
-    pd = None
-    joblib = None
     torch = None
 
+from app.core.batching import MicroBatcher
+from app.core.cache import TTLCache
+from app.core.near_duplicates import NearDuplicateIndex, simhash
+from app.core.model_registry import ModelRegistry
+from app.core.config import settings
+from app.services.lexicon import creative_lexicon
 from app.models.types import (
     MLCampaignOptimizationRequest, MLCampaignOptimizationResponse,
-    MLCreativeScoreRequest, MLCreativeScoreResponse
+    MLCampaignOptimizationBatchResponse, MLCampaignBatchItemResult,
+    MLBudgetCurveRequest, MLBudgetCurveResponse, MLBudgetCurvePoint,
+    MLCreativeScoreRequest, MLCreativeScoreResponse,
+    MLCreativeScoreBatchResponse, MLCreativeBatchItemResult
 )
 
 logger = logging.getLogger(__name__)
 
-# Global variables for models
-campaign_model = None
-feature_columns = None
-nlp_models = {}
-distilbert_model = None
-distilbert_tokenizer = None
+# Loaded model versions ("campaign", "creative"), swapped atomically on hot reload
+model_registry = ModelRegistry(history_size=settings.ML_MODEL_HISTORY_SIZE)
+# Bundles pinned for the job running on the current executor thread
+_pinned_models = threading.local()
+_last_reload_fingerprint = None
+_background_tasks = set()
+# model_version of responses computed by the rule-based fallbacks
+RULES_MODEL_VERSION = "rules"
+
+# Channels the campaign optimizer allocates across (same order as the model features)
+CAMPAIGN_CHANNELS = ["instagram", "google", "tiktok", "facebook", "youtube", "linkedin"]
 
 # Label mapping for DistilBERT (from README.txt)
 DISTILBERT_LABEL_MAPPING = {0: 3, 1: 4, 2: 5, 3: 6, 4: 7, 5: 8}
 
-async def load_ml_models():
-    """Load all ML models"""
-    global campaign_model, feature_columns, nlp_models, distilbert_model, distilbert_tokenizer
+# Memoized optimizer results, keyed on a quantized request + campaign model version
+optimizer_cache = TTLCache(
+    maxsize=settings.ML_OPTIMIZER_CACHE_SIZE,
+    ttl_seconds=settings.ML_OPTIMIZER_CACHE_TTL_SECONDS
+)
+_last_model_file_check = 0.0
 
-    if not ML_AVAILABLE:
-        logger.info("ML dependencies not available, skipping model loading")
-        return
+# Token-length bucket edges for batched DistilBERT passes
+CREATIVE_LENGTH_BUCKETS = sorted(
+    int(edge) for edge in settings.ML_CREATIVE_LENGTH_BUCKETS.split(",") if edge.strip()
+)
+# Real vs padding tokens fed to DistilBERT since startup
+_token_usage_lock = threading.Lock()
+_token_usage = {"forward_passes": 0, "sequences": 0, "tokens": 0, "padded_tokens": 0, "truncated_sequences": 0}
+
+# Cascade scoring outcomes and the time spent in each scorer since startup
+_cascade_lock = threading.Lock()
+_cascade_stats = {
+    "requests": 0, "resolved_by_rules": 0, "escalated_band": 0, "escalated_full_precision": 0,
+    "rules_seconds": 0.0, "model_seconds": 0.0, "model_items": 0
+}
+
+# Scored creatives (MLCreativeScoreResponse), keyed on normalized text + creative model version
+creative_cache = TTLCache(
+    maxsize=settings.ML_CREATIVE_CACHE_SIZE,
+    ttl_seconds=settings.ML_CREATIVE_CACHE_TTL_SECONDS
+)
+# Model signals (DistilBERT score and text embedding) keyed on model version + combined-text
+# hash, so a channel or category change runs no model and a field edit runs one combined pass
+creative_signal_cache = TTLCache(
+    maxsize=settings.ML_CREATIVE_SIGNAL_CACHE_SIZE,
+    ttl_seconds=settings.ML_CREATIVE_CACHE_TTL_SECONDS
+)
+# Model-scored creatives by SimHash of their text, scoped to channel, category and model
+# version, so near-duplicate variants can reuse a score instead of running the models
+creative_near_duplicates = NearDuplicateIndex(
+    max_distance=settings.ML_CREATIVE_NEAR_DUP_MAX_DISTANCE,
+    maxsize=settings.ML_CREATIVE_NEAR_DUP_SIZE
+)
 
-    logger.info("Starting ML model loading...")
+# Last optimized (inputs, recommended_split) per campaign id, for warm-started re-optimization
+warm_start_cache = TTLCache(
+    maxsize=settings.ML_WARM_START_CACHE_SIZE,
+    ttl_seconds=settings.ML_WARM_START_TTL_SECONDS
+)
+# Drift is the largest relative change across the numeric fields; any change to
+# the exact fields means the previous split is no longer a useful starting point
+WARM_START_NUMERIC_FIELDS = ["total_budget", "aov", "age", "creative_quality", "campaign_days", "target_margin"]
+WARM_START_EXACT_FIELDS = ["gender", "income_level", "excluded_channels", "channel_min", "channel_max"]
+
+# Dedicated executors keep CPU-bound inference off the asyncio event loop. Tree
+# (LightGBM) and transformer (DistilBERT / sentence embedder) work are sized
+# separately so a burst of creative scoring cannot starve the optimizer.
+tree_executor = ThreadPoolExecutor(
+    max_workers=settings.ML_TREE_WORKERS, thread_name_prefix="ml-tree"
+)
+transformer_executor = ThreadPoolExecutor(
+    max_workers=settings.ML_TRANSFORMER_WORKERS, thread_name_prefix="ml-transformer"
+)
+# Model loads and hot reloads run here, away from request traffic; two workers
+# let the campaign and creative models load side by side
+model_loader_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ml-loader")
+
+# Concurrent creative scoring requests share one padded DistilBERT / embedder pass;
+# one batch per transformer worker can be in flight
+creative_batcher = MicroBatcher(
+    lambda items: MLService._score_creative_batch(items),
+    max_batch_size=settings.ML_CREATIVE_BATCH_MAX_SIZE,
+    max_wait_ms=settings.ML_CREATIVE_BATCH_MAX_WAIT_MS,
+    max_concurrency=settings.ML_TRANSFORMER_WORKERS,
+)
 
-    # Load campaign optimization model
-    try:
-        # Try multiple possible paths for the models directory
-        possible_paths = [
-            Path("models"),  # Direct relative path
-            Path("backend/models"),  # From project root
-            Path(__file__).parent.parent.parent / "models",  # From backend root
-            Path(__file__).parent.parent.parent / "backend" / "models",  # From project root
-        ]
+def current_campaign_model() -> Optional["CampaignModelBundle"]:
+    """Campaign bundle for the running job (pinned when it was submitted), else the active one"""
+    return getattr(_pinned_models, "campaign", None) or model_registry.active("campaign")
 
-        models_path = None
-        for path in possible_paths:
-            if path.exists() and (path / "campaign_optimizer_usd.pkl").exists():
-                models_path = path
-                break
+def current_creative_model() -> Optional["CreativeModelBundle"]:
+    """Creative bundle for the running job (pinned when it was submitted), else the active one"""
+    return getattr(_pinned_models, "creative", None) or model_registry.active("creative")
 
-        if models_path is None:
-            logger.warning(f"❌ Could not find models directory in any of: {[str(p) for p in possible_paths]}")
+def _run_pinned(campaign, creative, fn, *args, **kwargs):
+    _pinned_models.campaign, _pinned_models.creative = campaign, creative
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _pinned_models.campaign = _pinned_models.creative = None
+
+async def run_inference(executor: ThreadPoolExecutor, fn, *args, **kwargs):
+    """Run blocking model code on an inference executor, with the active models pinned for the job"""
+    loop = asyncio.get_running_loop()
+    job = functools.partial(
+        _run_pinned, model_registry.active("campaign"), model_registry.active("creative"), fn, *args, **kwargs
+    )
+    return await loop.run_in_executor(executor, job)
+
+def shutdown_ml_executors() -> None:
+    """Stop the inference executors (called on application shutdown)"""
+    tree_executor.shutdown(wait=False, cancel_futures=True)
+    transformer_executor.shutdown(wait=False, cancel_futures=True)
+    model_loader_executor.shutdown(wait=False, cancel_futures=True)
+
+def _file_fingerprint(path) -> Optional[tuple]:
+    """(mtime, size) of a file, or None if it cannot be read"""
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+
+def _file_version(path) -> str:
+    """Short content hash used as a model version tag"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+def _directory_version(path) -> str:
+    """Short version tag for a model directory from its file names, sizes and mtimes"""
+    digest = hashlib.sha256()
+    for file in sorted(Path(path).iterdir()):
+        if file.is_file():
+            stat = file.stat()
+            digest.update(f"{file.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
+
+def find_campaign_models_dir() -> Optional[Path]:
+    """Models directory holding campaign_optimizer_usd.pkl, or None"""
+    # Try multiple possible paths for the models directory
+    possible_paths = [
+        Path("models"),  # Direct relative path
+        Path("backend/models"),  # From project root
+        Path(__file__).parent.parent.parent / "models",  # From backend root
+        Path(__file__).parent.parent.parent / "backend" / "models",  # From project root
+    ]
+
+    for path in possible_paths:
+        if path.exists() and (path / "campaign_optimizer_usd.pkl").exists():
+            return path
+
+    logger.warning(f"❌ Could not find models directory in any of: {[str(p) for p in possible_paths]}")
+    return None
+
+def find_distilbert_dir() -> Optional[Path]:
+    """Directory holding the DistilBERT creative scorer, or None"""
+    # Try multiple possible paths for the DistilBERT model
+    possible_distilbert_paths = [
+        Path("models/distilbert_creative_scorer"),  # Direct relative path
+        Path("backend/models/distilbert_creative_scorer"),  # From project root
+        Path(__file__).parent.parent.parent / "models" / "distilbert_creative_scorer",  # From backend root
+        Path(__file__).parent.parent.parent / "backend" / "models" / "distilbert_creative_scorer",  # From project root
+    ]
+
+    for path in possible_distilbert_paths:
+        if path.exists() and (path / "config.json").exists():
+            return path
+
+    logger.warning(f"❌ Could not find DistilBERT model in any of: {[str(p) for p in possible_distilbert_paths]}")
+    return None
+
+
+class CampaignModelBundle:
+    """One loaded version of the campaign optimizer and everything compiled from it"""
+
+    def __init__(self, model, feature_columns: List[str], path: str):
+        self.model = model
+        self.path = path
+        self.fingerprint = _file_fingerprint(path)
+        self.version = _file_version(path)
+        self.feature_columns = feature_columns
+        # Compile the one-hot layout once so inference never touches pandas
+        self.encoder = FeatureEncoder(feature_columns)
+        # Engine validation predicts a few hundred rows, which also warms the model up
+        self.ensemble, self.engine, self.validation = MLService.select_tree_engine(model, self.encoder)
+        self.loaded_at = time.time()
+        self.load_seconds = None
+
+    @classmethod
+    def load(cls, models_path: Path) -> "CampaignModelBundle":
+        """Load, compile and warm up the campaign model from a models directory (blocking)"""
+        start = time.perf_counter()
+        model_file = models_path / "campaign_optimizer_usd.pkl"
+        features_file = models_path / "model_feature_columns_usd.json"
+        if not model_file.exists() or not features_file.exists():
+            raise FileNotFoundError(f"Expected files: {model_file}, {features_file}")
+
+        model = joblib.load(str(model_file))
+        with open(features_file, "r") as f:
+            feature_columns = json.load(f)
+        bundle = cls(model, feature_columns, str(model_file))
+        bundle.load_seconds = round(time.perf_counter() - start, 3)
+        return bundle
+
+    def predict(self, features):
+        """Predict revenue for an encoded feature matrix with the selected engine"""
+        if self.engine == "numpy" and self.ensemble is not None:
+            return self.ensemble.predict(features)
+        if self.engine == "booster":
+            # Skip the sklearn wrapper's input validation
+            return np.asarray(getattr(self.model, "booster_", self.model).predict(features), dtype=float)
+        return np.asarray(self.model.predict(features), dtype=float)
+
+    def predict_with_trees(self, features):
+        """(revenue, per-tree values (n_trees, n_rows) or None) from one pass over the trees"""
+        if self.ensemble is None:
+            return self.predict(features), None
+        if self.engine == "numpy":
+            per_tree = self.ensemble.per_tree_values(features)
         else:
-            model_file = models_path / "campaign_optimizer_usd.pkl"
-            features_file = models_path / "model_feature_columns_usd.json"
+            booster = getattr(self.model, "booster_", self.model)
+            per_tree = self.ensemble.leaf_values(booster.predict(features, pred_leaf=True))
+        if self.validation and self.validation.get("exact"):
+            return self.ensemble.finalize(per_tree), per_tree
+        return self.predict(features), per_tree
 
-            logger.info(f"Found models at: {models_path}")
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "tree_engine": self.engine,
+            "tree_engine_validation": self.validation,
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+        }
 
-            if model_file.exists() and features_file.exists():
-                campaign_model = joblib.load(str(model_file))
-                with open(features_file, "r") as f:
-                    feature_columns = json.load(f)
-                logger.info("✅ Campaign optimization model loaded successfully")
-            else:
-                logger.warning(f"❌ Campaign model files not found at {models_path}")
-                logger.info(f"Expected files: {model_file}, {features_file}")
-    except Exception as e:
-        logger.error(f"❌ Error loading campaign model: {e}")
 
-    # Load DistilBERT creative scoring model
-    try:
-        # Try multiple possible paths for the DistilBERT model
-        possible_distilbert_paths = [
-            Path("models/distilbert_creative_scorer"),  # Direct relative path
-            Path("backend/models/distilbert_creative_scorer"),  # From project root
-            Path(__file__).parent.parent.parent / "models" / "distilbert_creative_scorer",  # From backend root
-            Path(__file__).parent.parent.parent / "backend" / "models" / "distilbert_creative_scorer",  # From project root
-        ]
+class CreativeModelBundle:
+    """One loaded version of the DistilBERT creative scorer and the sentence embedder"""
 
-        distilbert_path = None
-        for path in possible_distilbert_paths:
-            if path.exists() and (path / "config.json").exists():
-                distilbert_path = path
-                break
+    EMBEDDER_NAME = "all-MiniLM-L6-v2"
 
-        if distilbert_path is None:
-            logger.warning(f"❌ Could not find DistilBERT model in any of: {[str(p) for p in possible_distilbert_paths]}")
-        else:
-            logger.info(f"Found DistilBERT model at: {distilbert_path}")
-            distilbert_tokenizer = AutoTokenizer.from_pretrained(str(distilbert_path))
-            distilbert_model = AutoModelForSequenceClassification.from_pretrained(str(distilbert_path))
-            distilbert_model.eval()
-            logger.info("✅ DistilBERT creative scoring model loaded successfully")
-    except Exception as e:
-        logger.error(f"❌ Error loading DistilBERT model: {e}")
+    def __init__(self, tokenizer, backend, embedder, path: Optional[str],
+                 agreement: Optional[Dict[str, Any]] = None, phrase_bank: Optional["PhraseBank"] = None):
+        self.tokenizer = tokenizer
+        self.backend = backend
+        self.embedder = embedder
+        self.phrase_bank = phrase_bank
+        self.path = path
+        self.agreement = agreement
+        distilbert_version = f"{_directory_version(path)}-{backend.name}" if path else "none"
+        self.version = f"{distilbert_version}+{self.EMBEDDER_NAME if embedder is not None else 'none'}"
+        self.loaded_at = time.time()
+        self.load_seconds = None
 
-    # Load NLP models for semantic analysis
-    try:
-        # Sentence embedder for semantic similarity
-        nlp_models['embedder'] = SentenceTransformer("all-MiniLM-L6-v2")
-        logger.info("✅ Sentence embedder loaded successfully")
+    @staticmethod
+    def select_backend(model, tokenizer, model_dir: str):
+        """(backend, agreement) for the configured backend, or fp32 torch if it fails or disagrees"""
+        reference = TorchBackend(model)
+        name = settings.ML_CREATIVE_BACKEND
+        if name == "torch":
+            return reference, None
 
-        # Skip paraphraser for now to speed up loading
-        logger.info("⏭️ Skipping paraphraser model to speed up loading")
+        try:
+            candidate = build_backend(
+                name, model, tokenizer, model_dir,
+                onnx_path=settings.ML_CREATIVE_ONNX_PATH or None, threads=settings.ML_TORCH_THREADS
+            )
+            agreement = agreement_check(reference, candidate, tokenizer, DISTILBERT_LABEL_MAPPING)
+        except Exception as e:
+            logger.error(f"❌ Creative backend '{name}' unavailable, using fp32: {e}")
+            return reference, {"backend": name, "error": str(e), "accepted": False}
+
+        agreement["accepted"] = agreement["max_expected_score_diff"] <= settings.ML_CREATIVE_AGREEMENT_TOLERANCE
+        if not agreement["accepted"]:
+            logger.warning(f"⚠️ Creative backend '{name}' disagrees with fp32 ({agreement}), using fp32")
+            return reference, agreement
+        logger.info(f"✅ Creative backend '{name}' agrees with fp32: {agreement}")
+        return candidate, agreement
+
+    @classmethod
+    def load(cls, distilbert_path: Optional[Path]) -> "CreativeModelBundle":
+        """Load and warm up DistilBERT and the embedder (blocking); missing parts stay None"""
+        start = time.perf_counter()
+        tokenizer = model = embedder = backend = agreement = phrase_bank = None
+
+        if distilbert_path is not None:
+            try:
+                logger.info(f"Found DistilBERT model at: {distilbert_path}")
+                tokenizer = AutoTokenizer.from_pretrained(str(distilbert_path))
+                model = AutoModelForSequenceClassification.from_pretrained(str(distilbert_path))
+                model.eval()
+                logger.info("✅ DistilBERT creative scoring model loaded successfully")
+                backend, agreement = cls.select_backend(model, tokenizer, str(distilbert_path))
+            except Exception as e:
+                logger.error(f"❌ Error loading DistilBERT model: {e}")
+                tokenizer = backend = None
+
+        # Load NLP models for semantic analysis
+        try:
+            # Sentence embedder for semantic similarity
+            embedder = SentenceTransformer(cls.EMBEDDER_NAME)
+            logger.info("✅ Sentence embedder loaded successfully")
+            phrase_bank = PhraseBank.build(
+                embedder, cls.EMBEDDER_NAME, load_phrase_definitions(settings.ML_PHRASE_BANK_FILE),
+                cache_dir=settings.ML_PHRASE_BANK_DIR or None
+            )
+            logger.info(f"✅ Phrase banks ready: {phrase_bank.describe()}")
 
-    except Exception as e:
-        logger.error(f"❌ Error loading NLP models: {e}")
+            # Skip paraphraser for now to speed up loading
+            logger.info("⏭️ Skipping paraphraser model to speed up loading")
+        except Exception as e:
+            logger.error(f"❌ Error loading NLP models: {e}")
+            embedder = phrase_bank = None
+
+        bundle = cls(tokenizer, backend, embedder, str(distilbert_path) if backend is not None else None,
+                     agreement=agreement, phrase_bank=phrase_bank)
+        # One pass through both models so the first real request does not pay for lazy init
+        if backend is not None:
+            MLService.predict_creative_signals("Warm up. Warm up. Shop now", creative=bundle)
+        bundle.load_seconds = round(time.perf_counter() - start, 3)
+        return bundle
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "path": self.path,
+            "distilbert_loaded": self.backend is not None,
+            "backend": self.backend.name if self.backend is not None else None,
+            "backend_agreement": self.agreement,
+            "embedder_loaded": self.embedder is not None,
+            "phrase_banks": self.phrase_bank.describe() if self.phrase_bank is not None else None,
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+        }
+
+
+def load_campaign_bundle(models_path: Optional[Path] = None) -> CampaignModelBundle:
+    if not TABULAR_ML_AVAILABLE:
+        raise RuntimeError("Tabular ML dependencies not available")
+    models_path = models_path or find_campaign_models_dir()
+    if models_path is None:
+        raise FileNotFoundError("Could not find the campaign models directory")
+    logger.info(f"Found models at: {models_path}")
+    return CampaignModelBundle.load(models_path)
+
+def load_creative_bundle() -> CreativeModelBundle:
+    if not ML_AVAILABLE:
+        raise RuntimeError("NLP dependencies not available")
+    return CreativeModelBundle.load(find_distilbert_dir())
+
+def _start_model_loads() -> List[Any]:
+    """Mark every loadable model as loading right away and return the coroutines that load them"""
+    loads = []
+    if not TABULAR_ML_AVAILABLE:
+        logger.info("ML dependencies not available, skipping model loading")
+        model_registry.mark_unavailable("campaign", "Tabular ML dependencies not available")
+    elif model_registry.begin_load("campaign"):
+        loads.append(_load_and_activate("campaign", load_campaign_bundle))
+
+    if not ML_AVAILABLE:
+        logger.info("NLP dependencies not available, skipping creative model loading")
+        model_registry.mark_unavailable("creative", "NLP dependencies not available")
+    elif model_registry.begin_load("creative"):
+        if settings.ML_TORCH_THREADS > 0:
+            torch.set_num_threads(settings.ML_TORCH_THREADS)
+        loads.append(_load_and_activate("creative", load_creative_bundle))
+    return loads
+
+async def _finish_model_loads(loads: List[Any]) -> None:
+    await asyncio.gather(*loads)
 
     # Log final status
+    campaign = model_registry.active("campaign")
+    creative = model_registry.active("creative")
     models_loaded = []
-    if campaign_model is not None:
+    if campaign is not None:
         models_loaded.append("Campaign Optimizer")
-    if distilbert_model is not None:
-        models_loaded.append("DistilBERT Creative Scorer")
-    if nlp_models.get('embedder') is not None:
+    if creative is not None and creative.backend is not None:
+        models_loaded.append(f"DistilBERT Creative Scorer ({creative.backend.name})")
+    if creative is not None and creative.embedder is not None:
         models_loaded.append("Sentence Embedder")
 
     logger.info(f"🎉 ML models loaded: {', '.join(models_loaded) if models_loaded else 'None'}")
 
+async def load_ml_models():
+    """Load all ML models concurrently and wait until each one is ready or has failed"""
+    logger.info("Starting ML model loading...")
+    await _finish_model_loads(_start_model_loads())
+
+def start_background_model_loading() -> "asyncio.Task":
+    """Load all ML models without blocking startup; requests use the fallbacks until each model is ready"""
+    logger.info("Starting ML model loading in the background...")
+    return schedule_background(_finish_model_loads(_start_model_loads()))
+
+async def reload_model(name: str, loader, *args) -> Dict[str, Any]:
+    """Load a new version of one model in the background and swap it in once warmed up"""
+    if not model_registry.begin_load(name):
+        return {"status": "busy", "detail": f"A reload of '{name}' is already in progress"}
+    return await _load_and_activate(name, loader, *args)
+
+async def _load_and_activate(name: str, loader, *args) -> Dict[str, Any]:
+    """Run `loader` on the loader threads and activate its bundle; begin_load must already be called"""
+    try:
+        bundle = await run_inference(model_loader_executor, loader, *args)
+    except Exception as e:
+        current = model_registry.active(name)
+        keeping = f", keeping version {current.version}" if current is not None else ""
+        logger.error(f"❌ Loading {name} model failed{keeping}: {e}")
+        model_registry.end_load(name, error=str(e))
+        return {"status": "failed", "error": str(e)}
+
+    previous = model_registry.activate(name, bundle)
+    model_registry.end_load(name)
+    logger.info(f"✅ {name} model version {bundle.version} is now active")
+    return {
+        "status": "activated",
+        "version": bundle.version,
+        "previous_version": previous.version if previous is not None else None,
+    }
+
+def model_states() -> Dict[str, Any]:
+    """Compact per-model state for health endpoints"""
+    return {
+        name: {
+            "state": status["state"],
+            "version": status["active"]["version"] if status["active"] else None,
+            "load_seconds": status["last_load_seconds"],
+            "loading_for_seconds": status["loading_for_seconds"],
+            "error": status["last_error"],
+        }
+        for name, status in model_registry.status().items()
+    }
+
+async def reload_ml_models(target: str = "all") -> Dict[str, Any]:
+    """Hot-reload "campaign", "creative" or "all" models; returns the outcome per model"""
+    results = {}
+    if target in ("all", "campaign"):
+        results["campaign"] = await reload_model("campaign", load_campaign_bundle)
+    if target in ("all", "creative"):
+        results["creative"] = await reload_model("creative", load_creative_bundle)
+    return results
+
+def schedule_background(coro) -> "asyncio.Task":
+    """Run a coroutine as a fire-and-forget task, keeping a reference until it finishes"""
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+def load_ml_caches() -> None:
+    """Restore the creative score cache and near-duplicate index saved by save_ml_caches (if paths are configured)"""
+    load_near_duplicate_index()
+    path = settings.ML_CREATIVE_CACHE_PATH
+    if not path or not creative_cache.enabled or not os.path.exists(path):
+        return
+    try:
+        with open(path) as f:
+            entries = json.load(f)
+        now = time.time()
+        restored = creative_cache.restore(
+            (entry["key"], MLCreativeScoreResponse(**entry["response"]),
+             entry["expires_at"] - now if entry["expires_at"] is not None else None)
+            for entry in entries
+        )
+        logger.info(f"Restored {restored} cached creative scores from {path}")
+    except Exception as e:
+        logger.warning(f"Could not restore creative score cache from {path}: {e}")
+
+def save_ml_caches() -> None:
+    """Write the creative score cache and near-duplicate index to disk (called on application shutdown)"""
+    save_near_duplicate_index()
+    path = settings.ML_CREATIVE_CACHE_PATH
+    if not path or not creative_cache.enabled:
+        return
+    try:
+        now = time.time()
+        entries = [
+            {"key": key, "response": response.model_dump(), "expires_at": now + ttl if ttl is not None else None}
+            for key, response, ttl in creative_cache.snapshot()
+        ]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved {len(entries)} cached creative scores to {path}")
+    except Exception as e:
+        logger.warning(f"Could not save creative score cache to {path}: {e}")
+
+def load_near_duplicate_index() -> None:
+    path = settings.ML_CREATIVE_NEAR_DUP_PATH
+    if not path or not creative_near_duplicates.enabled or not os.path.exists(path):
+        return
+    try:
+        with open(path) as f:
+            entries = json.load(f)
+        restored = creative_near_duplicates.restore(
+            (tuple(entry["scope"]), int(entry["simhash"]), tuple(float(x) for x in entry["signals"]))
+            for entry in entries
+        )
+        logger.info(f"Restored {restored} near-duplicate creative entries from {path}")
+    except Exception as e:
+        logger.warning(f"Could not restore near-duplicate creative index from {path}: {e}")
+
+def save_near_duplicate_index() -> None:
+    path = settings.ML_CREATIVE_NEAR_DUP_PATH
+    if not path or not creative_near_duplicates.enabled:
+        return
+    try:
+        entries = [
+            {"scope": list(scope), "simhash": str(fingerprint), "signals": list(signals)}
+            for scope, fingerprint, signals in creative_near_duplicates.snapshot()
+        ]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, path)
+        logger.info(f"Saved {len(entries)} near-duplicate creative entries to {path}")
+    except Exception as e:
+        logger.warning(f"Could not save near-duplicate creative index to {path}: {e}")
+
+def rollback_ml_model(name: str) -> Dict[str, Any]:
+    """Re-activate the previous version of a model. Raises LookupError if there is none."""
+    bundle = model_registry.rollback(name)
+    logger.info(f"↩️ Rolled {name} model back to version {bundle.version}")
+    return {"status": "activated", "version": bundle.version}
+
+
 class MLService:
 
     @staticmethod
@@ -142,45 +597,99 @@ class MLService:
                           aov: float, creative_quality: float, campaign_days: int,
                           target_margin: float, age: int, gender: str, income_level: str):
         """Build feature row for campaign model prediction"""
-        channels = ["instagram", "google", "tiktok", "facebook", "youtube", "linkedin"]
-
-        pct_vals = {f"pct_{ch}": (split_budgets[ch]/total_budget if total_budget > 0 else 0.0)
-                    for ch in channels}
-
-        feat = {
-            **{f"budget_{ch}": split_budgets[ch] for ch in channels},
-            **pct_vals,
-            "total_budget": float(total_budget),
-            "aov": float(aov),
-            "creative_quality": float(creative_quality),
-            "campaign_days": int(campaign_days),
-            "target_margin": float(target_margin),
-            "age": int(age),
-            "gender": gender,
-            "income_level": income_level
-        }
+        split_matrix = np.array([[split_budgets[ch] for ch in CHANNELS]], dtype=np.float64)
+        return MLService.build_features_matrix(
+            total_budget, split_matrix, aov, creative_quality, campaign_days,
+            target_margin, age, gender, income_level
+        )
 
-        df = pd.DataFrame([feat])
-        df = pd.get_dummies(df, columns=["gender", "income_level"])
+    @staticmethod
+    def build_features_matrix(total_budget: float, split_matrix, aov: float,
+                              creative_quality: float, campaign_days: int,
+                              target_margin: float, age: int, gender: str, income_level: str,
+                              out=None):
+        """Build the feature matrix for a batch of candidate splits (one row per candidate)"""
+        return current_campaign_model().encoder.encode(
+            total_budget, split_matrix, aov, creative_quality, campaign_days,
+            target_margin, age, gender, income_level, out=out
+        )
 
-        # Ensure all columns are present
-        for col in feature_columns:
-            if col not in df.columns:
-                df[col] = 0
+    @staticmethod
+    def round_split_matrix(total_budget: float, fractions):
+        """Turn simplex fractions into cent-rounded budgets that sum to total_budget"""
+        budgets = np.round(total_budget * fractions, 2)
+        # Adjust for rounding errors on the largest channel of each candidate
+        diff = np.round(total_budget - budgets.sum(axis=1), 2)
+        rows = np.nonzero(np.abs(diff) >= 0.01)[0]
+        largest = np.argmax(budgets[rows], axis=1)
+        budgets[rows, largest] = np.round(budgets[rows, largest] + diff[rows], 2)
+        return budgets
 
-        return df[feature_columns]
+    @staticmethod
+    def split_bounds(request: MLCampaignOptimizationRequest) -> Optional[Tuple[List[float], List[float]]]:
+        """Per-channel (lower, upper) spend bounds in CHANNELS order, or None if unconstrained"""
+        excluded = set(request.excluded_channels)
+        if not (excluded or request.channel_min or request.channel_max):
+            return None
+
+        unknown = (excluded | set(request.channel_min) | set(request.channel_max)) - set(CAMPAIGN_CHANNELS)
+        if unknown:
+            raise ValueError(f"Unknown channels: {sorted(unknown)}. Expected any of {CAMPAIGN_CHANNELS}")
+
+        total_budget = request.total_budget
+        lower = [max(0.0, float(request.channel_min.get(ch, 0.0))) for ch in CAMPAIGN_CHANNELS]
+        upper = [min(total_budget, float(request.channel_max.get(ch, total_budget))) for ch in CAMPAIGN_CHANNELS]
+        for i, ch in enumerate(CAMPAIGN_CHANNELS):
+            if lower[i] > total_budget:
+                raise ValueError(f"Channel '{ch}' minimum spend exceeds the total budget")
+            if ch in excluded:
+                if lower[i] > 0:
+                    raise ValueError(f"Channel '{ch}' is excluded but has a minimum spend")
+                upper[i] = 0.0
+            if lower[i] > upper[i]:
+                raise ValueError(f"Channel '{ch}' minimum spend exceeds its maximum")
+
+        if sum(lower) > total_budget + 0.005 or sum(upper) < total_budget - 0.005:
+            raise ValueError("Channel constraints cannot be met with the given total budget")
+        return lower, upper
+
+    @staticmethod
+    def free_channel_count(bounds) -> int:
+        """Number of channels the sampler can move (all of them when unconstrained)"""
+        if bounds is None:
+            return len(CHANNELS)
+        return sum(1 for low, high in zip(*bounds) if high > low)
 
     @staticmethod
-    def generate_candidates(total_budget: float, channels: List[str], K: int = 500, seed: int = 42):
+    def fractions_to_splits(total_budget: float, fractions, bounds=None):
+        """Map free-channel simplex fractions to cent-rounded splits that respect `bounds`"""
+        if bounds is None:
+            return MLService.round_split_matrix(total_budget, fractions)
+        lower, upper = np.asarray(bounds[0]), np.asarray(bounds[1])
+        allocations = bounded_allocations(fractions, total_budget, lower, upper)
+        return MLService.round_split_matrix(total_budget, allocations / max(total_budget, 1e-9))
+
+    @staticmethod
+    def generate_candidate_matrix(total_budget: float, channels: List[str], K: int = 500, seed: int = 42,
+                                  sampler: str = "dirichlet", bounds=None):
+        """Generate candidate budget allocations as a (K, len(channels)) array from a per-call RNG"""
+        rng = np.random.RandomState(seed)
+        free = len(channels) if bounds is None else MLService.free_channel_count(bounds)
+        samples = sample_simplex(K, free, rng, sampler=sampler)
+        return MLService.fractions_to_splits(total_budget, samples, bounds)
+
+    @staticmethod
+    def generate_candidates(total_budget: float, channels: List[str], K: int = 500, seed: int = 42,
+                            sampler: str = "dirichlet"):
         """Generate candidate budget allocations"""
-        if not ML_AVAILABLE or np is None:
+        if not TABULAR_ML_AVAILABLE or np is None:
             # Fallback: generate simple variations
             import random
-            random.seed(seed)
+            rng = random.Random(seed)
             candidates = []
             for _ in range(min(K, 50)):  # Limit fallback candidates
                 # Generate random splits
-                splits = [random.random() for _ in channels]
+                splits = [rng.random() for _ in channels]
                 total = sum(splits)
                 normalized = [s/total for s in splits]
 
@@ -193,169 +702,1012 @@ class MLService:
                 candidates.append(budgets)
             return candidates
 
-        np.random.seed(seed)
-        samples = np.random.dirichlet(np.ones(len(channels)), size=K)
-        candidates = []
+        budgets = MLService.generate_candidate_matrix(total_budget, channels, K=K, seed=seed, sampler=sampler)
+        return [
+            {ch: float(amount) for ch, amount in zip(channels, row)}
+            for row in budgets
+        ]
+
+    @staticmethod
+    def build_validation_matrix(encoder, n_requests: int = 8, rows_per_request: int = 64, seed: int = 7):
+        """Encoded candidate rows for a spread of synthetic requests"""
+        rng = np.random.RandomState(seed)
+        genders = list(encoder.one_hot_slots["gender"]) or ["all"]
+        incomes = list(encoder.one_hot_slots["income_level"]) or ["all"]
+        blocks = []
+        for _ in range(n_requests):
+            total_budget = float(np.round(rng.uniform(100, 100000), 2))
+            fractions = sample_simplex(rows_per_request, len(CHANNELS), rng)
+            blocks.append(encoder.encode(
+                total_budget, MLService.round_split_matrix(total_budget, fractions),
+                rng.uniform(5, 500), rng.uniform(0.1, 1.0), rng.randint(1, 91),
+                rng.uniform(0.05, 0.6), rng.randint(18, 70),
+                genders[rng.randint(len(genders))], incomes[rng.randint(len(incomes))]
+            ))
+        return np.vstack(blocks)
+
+    @staticmethod
+    def select_tree_engine(model, encoder):
+        """Compile the campaign model and pick the predict engine from ML_TREE_ENGINE"""
+        requested = settings.ML_TREE_ENGINE
+        try:
+            ensemble = CompiledTreeEnsemble.from_model(model)
+        except Exception as e:
+            logger.warning(f"Could not compile campaign model to the NumPy engine: {e}")
+            return None, "booster" if requested == "booster" else "native", None
+
+        X = np.vstack([MLService.build_validation_matrix(encoder), ensemble.threshold_probe_rows(256)])
+        validation = ensemble.validate(model, X)
+        if requested == "numpy" and not validation["exact"]:
+            logger.warning(f"NumPy tree engine disagrees with native predictor ({validation}), using native")
+            requested = "native"
+        logger.info(f"Campaign model tree engine: {requested} (validation {validation})")
+        return ensemble, requested, validation
+
+    @staticmethod
+    def predict_revenue(features):
+        """Predict revenue for an encoded feature matrix with the campaign model's engine"""
+        return current_campaign_model().predict(features)
+
+    @staticmethod
+    def predict_split_matrix(request: MLCampaignOptimizationRequest, splits):
+        """Predict revenue, ROI and per-tree values (None without a compiled ensemble) for a (K, 6) split matrix"""
+        features = MLService.build_features_matrix(
+            request.total_budget, splits, request.aov, request.creative_quality,
+            request.campaign_days, request.target_margin, request.age,
+            request.gender, request.income_level
+        )
+        pred_revenue, per_tree = current_campaign_model().predict_with_trees(features)
+        return pred_revenue, MLService.roi_from_revenue(request, pred_revenue), per_tree
+
+    @staticmethod
+    def roi_from_revenue(request: MLCampaignOptimizationRequest, pred_revenue):
+        """Predicted ROI for each predicted revenue under the request's total budget"""
+        if request.total_budget > 0:
+            return (pred_revenue - request.total_budget) / request.total_budget
+        return np.full(len(pred_revenue), -9999.0)
+
+    @staticmethod
+    def sweep_candidates(request: MLCampaignOptimizationRequest):
+        """Candidate split matrix for a single-pass sweep"""
+        K = request.samples_per_round or settings.ML_OPTIMIZER_CANDIDATES
+        return MLService.generate_candidate_matrix(
+            request.total_budget, CHANNELS, K=K, seed=request.seed, sampler=request.sampler,
+            bounds=MLService.split_bounds(request)
+        )
+
+    @staticmethod
+    def sweep_search(request: MLCampaignOptimizationRequest):
+        """Score a fixed set of uniform Dirichlet candidates in one pass"""
+        splits = MLService.sweep_candidates(request)
+        pred_revenue, pred_roi, per_tree = MLService.predict_split_matrix(request, splits)
+        stats = {"optimizer": "sweep", "sampler": request.sampler, "rounds": 1, "rows_evaluated": len(splits)}
+        return splits, pred_revenue, pred_roi, per_tree, stats
+
+    @staticmethod
+    def adaptive_search(request: MLCampaignOptimizationRequest):
+        """Cross-entropy search over the channel simplex, stopping once the best predicted ROI stops improving"""
+        n = request.samples_per_round or settings.ML_ADAPTIVE_SAMPLES_PER_ROUND
+        max_rounds = request.max_rounds or settings.ML_ADAPTIVE_MAX_ROUNDS
+        n_elite = max(2, int(np.ceil(n * settings.ML_ADAPTIVE_ELITE_FRACTION)))
+        rng = np.random.default_rng(request.seed)
+        bounds = MLService.split_bounds(request)
+        free = MLService.free_channel_count(bounds)
+
+        alpha = np.ones(free)
+        all_fractions, all_splits, all_revenue, all_roi, all_trees = [], [], [], [], []
+        best_roi = -np.inf
+        stale_rounds = 0
+        rounds = 0
+
+        for rounds in range(1, max_rounds + 1):
+            sampler = request.sampler if rounds == 1 else "dirichlet"
+            fractions = sample_simplex(n, free, rng, sampler=sampler, alpha=alpha)
+            splits = MLService.fractions_to_splits(request.total_budget, fractions, bounds)
+            pred_revenue, pred_roi, per_tree = MLService.predict_split_matrix(request, splits)
+            all_fractions.append(fractions)
+            all_splits.append(splits)
+            all_revenue.append(pred_revenue)
+            all_roi.append(np.where(np.isfinite(pred_roi), pred_roi, -np.inf))
+            all_trees.append(per_tree)
+
+            roi_so_far = np.concatenate(all_roi)
+            round_best = float(roi_so_far.max())
+            if round_best > best_roi + settings.ML_ADAPTIVE_TOLERANCE:
+                best_roi = round_best
+                stale_rounds = 0
+            else:
+                stale_rounds += 1
+                if stale_rounds >= settings.ML_ADAPTIVE_PATIENCE:
+                    break
+            if free <= 1:
+                break
+
+            # Refit the Dirichlet to the elites by matching mean and variance
+            elite_idx = np.argsort(roi_so_far)[::-1][:n_elite]
+            elite = np.concatenate(all_fractions)[elite_idx]
+            mean = np.clip(elite.mean(axis=0), 1e-3, None)
+            mean = mean / mean.sum()
+            var = elite.var(axis=0) + 1e-9
+            concentration = float(np.median(mean * (1 - mean) / var - 1))
+            concentration = min(max(concentration, free), settings.ML_ADAPTIVE_MAX_CONCENTRATION)
+            alpha = 0.7 * (mean * concentration) + 0.3 * alpha
+
+        splits = np.concatenate(all_splits)
+        stats = {"optimizer": "adaptive", "sampler": request.sampler, "rounds": rounds, "rows_evaluated": len(splits)}
+        per_tree = np.concatenate(all_trees, axis=1) if all_trees[0] is not None else None
+        return splits, np.concatenate(all_revenue), np.concatenate(all_roi), per_tree, stats
+
+    @staticmethod
+    def warm_start_inputs(request: MLCampaignOptimizationRequest) -> Dict[str, Any]:
+        """The request fields a warm start is compared on"""
+        return {name: getattr(request, name) for name in WARM_START_NUMERIC_FIELDS + WARM_START_EXACT_FIELDS}
+
+    @staticmethod
+    def input_drift(previous: Dict[str, Any], request: MLCampaignOptimizationRequest) -> float:
+        """Largest relative change of a numeric input; inf if a categorical input or constraint changed"""
+        current = MLService.warm_start_inputs(request)
+        for name in WARM_START_EXACT_FIELDS:
+            if name in previous and previous[name] != current[name]:
+                return float("inf")
+
+        drift = 0.0
+        for name in WARM_START_NUMERIC_FIELDS:
+            if previous.get(name) is None:
+                continue
+            old, new = float(previous[name]), float(current[name])
+            drift = max(drift, abs(new - old) / max(abs(old), 1e-9))
+        return drift
+
+    @staticmethod
+    def resolve_warm_start(request: MLCampaignOptimizationRequest) -> Optional[Tuple[Dict[str, float], float]]:
+        """(previous split, input drift) to search around, or None if a full search is needed"""
+        if request.warm_start is not None:
+            previous = (request.warm_start.inputs or {}, request.warm_start.recommended_split)
+        elif request.campaign_id:
+            previous = warm_start_cache.get(request.campaign_id)
+        else:
+            return None
+        if previous is None:
+            return None
+
+        inputs, split = previous
+        if sum(max(split.get(ch, 0.0), 0.0) for ch in CHANNELS) <= 0:
+            return None
+        drift = MLService.input_drift(inputs, request)
+        if drift > settings.ML_WARM_START_MAX_DRIFT:
+            return None
+        return split, drift
+
+    @staticmethod
+    def warm_start_search(request: MLCampaignOptimizationRequest, previous_split: Dict[str, float], drift: float):
+        """Score a small Dirichlet cloud centred on the previous split (plus the split itself)"""
+        bounds = MLService.split_bounds(request)
+        previous = np.array([max(previous_split.get(ch, 0.0), 0.0) for ch in CHANNELS])
+        if bounds is None:
+            free_mask = np.ones(len(CHANNELS), dtype=bool)
+        else:
+            free_mask = np.asarray(bounds[1]) > np.asarray(bounds[0])
+            # The sampler splits the slack above the lower bounds
+            previous = np.maximum(previous - np.asarray(bounds[0]), 0.0)
+
+        center = previous[free_mask]
+        free = len(center)
+        if free <= 1:
+            fractions = np.ones((1, free))
+        else:
+            center = center / center.sum() if center.sum() > 0 else np.full(free, 1.0 / free)
+            alpha = np.clip(center, 1e-3, None) * settings.ML_WARM_START_CONCENTRATION
+            rng = np.random.default_rng(request.seed)
+            K = max(2, settings.ML_WARM_START_CANDIDATES)
+            fractions = np.vstack([center[None, :], rng.dirichlet(alpha, size=K - 1)])
+
+        splits = MLService.fractions_to_splits(request.total_budget, fractions, bounds)
+        pred_revenue, pred_roi, per_tree = MLService.predict_split_matrix(request, splits)
+        stats = {"optimizer": "warm_start", "rounds": 1, "rows_evaluated": len(splits),
+                 "input_drift": round(drift, 4)}
+        return splits, pred_revenue, pred_roi, per_tree, stats
+
+    @staticmethod
+    def remember_warm_start(request: MLCampaignOptimizationRequest, result: MLCampaignOptimizationResponse) -> None:
+        """Store a campaign's latest split for the next warm start, anchored to the last full search"""
+        if not request.campaign_id:
+            return
+        inputs = MLService.warm_start_inputs(request)
+        if (result.search_stats or {}).get("optimizer") == "warm_start":
+            if request.warm_start is not None:
+                inputs = request.warm_start.inputs or inputs
+            else:
+                previous = warm_start_cache.get(request.campaign_id)
+                if previous is not None:
+                    inputs = previous[0]
+        warm_start_cache.set(request.campaign_id, (inputs, dict(result.recommended_split)))
+
+    @staticmethod
+    def revenue_interval(per_tree) -> Optional[Tuple[float, float]]:
+        """(lower, upper) predicted revenue from one row's per-tree values, shape (n_trees,), or None"""
+        ensemble = current_campaign_model().ensemble
+        if ensemble is None or per_tree is None:
+            return None
+        _, lower, upper = ensemble.prediction_interval(
+            per_tree[:, None], z=settings.ML_CONFIDENCE_Z, tail_fraction=settings.ML_CONFIDENCE_TAIL_FRACTION
+        )
+        return float(lower[0]), float(upper[0])
+
+    @staticmethod
+    def summarize_search(request: MLCampaignOptimizationRequest, splits, pred_revenue, pred_roi, per_tree,
+                         stats: Dict[str, Any]) -> Optional[MLCampaignOptimizationResponse]:
+        """Pick the best split from scored candidates, or None if nothing was scorable"""
+        valid = np.isfinite(pred_roi)
+        if not valid.any():
+            return None
+        pred_roi = np.where(valid, pred_roi, -np.inf)
+
+        # Get best candidate
+        best_idx = int(np.argmax(pred_roi))
+        best_revenue = float(pred_revenue[best_idx])
+        best_roi = float(pred_roi[best_idx])
+
+        # Confidence from how far the late trees still move the chosen prediction,
+        # read from the scoring pass's per-tree values; without a compiled ensemble,
+        # fall back to the spread of the top candidates. Both keep the 0.5 floor.
+        interval = MLService.revenue_interval(per_tree[:, best_idx] if per_tree is not None else None)
+        if interval is not None:
+            half_width = (interval[1] - interval[0]) / 2
+            confidence = max(0.5, 1.0 - half_width / max(abs(best_revenue), 1e-9))
+        else:
+            top_5_rois = np.sort(pred_roi[valid])[::-1][:5]
+            confidence = max(0.5, 1.0 - (float(np.std(top_5_rois)) * 2))
+
+        warning = None
+        if best_roi < 0:
+            warning = "⚠️ Model predicts this campaign may be unprofitable under given inputs."
+
+        return MLCampaignOptimizationResponse(
+            recommended_split={ch: float(amount) for ch, amount in zip(CHANNELS, splits[best_idx])},
+            predicted_revenue=round(best_revenue, 2),
+            predicted_revenue_lower=round(interval[0], 2) if interval else None,
+            predicted_revenue_upper=round(interval[1], 2) if interval else None,
+            predicted_roi=max(0.0, round(best_roi, 4)),
+            confidence_score=round(confidence, 2),
+            warning=warning,
+            search_stats=stats,
+            model_version=current_campaign_model().version
+        )
+
+    @staticmethod
+    def budget_bucket(total_budget: float, width: float):
+        """Log-spaced bucket of a positive budget; budgets in one bucket differ by a factor below 1 + width"""
+        if width <= 0:
+            return total_budget
+        return int(math.floor(math.log(total_budget) / math.log1p(width)))
 
-        for samp in samples:
-            budgets = {ch: round(float(total_budget * frac), 2) for ch, frac in zip(channels, samp)}
-            # Adjust for rounding errors
-            diff = round(total_budget - sum(budgets.values()), 2)
-            if abs(diff) >= 0.01:
-                largest = max(budgets, key=budgets.get)
-                budgets[largest] = round(budgets[largest] + diff, 2)
-            candidates.append(budgets)
+    @staticmethod
+    def optimizer_cache_key(request: MLCampaignOptimizationRequest) -> str:
+        """Canonical cache key: relative budget bucket, quantized AOV/age, exact other fields, model version"""
+        def quantize(value: float, step: float) -> float:
+            return round(round(value / step) * step, 6) if step > 0 else value
+
+        fields = request.model_dump(exclude={"campaign_id", "warm_start"})
+        # Absolute per-channel bounds do not survive rescaling to another budget
+        if not (request.channel_min or request.channel_max):
+            fields["total_budget"] = MLService.budget_bucket(
+                request.total_budget, settings.ML_OPTIMIZER_CACHE_BUDGET_BUCKET
+            )
+        fields["aov"] = quantize(request.aov, settings.ML_OPTIMIZER_CACHE_AOV_STEP)
+        fields["age"] = quantize(request.age, settings.ML_OPTIMIZER_CACHE_AGE_STEP)
+        fields["model_version"] = model_registry.active("campaign").version
+        return json.dumps(fields, sort_keys=True, default=str)
 
-        return candidates
+    @staticmethod
+    def check_model_file_changed() -> None:
+        """Hot-reload the campaign model in the background if its file changed on disk (event loop only)"""
+        global _last_model_file_check, _last_reload_fingerprint
+
+        bundle = model_registry.active("campaign")
+        now = time.monotonic()
+        if (not settings.ML_MODEL_AUTO_RELOAD or bundle is None
+                or now - _last_model_file_check < settings.ML_MODEL_FILE_CHECK_SECONDS):
+            return
+        _last_model_file_check = now
+
+        fingerprint = _file_fingerprint(bundle.path)
+        # Each new fingerprint is tried once, so a half-written file is retried when it changes again
+        if fingerprint is None or fingerprint in (bundle.fingerprint, _last_reload_fingerprint):
+            return
+        _last_reload_fingerprint = fingerprint
+        logger.info("Campaign model file changed on disk, reloading in the background")
+        schedule_background(reload_model("campaign", load_campaign_bundle, Path(bundle.path).parent))
+
+    @staticmethod
+    def rescale_cached_result(cached: MLCampaignOptimizationResponse, cached_budget: float,
+                              request: MLCampaignOptimizationRequest) -> MLCampaignOptimizationResponse:
+        """Reuse a cached optimization for a request in the same budget bucket, rescaled and marked approximate"""
+        search_stats = {**(cached.search_stats or {}), "cache": "hit"}
+        if cached_budget == request.total_budget:
+            return cached.model_copy(update={"search_stats": search_stats})
+
+        search_stats.update(cache="rescaled", cached_budget=cached_budget)
+
+        fractions = np.array([[cached.recommended_split[ch] for ch in CHANNELS]]) / cached_budget
+        split = MLService.round_split_matrix(request.total_budget, fractions)[0]
+        scale = request.total_budget / cached_budget
+        return cached.model_copy(update={
+            "recommended_split": {ch: float(amount) for ch, amount in zip(CHANNELS, split)},
+            "predicted_revenue": round(cached.predicted_revenue * scale, 2),
+            "predicted_revenue_lower": round(cached.predicted_revenue_lower * scale, 2)
+            if cached.predicted_revenue_lower is not None else None,
+            "predicted_revenue_upper": round(cached.predicted_revenue_upper * scale, 2)
+            if cached.predicted_revenue_upper is not None else None,
+            "search_stats": search_stats,
+            "approximate": True,
+        })
+
+    @staticmethod
+    def lookup_cached_optimization(request: MLCampaignOptimizationRequest):
+        """Return (cache_key, cached response or None); the key is None when caching is off"""
+        MLService.check_model_file_changed()
+        if not optimizer_cache.enabled or request.total_budget <= 0:
+            return None, None
+
+        cache_key = MLService.optimizer_cache_key(request)
+        cached = optimizer_cache.get(cache_key)
+        if cached is None:
+            return cache_key, None
+        return cache_key, MLService.rescale_cached_result(cached[0], cached[1], request)
 
     @staticmethod
     async def optimize_campaign_budget(request: MLCampaignOptimizationRequest) -> MLCampaignOptimizationResponse:
         """Optimize campaign budget allocation"""
-        global campaign_model, feature_columns
+        # Raises ValueError for infeasible channel constraints
+        MLService.split_bounds(request)
 
         # If ML is not available or model not loaded, use fallback logic
-        if not ML_AVAILABLE or not campaign_model or not feature_columns:
+        if not TABULAR_ML_AVAILABLE or model_registry.active("campaign") is None:
             return await MLService._optimize_campaign_budget_fallback(request)
 
+        cache_key, cached = MLService.lookup_cached_optimization(request)
+        if cached is not None:
+            MLService.remember_warm_start(request, cached)
+            return cached
+
         try:
-            channels = ["instagram", "google", "tiktok", "facebook", "youtube", "linkedin"]
-            candidates = MLService.generate_candidates(request.total_budget, channels, K=500)
-
-            # Score all candidates
-            scored = []
-            for cand in candidates:
-                try:
-                    feat_row = MLService.build_features_row(
-                        request.total_budget, cand, request.aov, request.creative_quality,
-                        request.campaign_days, request.target_margin, request.age,
-                        request.gender, request.income_level
-                    )
-                    pred_rev = float(campaign_model.predict(feat_row)[0])
-                    pred_roi = (pred_rev - request.total_budget) / request.total_budget if request.total_budget > 0 else -9999
-
-                    scored.append({
-                        "split": cand,
-                        "pred_revenue": pred_rev,
-                        "pred_roi": pred_roi
-                    })
-                except Exception as e:
-                    logger.warning(f"Error scoring candidate: {e}")
-                    continue
+            result = await run_inference(tree_executor, MLService.run_optimizer_search, request)
 
-            if not scored:
+            if result is None:
                 return await MLService._optimize_campaign_budget_fallback(request)
 
-            # Get best candidate
-            best = max(scored, key=lambda x: x["pred_roi"])
+            # Local warm-start results are not memoized for cold requests
+            if cache_key is not None and result.search_stats.get("optimizer") != "warm_start":
+                optimizer_cache.set(cache_key, (result, request.total_budget))
+            MLService.remember_warm_start(request, result)
+            return result
+        except Exception as e:
+            logger.error(f"Error in campaign optimization: {e}")
+            return await MLService._optimize_campaign_budget_fallback(request)
 
-            # Calculate confidence based on variance in top predictions
-            top_5_rois = sorted([s["pred_roi"] for s in scored], reverse=True)[:5]
-            confidence = max(0.5, 1.0 - (np.std(top_5_rois) * 2))
+    @staticmethod
+    def run_optimizer_search(request: MLCampaignOptimizationRequest) -> Optional[MLCampaignOptimizationResponse]:
+        """Blocking optimizer search; runs on the tree executor"""
+        warm_start = MLService.resolve_warm_start(request)
+        if warm_start is not None:
+            return MLService.summarize_search(request, *MLService.warm_start_search(request, *warm_start))
+        if request.optimizer == "adaptive":
+            return MLService.summarize_search(request, *MLService.adaptive_search(request))
+        return MLService.summarize_search(request, *MLService.sweep_search(request))
 
-            warning = None
-            if best["pred_roi"] < 0:
-                warning = "⚠️ Model predicts this campaign may be unprofitable under given inputs."
+    @staticmethod
+    async def optimize_campaign_budget_batch(items: List[Any]) -> MLCampaignOptimizationBatchResponse:
+        """Optimize many requests, stacking all sweep candidates into one predict pass"""
+        results: List[Optional[MLCampaignBatchItemResult]] = [None] * len(items)
+        requests: Dict[int, MLCampaignOptimizationRequest] = {}
+
+        for i, item in enumerate(items):
+            try:
+                requests[i] = item if isinstance(item, MLCampaignOptimizationRequest) \
+                    else MLCampaignOptimizationRequest(**item)
+            except Exception as e:
+                results[i] = MLCampaignBatchItemResult(index=i, success=False, error=str(e))
+
+        ml_ready = TABULAR_ML_AVAILABLE and model_registry.active("campaign") is not None
+        batched: Dict[int, tuple] = {}
+        individual: List[int] = []
+
+        for i, request in requests.items():
+            if not ml_ready or request.optimizer != "sweep" or request.campaign_id or request.warm_start:
+                individual.append(i)
+                continue
+            cache_key, cached = MLService.lookup_cached_optimization(request)
+            if cached is not None:
+                results[i] = MLCampaignBatchItemResult(index=i, success=True, result=cached)
+                continue
+            try:
+                batched[i] = (cache_key, MLService.sweep_candidates(request))
+            except Exception as e:
+                results[i] = MLCampaignBatchItemResult(index=i, success=False, error=str(e))
+
+        rows_evaluated = 0
+        if batched:
+            batch_requests = {i: requests[i] for i in batched}
+            batch_splits = {i: splits for i, (_, splits) in batched.items()}
+            try:
+                outcomes = await run_inference(tree_executor, MLService.run_batch_sweep, batch_requests, batch_splits)
+            except Exception as e:
+                logger.error(f"Error in batch campaign optimization: {e}")
+                outcomes = {i: e for i in batched}
+
+            for i, outcome in outcomes.items():
+                if isinstance(outcome, Exception):
+                    results[i] = MLCampaignBatchItemResult(index=i, success=False, error=str(outcome))
+                    continue
+                if outcome is None:
+                    outcome = await MLService._optimize_campaign_budget_fallback(requests[i])
+                else:
+                    rows_evaluated += outcome.search_stats["rows_evaluated"]
+                    if batched[i][0] is not None:
+                        optimizer_cache.set(batched[i][0], (outcome, requests[i].total_budget))
+                results[i] = MLCampaignBatchItemResult(index=i, success=True, result=outcome)
+
+        async def optimize_one(i: int) -> MLCampaignBatchItemResult:
+            try:
+                result = await MLService.optimize_campaign_budget(requests[i])
+                return MLCampaignBatchItemResult(index=i, success=True, result=result)
+            except Exception as e:
+                return MLCampaignBatchItemResult(index=i, success=False, error=str(e))
+
+        for item_result in await asyncio.gather(*(optimize_one(i) for i in individual)):
+            results[item_result.index] = item_result
+            if item_result.success and item_result.result.search_stats:
+                rows_evaluated += item_result.result.search_stats.get("rows_evaluated", 0)
+
+        return MLCampaignOptimizationBatchResponse(results=results, rows_evaluated=rows_evaluated)
 
-            return MLCampaignOptimizationResponse(
-                recommended_split=best["split"],
-                predicted_revenue=round(best["pred_revenue"], 2),
-                predicted_roi=max(0.0, round(best["pred_roi"], 4)),
-                confidence_score=round(confidence, 2),
-                warning=warning
-            )
+    @staticmethod
+    def run_batch_sweep(requests: Dict[int, MLCampaignOptimizationRequest], splits: Dict[int, Any]) -> Dict[int, Any]:
+        """Encode every item's candidates into one buffer and score them with a single predict"""
+        total_rows = sum(len(item_splits) for item_splits in splits.values())
+        features = current_campaign_model().encoder.allocate(total_rows)
+        offsets: Dict[int, tuple] = {}
+        outcomes: Dict[int, Any] = {}
+
+        row = 0
+        for i, request in requests.items():
+            end = row + len(splits[i])
+            try:
+                MLService.build_features_matrix(
+                    request.total_budget, splits[i], request.aov, request.creative_quality,
+                    request.campaign_days, request.target_margin, request.age,
+                    request.gender, request.income_level, out=features[row:end]
+                )
+                offsets[i] = (row, end)
+            except Exception as e:
+                features[row:end] = 0.0
+                outcomes[i] = e
+            row = end
+
+        model = current_campaign_model()
+        try:
+            pred_revenue, per_tree = model.predict_with_trees(features)
         except Exception as e:
-            logger.error(f"Error in campaign optimization: {e}")
-            return await MLService._optimize_campaign_budget_fallback(request)
+            # Score each item on its own so one bad item cannot fail its neighbours
+            logger.warning(f"Batched campaign predict failed, scoring items one at a time: {e}")
+            pred_revenue = per_tree = None
+
+        for i, (start, end) in offsets.items():
+            request = requests[i]
+            stats = {
+                "optimizer": "sweep", "sampler": request.sampler, "rounds": 1,
+                "rows_evaluated": end - start, "batched": pred_revenue is not None
+            }
+            try:
+                if pred_revenue is None:
+                    item_revenue, item_trees = model.predict_with_trees(features[start:end])
+                else:
+                    item_revenue = pred_revenue[start:end]
+                    item_trees = per_tree[:, start:end] if per_tree is not None else None
+                outcomes[i] = MLService.summarize_search(
+                    request, splits[i], item_revenue, MLService.roi_from_revenue(request, item_revenue),
+                    item_trees, stats
+                )
+            except Exception as e:
+                outcomes[i] = e
+        return outcomes
+
+    @staticmethod
+    def budget_levels(request: MLBudgetCurveRequest):
+        """Budget levels for a response curve, rounded to cents"""
+        low, high = sorted((request.min_budget, request.max_budget))
+        if request.spacing == "log":
+            levels = np.geomspace(low, high, request.levels)
+        else:
+            levels = np.linspace(low, high, request.levels)
+        return np.round(levels, 2)
+
+    @staticmethod
+    def curve_level_request(request: MLBudgetCurveRequest, total_budget: float) -> MLCampaignOptimizationRequest:
+        """The single-budget optimization request for one level of a response curve"""
+        return MLCampaignOptimizationRequest(
+            total_budget=total_budget, aov=request.aov, age=request.age, gender=request.gender,
+            income_level=request.income_level, creative_quality=request.creative_quality,
+            campaign_days=request.campaign_days, target_margin=request.target_margin,
+            excluded_channels=request.excluded_channels
+        )
+
+    @staticmethod
+    async def budget_response_curve(request: MLBudgetCurveRequest) -> MLBudgetCurveResponse:
+        """Predicted revenue/ROI curve across budget levels, each with its best split"""
+        # Raises ValueError for unknown or all-excluded channels
+        MLService.split_bounds(MLService.curve_level_request(request, request.max_budget))
+
+        if not TABULAR_ML_AVAILABLE or model_registry.active("campaign") is None:
+            return await MLService._budget_response_curve_fallback(request)
+
+        try:
+            return await run_inference(tree_executor, MLService.run_budget_curve, request)
+        except Exception as e:
+            logger.error(f"Error in budget response curve: {e}")
+            return await MLService._budget_response_curve_fallback(request)
+
+    @staticmethod
+    def run_budget_curve(request: MLBudgetCurveRequest) -> MLBudgetCurveResponse:
+        """Scale one shared set of simplex candidates to every budget level and score them in one pass"""
+        K = request.samples_per_level or settings.ML_OPTIMIZER_CANDIDATES
+        levels = MLService.budget_levels(request)
+        level_bounds = [
+            MLService.split_bounds(MLService.curve_level_request(request, float(total_budget)))
+            for total_budget in levels
+        ]
+        free = MLService.free_channel_count(level_bounds[0])
+        fractions = sample_simplex(K, free, np.random.RandomState(request.seed), sampler=request.sampler)
+
+        features = current_campaign_model().encoder.allocate(len(levels) * K)
+        splits = []
+        for i, total_budget in enumerate(levels):
+            level_splits = MLService.fractions_to_splits(float(total_budget), fractions, level_bounds[i])
+            MLService.build_features_matrix(
+                float(total_budget), level_splits, request.aov, request.creative_quality,
+                request.campaign_days, request.target_margin, request.age,
+                request.gender, request.income_level, out=features[i * K:(i + 1) * K]
+            )
+            splits.append(level_splits)
+
+        pred_revenue = MLService.predict_revenue(features).reshape(len(levels), K)
+        pred_roi = (pred_revenue - levels[:, None]) / levels[:, None]
+        pred_roi = np.where(np.isfinite(pred_roi), pred_roi, -np.inf)
+        best = np.argmax(pred_roi, axis=1)
+        best_revenue = pred_revenue[np.arange(len(levels)), best]
+
+        points = []
+        for i, total_budget in enumerate(levels):
+            marginal_roi = None
+            if i > 0 and levels[i] > levels[i - 1]:
+                marginal_roi = round(float(
+                    (best_revenue[i] - best_revenue[i - 1]) / (levels[i] - levels[i - 1]) - 1
+                ), 4)
+            points.append(MLBudgetCurvePoint(
+                total_budget=float(total_budget),
+                recommended_split={ch: float(amount) for ch, amount in zip(CHANNELS, splits[i][best[i]])},
+                predicted_revenue=round(float(best_revenue[i]), 2),
+                predicted_roi=round(float(pred_roi[i, best[i]]), 4),
+                marginal_roi=marginal_roi
+            ))
+
+        return MLBudgetCurveResponse(
+            points=points, rows_evaluated=int(pred_revenue.size), model_version=current_campaign_model().version
+        )
 
     @staticmethod
     async def score_creative_content(request: MLCreativeScoreRequest) -> MLCreativeScoreResponse:
         """Score creative content using DistilBERT and NLP models"""
-        global distilbert_model, distilbert_tokenizer
+        creative = model_registry.active("creative")
 
         # If DistilBERT model is not available, use fallback
-        if not ML_AVAILABLE or not distilbert_model or not distilbert_tokenizer:
+        if not ML_AVAILABLE or creative is None or creative.backend is None:
             return await MLService._score_creative_content_fallback(request)
 
+        cached = creative_cache.get(MLService.creative_cache_key(request, creative.version))
+        if cached is not None:
+            return cached.model_copy(update={"channel": request.channel})
+        approximate = MLService.find_near_duplicate(request, creative.version)
+        if approximate is not None:
+            return approximate
+        screened = MLService.cascade_screen(request)
+        if screened is not None:
+            return screened
+
         try:
             # Combine title and description for DistilBERT scoring
             combined_text = f"{request.title}. {request.description}. {request.cta}"
 
-            # Get DistilBERT prediction
-            inputs = distilbert_tokenizer(combined_text, truncation=True, padding=True, return_tensors="pt")
-            with torch.no_grad():
-                outputs = distilbert_model(**inputs)
-                probs = torch.softmax(outputs.logits, dim=-1).tolist()[0]
-
-            # Convert probabilities to score (3-8 scale)
-            expected_score = sum(DISTILBERT_LABEL_MAPPING[i] * prob for i, prob in enumerate(probs))
-            distilbert_score = min(10, max(1, expected_score * 1.25))  # Scale to 1-10
-
-            # Enhance with semantic analysis if available
-            semantic_boost = 0
-            if nlp_models.get('embedder'):
-                try:
-                    # Reference phrases for good marketing copy
-                    good_marketing_phrases = [
-                        "limited time offer", "exclusive deal", "act now", "save money",
-                        "premium quality", "satisfaction guaranteed", "free shipping",
-                        "best value", "top rated", "customer favorite"
-                    ]
-
-                    embeddings = nlp_models['embedder'].encode([combined_text] + good_marketing_phrases, convert_to_tensor=True)
-                    similarities = util.cos_sim(embeddings[0], embeddings[1:]).cpu().numpy()
-                    semantic_boost = float(np.max(similarities)) * 2  # Boost up to 2 points
-                except Exception as e:
-                    logger.warning(f"Error in semantic analysis: {e}")
-
-            # Final score calculation
-            final_score = min(10, max(1, distilbert_score + semantic_boost))
-
-            # Component scores (more granular breakdown)
-            title_score = min(10, max(1, len(request.title.split()) * 1.2 + semantic_boost))
-            desc_score = min(10, max(1, len(request.description.split()) * 0.6 + distilbert_score * 0.3))
-            cta_score = 8.0 if any(word in request.cta.lower() for word in ["buy", "shop", "get", "try", "now"]) else 6.0
-            channel_fit = distilbert_score * 0.8  # DistilBERT considers overall quality
-
-            # Generate feedback based on scores
-            feedback = []
-            improvements = {}
-
-            if title_score < 7:
-                feedback.append("Title could be more engaging - try adding urgency or emotional triggers")
-                improvements["title"] = MLService.generate_title_improvements(request.title, request.channel)
-
-            if desc_score < 7:
-                feedback.append("Description needs stronger call-to-action or more compelling benefits")
-                improvements["description"] = MLService.generate_description_improvements(request.description, request.channel)
-
-            if cta_score < 7:
-                feedback.append("Call-to-action could be more action-oriented and specific")
-                improvements["cta"] = MLService.generate_cta_improvements(request.cta, request.channel)
-
-            if final_score >= 8:
-                feedback.append("🎉 Excellent creative! This should perform very well.")
-            elif final_score >= 6:
-                feedback.append("Good creative with room for improvement.")
-            else:
-                feedback.append("Creative needs significant improvements for better performance.")
-
-            return MLCreativeScoreResponse(
-                channel=request.channel,
-                scores={
-                    "title": round(title_score, 1),
-                    "description": round(desc_score, 1),
-                    "cta": round(cta_score, 1),
-                    "channel_fit": round(channel_fit, 1),
-                    "final": round(final_score, 1)
-                },
-                feedback=feedback,
-                improvements=improvements
+            model_start = time.perf_counter()
+            distilbert_score, semantic_boost, model_version = await creative_batcher.submit(
+                (combined_text, request.channel, request.category)
+            )
+            MLService.record_model_latency(time.perf_counter() - model_start, 1)
+            response = MLService.build_creative_response(
+                request, distilbert_score, semantic_boost, model_version=model_version
             )
+            MLService.remember_creative_score(request, response, distilbert_score, semantic_boost)
+            return response
 
         except Exception as e:
             logger.error(f"Error in DistilBERT creative scoring: {e}")
             return await MLService._score_creative_content_fallback(request)
 
+    @staticmethod
+    async def score_creative_batch(items: List[Any]) -> MLCreativeScoreBatchResponse:
+        """Score many creatives in length-sorted padded batches; results come back in request order"""
+        start = time.perf_counter()
+        results: List[Optional[MLCreativeBatchItemResult]] = [None] * len(items)
+        requests: Dict[int, MLCreativeScoreRequest] = {}
+
+        for i, item in enumerate(items):
+            try:
+                requests[i] = item if isinstance(item, MLCreativeScoreRequest) else MLCreativeScoreRequest(**item)
+            except Exception as e:
+                results[i] = MLCreativeBatchItemResult(index=i, success=False, error=str(e))
+
+        creative = model_registry.active("creative")
+        ml_ready = ML_AVAILABLE and creative is not None and creative.backend is not None
+        pending: List[int] = []
+        cache_hits = near_duplicate_hits = cascade_resolved = 0
+        for i, request in requests.items():
+            cached = creative_cache.get(MLService.creative_cache_key(request, creative.version)) if ml_ready else None
+            if cached is not None:
+                results[i] = MLCreativeBatchItemResult(
+                    index=i, success=True, result=cached.model_copy(update={"channel": request.channel})
+                )
+                cache_hits += 1
+                continue
+            approximate = MLService.find_near_duplicate(request, creative.version) if ml_ready else None
+            if approximate is not None:
+                results[i] = MLCreativeBatchItemResult(index=i, success=True, result=approximate)
+                near_duplicate_hits += 1
+                continue
+            screened = MLService.cascade_screen(request) if ml_ready else None
+            if screened is not None:
+                results[i] = MLCreativeBatchItemResult(index=i, success=True, result=screened)
+                cascade_resolved += 1
+            else:
+                pending.append(i)
+
+        model_scored = 0
+        usage = {"batches": 0, "tokens": 0, "padded_tokens": 0, "signal_cache_hits": 0}
+        if ml_ready and pending:
+            try:
+                model_start = time.perf_counter()
+                signals, usage = await run_inference(
+                    transformer_executor, MLService.predict_creative_signals_sorted,
+                    [f"{requests[i].title}. {requests[i].description}. {requests[i].cta}" for i in pending],
+                    channels=[requests[i].channel for i in pending],
+                    categories=[requests[i].category for i in pending],
+                    chunk_size=settings.ML_CREATIVE_SCORE_BATCH_CHUNK
+                )
+                for i, (distilbert_score, semantic_boost) in zip(pending, signals):
+                    response = MLService.build_creative_response(
+                        requests[i], distilbert_score, semantic_boost, model_version=creative.version
+                    )
+                    MLService.remember_creative_score(requests[i], response, distilbert_score, semantic_boost)
+                    results[i] = MLCreativeBatchItemResult(index=i, success=True, result=response)
+                MLService.record_model_latency(time.perf_counter() - model_start, len(pending))
+                model_scored = len(pending)
+                pending = []
+            except Exception as e:
+                logger.error(f"Error in batch DistilBERT creative scoring: {e}")
+
+        for i in pending:
+            response = await MLService._score_creative_content_fallback(requests[i])
+            results[i] = MLCreativeBatchItemResult(index=i, success=True, result=response)
+
+        elapsed = time.perf_counter() - start
+        scored = len(requests)
+        return MLCreativeScoreBatchResponse(results=results, stats={
+            "items": len(items),
+            "invalid": len(items) - scored,
+            "cache_hits": cache_hits,
+            "near_duplicate_hits": near_duplicate_hits,
+            "cascade_resolved": cascade_resolved,
+            "model_scored": model_scored,
+            "fallback_scored": len(pending),
+            "model_batches": usage["batches"],
+            "tokens": usage["tokens"],
+            "padded_tokens": usage["padded_tokens"],
+            "signal_cache_hits": usage["signal_cache_hits"],
+            "model_version": creative.version if ml_ready else RULES_MODEL_VERSION,
+            "elapsed_seconds": round(elapsed, 4),
+            "creatives_per_second": round(scored / elapsed, 1) if elapsed > 0 else None,
+        })
+
+    @staticmethod
+    def length_buckets(lengths: List[int], chunk_size: int) -> List[List[int]]:
+        """Group item indices by token-length bucket, shortest first, in chunks of chunk_size"""
+        chunk_size = max(1, chunk_size)
+        buckets: Dict[int, List[int]] = {}
+        for i in sorted(range(len(lengths)), key=lambda i: lengths[i]):
+            bucket = next((b for b, edge in enumerate(CREATIVE_LENGTH_BUCKETS) if lengths[i] <= edge),
+                          len(CREATIVE_LENGTH_BUCKETS))
+            buckets.setdefault(bucket, []).append(i)
+        return [
+            indices[begin:begin + chunk_size]
+            for _, indices in sorted(buckets.items())
+            for begin in range(0, len(indices), chunk_size)
+        ]
+
+    @staticmethod
+    def predict_creative_signals_sorted(texts: List[str], channels: List[Optional[str]],
+                                        categories: List[Optional[str]], chunk_size: int = 32,
+                                        creative: Optional["CreativeModelBundle"] = None):
+        """(signals in input order, usage) for many creatives, padding only to similar lengths"""
+        creative = creative or current_creative_model()
+        usage = {"batches": 0, "tokens": 0, "padded_tokens": 0, "signal_cache_hits": 0}
+
+        keys = [MLService.creative_signal_key(text, creative.version) for text in texts]
+        cached: List[Optional[tuple]] = [creative_signal_cache.get(key) for key in keys]
+        usage["signal_cache_hits"] = sum(1 for entry in cached if entry is not None)
+        # One forward pass and one embedding per distinct uncached text, shared by its duplicates
+        missing_by_key: Dict[str, List[int]] = {}
+        for i, entry in enumerate(cached):
+            if entry is None:
+                missing_by_key.setdefault(keys[i], []).append(i)
+        missing = [indices[0] for indices in missing_by_key.values()]
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            encodings = creative.tokenizer(missing_texts, truncation=True, max_length=settings.ML_CREATIVE_MAX_LENGTH)
+            lengths = [len(ids) for ids in encodings["input_ids"]]
+            scores: List[Optional[float]] = [None] * len(missing)
+            for chunk in MLService.length_buckets(lengths, chunk_size):
+                chunk_scores = MLService.predict_distilbert_scores(
+                    creative=creative,
+                    encodings={key: [encodings[key][j] for j in chunk] for key in ("input_ids", "attention_mask")}
+                )
+                for j, score in zip(chunk, chunk_scores):
+                    scores[j] = score
+                chunk_lengths = [lengths[j] for j in chunk]
+                usage["batches"] += 1
+                usage["tokens"] += sum(chunk_lengths)
+                usage["padded_tokens"] += max(chunk_lengths) * len(chunk) - sum(chunk_lengths)
+
+            embeddings = MLService.embed_creatives(missing_texts, creative=creative)
+            for j, i in enumerate(missing):
+                entry = (scores[j], embeddings[j] if embeddings is not None else None)
+                creative_signal_cache.set(keys[i], entry)
+                for duplicate in missing_by_key[keys[i]]:
+                    cached[duplicate] = entry
+
+        boosts = MLService.semantic_boosts([embedding for _, embedding in cached], channels, categories, creative)
+        return [(score, boost) for (score, _), boost in zip(cached, boosts)], usage
+
+    @staticmethod
+    def record_token_usage(attention_mask) -> None:
+        """Add one forward pass's real and padding token counts to the running totals"""
+        mask = np.asarray(attention_mask)
+        real = int(mask.sum())
+        with _token_usage_lock:
+            _token_usage["forward_passes"] += 1
+            _token_usage["sequences"] += int(mask.shape[0])
+            _token_usage["tokens"] += real
+            _token_usage["padded_tokens"] += int(mask.size) - real
+            _token_usage["truncated_sequences"] += int((mask.sum(axis=1) >= settings.ML_CREATIVE_MAX_LENGTH).sum())
+
+    @staticmethod
+    def token_usage_stats() -> Dict[str, Any]:
+        with _token_usage_lock:
+            usage = dict(_token_usage)
+        total = usage["tokens"] + usage["padded_tokens"]
+        usage["padding_ratio"] = round(usage["padded_tokens"] / total, 4) if total else 0.0
+        usage["max_length"] = settings.ML_CREATIVE_MAX_LENGTH
+        usage["length_buckets"] = CREATIVE_LENGTH_BUCKETS
+        return usage
+
+    @staticmethod
+    def creative_cache_key(request: MLCreativeScoreRequest, model_version: str) -> str:
+        """Whitespace-normalized creative fields, channel and category (case-folded), model version"""
+        def normalize(text: Optional[str]) -> str:
+            return " ".join((text or "").split())
+
+        return json.dumps([
+            normalize(request.channel).lower(), normalize(request.category).lower(),
+            normalize(request.title), normalize(request.description), normalize(request.cta),
+            model_version
+        ])
+
+    @staticmethod
+    def creative_fingerprint(request: MLCreativeScoreRequest, model_version: str):
+        """(scope, SimHash) of a creative for the near-duplicate index"""
+        scope = (
+            " ".join((request.channel or "").split()).lower(),
+            " ".join((request.category or "").split()).lower(),
+            model_version
+        )
+        return scope, simhash(f"{request.title} {request.description} {request.cta}")
+
+    @staticmethod
+    def find_near_duplicate(request: MLCreativeScoreRequest, model_version: str) -> Optional[MLCreativeScoreResponse]:
+        """Response from a near-duplicate's model signals and this request's text, marked approximate, or None"""
+        if not creative_near_duplicates.enabled or request.full_precision:
+            return None
+        match = creative_near_duplicates.get(*MLService.creative_fingerprint(request, model_version))
+        if match is None:
+            return None
+        (distilbert_score, semantic_boost), distance = match
+        response = MLService.build_creative_response(
+            request, distilbert_score, semantic_boost, model_version=model_version
+        )
+        return response.model_copy(update={"approximate": True, "near_duplicate_distance": distance})
+
+    @staticmethod
+    def remember_creative_score(request: MLCreativeScoreRequest, response: MLCreativeScoreResponse,
+                                distilbert_score: float, semantic_boost: float) -> None:
+        """Put a model-computed response in the exact cache and its model signals in the near-duplicate index"""
+        creative_cache.set(MLService.creative_cache_key(request, response.model_version), response)
+        if creative_near_duplicates.enabled:
+            scope, fingerprint = MLService.creative_fingerprint(request, response.model_version)
+            creative_near_duplicates.set(scope, fingerprint, (distilbert_score, semantic_boost))
+
+    @staticmethod
+    def creative_signal_key(combined_text: str, model_version: str) -> str:
+        """Cache key of a combined creative text's DistilBERT score"""
+        return f"{model_version}:{hashlib.sha256(combined_text.encode('utf-8')).hexdigest()}"
+
+    @staticmethod
+    def predict_creative_signals(combined_text: str, creative: Optional["CreativeModelBundle"] = None,
+                                 channel: Optional[str] = None, category: Optional[str] = None):
+        """Run DistilBERT and the semantic embedder on one creative; runs on the transformer executor"""
+        return MLService.predict_creative_signals_batch(
+            [combined_text], creative=creative, channels=[channel], categories=[category]
+        )[0]
+
+    @staticmethod
+    def predict_creative_signals_batch(texts: List[str], creative: Optional["CreativeModelBundle"] = None,
+                                       channels: Optional[List[Optional[str]]] = None,
+                                       categories: Optional[List[Optional[str]]] = None):
+        """(distilbert_score, semantic_boost) per text from one padded forward pass of each model, without caching"""
+        creative = creative or current_creative_model()
+        distilbert_scores = MLService.predict_distilbert_scores(texts, creative=creative)
+        embeddings = MLService.embed_creatives(texts, creative=creative)
+        boosts = MLService.semantic_boosts(
+            list(embeddings) if embeddings is not None else [None] * len(texts), channels, categories, creative
+        )
+        return list(zip(distilbert_scores, boosts))
+
+    @staticmethod
+    def predict_distilbert_scores(texts: Optional[List[str]] = None, creative: Optional["CreativeModelBundle"] = None,
+                                  encodings: Optional[Dict[str, List[List[int]]]] = None) -> List[float]:
+        """DistilBERT score (1-10) per text, or per pre-tokenized encoding, from one padded forward pass"""
+        creative = creative or current_creative_model()
+        if encodings is None:
+            inputs = creative.tokenizer(
+                texts, truncation=True, max_length=settings.ML_CREATIVE_MAX_LENGTH, padding=True, return_tensors="pt"
+            )
+        else:
+            inputs = creative.tokenizer.pad(encodings, padding=True, return_tensors="pt")
+        MLService.record_token_usage(inputs["attention_mask"])
+        probs = creative.backend.predict_proba(inputs)
+
+        # Convert probabilities to score (3-8 scale)
+        label_values = np.array([DISTILBERT_LABEL_MAPPING[i] for i in range(probs.shape[1])], dtype=np.float64)
+        expected_scores = probs @ label_values
+        return [min(10, max(1, float(score) * 1.25)) for score in expected_scores]  # Scale to 1-10
+
+    @staticmethod
+    def embed_creatives(texts: List[str], creative: Optional["CreativeModelBundle"] = None):
+        """Normalized embedding per combined creative text, or None without an embedder / phrase bank"""
+        creative = creative or current_creative_model()
+        if creative.embedder is None or creative.phrase_bank is None:
+            return None
+        try:
+            return np.asarray(
+                creative.embedder.encode(list(texts), normalize_embeddings=True, convert_to_numpy=True),
+                dtype=np.float32
+            )
+        except Exception as e:
+            logger.warning(f"Error in semantic analysis: {e}")
+            return None
+
+    @staticmethod
+    def semantic_boosts(embeddings: List[Optional["np.ndarray"]], channels: Optional[List[Optional[str]]] = None,
+                        categories: Optional[List[Optional[str]]] = None,
+                        creative: Optional["CreativeModelBundle"] = None) -> List[float]:
+        """Semantic boost (0-2 points) per creative from its text embedding; 0 where there is none"""
+        creative = creative or current_creative_model()
+        boosts = [0] * len(embeddings)
+        rows = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+        if not rows or creative.phrase_bank is None:
+            return boosts
+        try:
+            n = len(embeddings)
+            channels, categories = channels or [None] * n, categories or [None] * n
+            # Only the creatives are encoded; the reference phrases were embedded at load time
+            similarities = creative.phrase_bank.best_similarity(
+                np.stack([embeddings[i] for i in rows]), [channels[i] for i in rows], [categories[i] for i in rows]
+            )
+            for i, best in zip(rows, similarities):
+                boosts[i] = float(best) * 2  # Boost up to 2 points
+        except Exception as e:
+            logger.warning(f"Error in semantic analysis: {e}")
+        return boosts
+
+    @staticmethod
+    async def _score_creative_batch(items: List[tuple]) -> List[tuple]:
+        """Micro-batcher callback: one executor job for all queued (text, channel, category) items"""
+        creative = model_registry.active("creative")
+        texts, channels, categories = (list(column) for column in zip(*items))
+        signals, _ = await run_inference(
+            transformer_executor, MLService.predict_creative_signals_sorted, texts, channels, categories,
+            chunk_size=creative_batcher.max_batch_size
+        )
+        return [(distilbert_score, semantic_boost, creative.version) for distilbert_score, semantic_boost in signals]
+
+    @staticmethod
+    def creative_field_features(field: str, text: str, channel: str) -> Dict[str, Any]:
+        """One creative field's part of its component score and its suggestions"""
+        if field == "title":
+            features = {"score": len(text.split()) * 1.2,
+                        "improvements": MLService.generate_title_improvements(text, channel)}
+        elif field == "description":
+            features = {"score": len(text.split()) * 0.6,
+                        "improvements": MLService.generate_description_improvements(text, channel)}
+        else:
+            has_action = creative_lexicon.scan(text).distinct("cta_action") > 0
+            features = {"score": 8.0 if has_action else 6.0,
+                        "improvements": MLService.generate_cta_improvements(text, channel)}
+        return features
+
+    @staticmethod
+    def build_creative_response(request: MLCreativeScoreRequest, distilbert_score: float,
+                                semantic_boost: float, model_version: Optional[str] = None) -> MLCreativeScoreResponse:
+        """Turn model signals into component scores, feedback and improvements"""
+        # Final score calculation
+        final_score = min(10, max(1, distilbert_score + semantic_boost))
+
+        # Component scores (more granular breakdown)
+        title = MLService.creative_field_features("title", request.title, request.channel)
+        description = MLService.creative_field_features("description", request.description, request.channel)
+        cta = MLService.creative_field_features("cta", request.cta, request.channel)
+        title_score = min(10, max(1, title["score"] + semantic_boost))
+        desc_score = min(10, max(1, description["score"] + distilbert_score * 0.3))
+        cta_score = cta["score"]
+        channel_fit = distilbert_score * 0.8  # DistilBERT considers overall quality
+
+        # Generate feedback based on scores
+        feedback = []
+        improvements = {}
+
+        if title_score < 7:
+            feedback.append("Title could be more engaging - try adding urgency or emotional triggers")
+            improvements["title"] = list(title["improvements"])
+
+        if desc_score < 7:
+            feedback.append("Description needs stronger call-to-action or more compelling benefits")
+            improvements["description"] = list(description["improvements"])
+
+        if cta_score < 7:
+            feedback.append("Call-to-action could be more action-oriented and specific")
+            improvements["cta"] = list(cta["improvements"])
+
+        if final_score >= 8:
+            feedback.append("🎉 Excellent creative! This should perform very well.")
+        elif final_score >= 6:
+            feedback.append("Good creative with room for improvement.")
+        else:
+            feedback.append("Creative needs significant improvements for better performance.")
+
+        return MLCreativeScoreResponse(
+            channel=request.channel,
+            scores={
+                "title": round(title_score, 1),
+                "description": round(desc_score, 1),
+                "cta": round(cta_score, 1),
+                "channel_fit": round(channel_fit, 1),
+                "final": round(final_score, 1)
+            },
+            feedback=feedback,
+            improvements=improvements,
+            model_version=model_version,
+            scorer="model"
+        )
+
     @staticmethod
     def generate_title_improvements(title: str, channel: str) -> List[str]:
         """Generate title improvement suggestions"""
@@ -439,7 +1791,7 @@ class MLService:
         logger.info("Using fallback campaign optimization logic")
 
         # Simple rule-based budget allocation
-        channels = ["instagram", "google", "tiktok", "facebook", "youtube", "linkedin"]
+        channels = CAMPAIGN_CHANNELS
 
         # Base allocation weights based on general performance
         weights = {
@@ -463,6 +1815,10 @@ class MLService:
         for channel in channels:
             recommended_split[channel] = round(request.total_budget * weights.get(channel, 0), 2)
 
+        bounds = MLService.split_bounds(request)
+        if bounds is not None:
+            recommended_split = MLService._constrain_split_fallback(request.total_budget, weights, bounds)
+
         # Simple revenue prediction (2.5x multiplier)
         predicted_revenue = request.total_budget * 2.5
         predicted_roi = 1.5  # 150% ROI
@@ -472,18 +1828,76 @@ class MLService:
             predicted_revenue=predicted_revenue,
             predicted_roi=predicted_roi,
             confidence_score=0.6,  # Lower confidence for fallback
-           
+            model_version=RULES_MODEL_VERSION
         )
 
+    @staticmethod
+    def _constrain_split_fallback(total_budget: float, weights: Dict[str, float],
+                                  bounds: Tuple[List[float], List[float]]) -> Dict[str, float]:
+        """Pure-Python version of bounded_allocations for the rule-based optimizer"""
+        lower, upper = bounds
+        free = [i for i, ch in enumerate(CAMPAIGN_CHANNELS) if upper[i] > lower[i]]
+        free_weight = sum(max(weights.get(CAMPAIGN_CHANNELS[i], 0), 0) for i in free)
+        slack = total_budget - sum(lower)
+
+        split = list(lower)
+        for i in free:
+            share = weights.get(CAMPAIGN_CHANNELS[i], 0) / free_weight if free_weight > 0 else 1 / len(free)
+            split[i] += slack * share
+
+        for _ in range(len(free)):
+            excess = sum(max(split[i] - upper[i], 0) for i in free)
+            if excess <= 1e-9:
+                break
+            split = [min(x, high) for x, high in zip(split, upper)]
+            room = [upper[i] - split[i] for i in free]
+            room_total = sum(room)
+            for i, r in zip(free, room):
+                split[i] += excess * r / room_total if room_total > 0 else 0
+
+        return {ch: round(amount, 2) for ch, amount in zip(CAMPAIGN_CHANNELS, split)}
+
+    @staticmethod
+    async def _budget_response_curve_fallback(request: MLBudgetCurveRequest) -> MLBudgetCurveResponse:
+        """Fallback response curve built from the rule-based optimizer at each level"""
+        low, high = sorted((request.min_budget, request.max_budget))
+        step = (high - low) / (request.levels - 1)
+        points = []
+        previous = None
+        for i in range(request.levels):
+            if request.spacing == "log":
+                total_budget = round(low * (high / low) ** (i / (request.levels - 1)), 2)
+            else:
+                total_budget = round(low + step * i, 2)
+            result = await MLService._optimize_campaign_budget_fallback(
+                MLService.curve_level_request(request, total_budget)
+            )
+            marginal_roi = None
+            if previous is not None and total_budget > previous[0]:
+                marginal_roi = round((result.predicted_revenue - previous[1]) / (total_budget - previous[0]) - 1, 4)
+            points.append(MLBudgetCurvePoint(
+                total_budget=total_budget,
+                recommended_split=result.recommended_split,
+                predicted_revenue=result.predicted_revenue,
+                predicted_roi=result.predicted_roi,
+                marginal_roi=marginal_roi
+            ))
+            previous = (total_budget, result.predicted_revenue)
+        return MLBudgetCurveResponse(points=points, rows_evaluated=0, fallback=True, model_version=RULES_MODEL_VERSION)
+
     @staticmethod
     async def _score_creative_content_fallback(request: MLCreativeScoreRequest) -> MLCreativeScoreResponse:
         """Fallback creative scoring using simple rules"""
         logger.info("Using fallback creative scoring logic")
+        return MLService.score_creative_rules(request)
 
+    @staticmethod
+    def score_creative_rules(request: MLCreativeScoreRequest) -> MLCreativeScoreResponse:
+        """Rule-based creative score (the fallback scorer and the first stage of cascade scoring)"""
         # Simple rule-based scoring
         title_score = min(10, max(1, len(request.title.split()) * 1.5))
         desc_score = min(10, max(1, len(request.description.split()) * 0.5))
-        cta_score = 8.0 if any(word in request.cta.lower() for word in ["buy", "shop", "get", "try"]) else 5.0
+        cta_score = 8.0 if creative_lexicon.scan(request.cta).distinct("action") else 5.0
 
         return MLCreativeScoreResponse(
             channel=request.channel,
@@ -502,19 +1916,96 @@ class MLService:
                 "title": [f"{request.title} - Limited Time Offer!"],
                 "description": [f"{request.description} Shop now and save!"],
                 "cta": ["Shop Now", "Get Yours Today", "Buy Now"]
-            }
+            },
+            scorer="rules",
+            model_version=RULES_MODEL_VERSION
         )
 
+    @staticmethod
+    def cascade_screen(request: MLCreativeScoreRequest) -> Optional[MLCreativeScoreResponse]:
+        """In cascade mode, the rule-based score if it is outside the uncertainty band; None means run the models"""
+        if not settings.ML_CREATIVE_CASCADE:
+            return None
+        if request.full_precision:
+            with _cascade_lock:
+                _cascade_stats["requests"] += 1
+                _cascade_stats["escalated_full_precision"] += 1
+            return None
+
+        start = time.perf_counter()
+        response = MLService.score_creative_rules(request)
+        uncertain = settings.ML_CREATIVE_CASCADE_LOW <= response.scores["final"] <= settings.ML_CREATIVE_CASCADE_HIGH
+        with _cascade_lock:
+            _cascade_stats["requests"] += 1
+            _cascade_stats["escalated_band" if uncertain else "resolved_by_rules"] += 1
+            _cascade_stats["rules_seconds"] += time.perf_counter() - start
+        return None if uncertain else response
+
+    @staticmethod
+    def record_model_latency(seconds: float, items: int) -> None:
+        """Add a model scoring call (per-request or per-batch wall time) to the running totals"""
+        with _cascade_lock:
+            _cascade_stats["model_seconds"] += seconds
+            _cascade_stats["model_items"] += items
+
+    @staticmethod
+    def cascade_stats() -> Dict[str, Any]:
+        """Escalation rate and an estimate of the model time saved by answering with the rules"""
+        with _cascade_lock:
+            stats = dict(_cascade_stats)
+        screened = stats["resolved_by_rules"] + stats["escalated_band"]
+        escalated = stats["escalated_band"] + stats["escalated_full_precision"]
+        mean_model = stats["model_seconds"] / stats["model_items"] if stats["model_items"] else 0.0
+        mean_rules = stats["rules_seconds"] / screened if screened else 0.0
+        return {
+            "enabled": settings.ML_CREATIVE_CASCADE,
+            "uncertainty_band": [settings.ML_CREATIVE_CASCADE_LOW, settings.ML_CREATIVE_CASCADE_HIGH],
+            "requests": stats["requests"],
+            "resolved_by_rules": stats["resolved_by_rules"],
+            "escalated_band": stats["escalated_band"],
+            "escalated_full_precision": stats["escalated_full_precision"],
+            "escalation_rate": round(escalated / stats["requests"], 4) if stats["requests"] else 0.0,
+            "mean_rules_ms": round(mean_rules * 1000, 4),
+            "mean_model_ms_per_creative": round(mean_model * 1000, 3),
+            "estimated_latency_saved_seconds": round(
+                stats["resolved_by_rules"] * mean_model - stats["rules_seconds"], 4
+            ),
+        }
+
     @staticmethod
     async def health_check() -> Dict[str, Any]:
         """Check ML service health"""
+        campaign = model_registry.active("campaign")
+        creative = model_registry.active("creative")
+        distilbert_loaded = creative is not None and creative.backend is not None
         return {
             "ml_dependencies_available": ML_AVAILABLE,
-            "campaign_model_loaded": campaign_model is not None,
-            "feature_columns_loaded": feature_columns is not None,
-            "distilbert_model_loaded": distilbert_model is not None,
-            "nlp_embedder_loaded": nlp_models.get('embedder') is not None,
-            "nlp_paraphraser_loaded": nlp_models.get('paraphraser') is not None,
-            "models_loaded": (campaign_model is not None and distilbert_model is not None),
-            "fallback_mode": not ML_AVAILABLE or campaign_model is None or distilbert_model is None
+            "tabular_ml_dependencies_available": TABULAR_ML_AVAILABLE,
+            "campaign_model_loaded": campaign is not None,
+            "campaign_model_version": campaign.version if campaign else None,
+            "campaign_tree_engine": campaign.engine if campaign else None,
+            "campaign_tree_engine_validation": campaign.validation if campaign else None,
+            "feature_columns_loaded": campaign is not None,
+            "distilbert_model_loaded": distilbert_loaded,
+            "creative_model_version": creative.version if creative else None,
+            "creative_backend": creative.backend.name if creative and creative.backend else None,
+            "creative_batching": creative_batcher.stats(),
+            "creative_tokens": MLService.token_usage_stats(),
+            "creative_cascade": MLService.cascade_stats(),
+            "nlp_embedder_loaded": creative is not None and creative.embedder is not None,
+            "nlp_paraphraser_loaded": False,
+            "models_loaded": campaign is not None and distilbert_loaded,
+            "fallback_mode": not ML_AVAILABLE or campaign is None or not distilbert_loaded,
+            "models": model_registry.status(),
+            "caches": {
+                "optimizer": optimizer_cache.stats(),
+                "warm_start": warm_start_cache.stats(),
+                "creative": creative_cache.stats(),
+                "creative_near_duplicates": creative_near_duplicates.stats(),
+                "creative_signals": creative_signal_cache.stats()
+            },
+            "executors": {
+                "tree_workers": settings.ML_TREE_WORKERS,
+                "transformer_workers": settings.ML_TRANSFORMER_WORKERS
+            }
         }
\ No newline at end of file
@@ -0,0 +1,133 @@
+import os
+import json
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Reference phrases for good marketing copy; every creative is compared against these
+DEFAULT_PHRASES = [
+    "limited time offer", "exclusive deal", "act now", "save money",
+    "premium quality", "satisfaction guaranteed", "free shipping",
+    "best value", "top rated", "customer favorite"
+]
+
+DEFAULT_BANK = "default"
+
+
+def bank_key(kind: str, name: str) -> str:
+    """Key of a per-channel ("channel") or per-category ("category") bank"""
+    return f"{kind}:{str(name).strip().lower()}"
+
+
+def load_phrase_definitions(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """Bank key -> phrases: the default bank plus any banks defined in a JSON file.
+
+    The file looks like {"channels": {"tiktok": [...]}, "categories": {"fashion": [...]}}.
+    A missing or unreadable file only leaves the default bank.
+    """
+    definitions = {DEFAULT_BANK: list(DEFAULT_PHRASES)}
+    if not path:
+        return definitions
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read phrase banks from {path}: {e}")
+        return definitions
+
+    for kind, section in (("channel", "channels"), ("category", "categories")):
+        for name, phrases in (data.get(section) or {}).items():
+            phrases = [str(p) for p in phrases if str(p).strip()]
+            if phrases:
+                definitions[bank_key(kind, name)] = phrases
+    return definitions
+
+
+class PhraseBank:
+    """Normalized reference-phrase embeddings, one matrix per bank.
+
+    Matrices are computed once per embedder and phrase list, saved as .npy
+    files named after a hash of both, and memory-mapped on later loads, so a
+    restart (or a second worker process) does not re-encode anything. Scoring
+    a creative is then one encode of its text plus a dot product per bank.
+    """
+
+    def __init__(self, embedder_name: str, matrices: Dict[str, "np.ndarray"],
+                 phrases: Dict[str, List[str]], sources: Dict[str, str]):
+        self.embedder_name = embedder_name
+        self.matrices = matrices
+        self.phrases = phrases
+        self.sources = sources
+
+    @staticmethod
+    def _file_name(key: str, embedder_name: str, phrases: List[str]) -> str:
+        digest = hashlib.sha256("\n".join([embedder_name] + phrases).encode("utf-8")).hexdigest()[:12]
+        safe_key = "".join(c if c.isalnum() or c in "-_" else "_" for c in key)
+        return f"{safe_key}-{digest}.npy"
+
+    @classmethod
+    def build(cls, embedder, embedder_name: str, definitions: Dict[str, List[str]],
+              cache_dir: Optional[str] = None) -> "PhraseBank":
+        """Load each bank from `cache_dir` if present, otherwise encode and save it"""
+        directory = os.path.join(cache_dir, embedder_name) if cache_dir else None
+        matrices, sources = {}, {}
+        for key, phrases in definitions.items():
+            path = os.path.join(directory, cls._file_name(key, embedder_name, phrases)) if directory else None
+            if path and os.path.exists(path):
+                try:
+                    matrices[key] = np.load(path, mmap_mode="r")
+                    sources[key] = "mmap"
+                    continue
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring unreadable phrase bank {path}: {e}")
+
+            matrix = np.asarray(
+                embedder.encode(phrases, normalize_embeddings=True, convert_to_numpy=True), dtype=np.float32
+            )
+            matrices[key], sources[key] = matrix, "encoded"
+            if path:
+                try:
+                    os.makedirs(directory, exist_ok=True)
+                    tmp_path = f"{path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "wb") as f:
+                        np.save(f, matrix)
+                    os.replace(tmp_path, path)
+                    matrices[key] = np.load(path, mmap_mode="r")
+                except OSError as e:
+                    logger.warning(f"Could not persist phrase bank '{key}' to {path}: {e}")
+
+        return cls(embedder_name, matrices, {k: list(v) for k, v in definitions.items()}, sources)
+
+    def keys_for(self, channel: Optional[str] = None, category: Optional[str] = None) -> List[str]:
+        """Banks that apply to a creative: the default one plus its channel and category banks if defined"""
+        keys = [DEFAULT_BANK]
+        for kind, name in (("channel", channel), ("category", category)):
+            if name and bank_key(kind, name) in self.matrices:
+                keys.append(bank_key(kind, name))
+        return keys
+
+    def best_similarity(self, embeddings: "np.ndarray", channels: Optional[Sequence[Optional[str]]] = None,
+                        categories: Optional[Sequence[Optional[str]]] = None) -> "np.ndarray":
+        """Highest cosine similarity of each (normalized) text embedding to any phrase in its banks"""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        best = (embeddings @ self.matrices[DEFAULT_BANK].T).max(axis=1)
+        if len(self.matrices) == 1:
+            return best
+
+        n = len(embeddings)
+        channels = channels or [None] * n
+        categories = categories or [None] * n
+        for i in range(n):
+            for key in self.keys_for(channels[i], categories[i])[1:]:
+                best[i] = max(best[i], float((self.matrices[key] @ embeddings[i]).max()))
+        return best
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            key: {"phrases": len(self.phrases[key]), "source": self.sources[key]}
+            for key in self.matrices
+        }
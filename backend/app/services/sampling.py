@@ -0,0 +1,141 @@
+from typing import Optional
+
+import numpy as np
+
+# Primitive polynomial parameters (degree s, coefficients a, initial m_i) for Sobol
+# dimensions 2..10, from Joe & Kuo's new-joe-kuo-6.21201 table. Dimension 1 is the
+# van der Corput sequence. Nine extra dimensions cover the 6-channel simplex with room.
+_SOBOL_PARAMS = [
+    (1, 0, [1]),
+    (2, 1, [1, 3]),
+    (3, 1, [1, 3, 1]),
+    (3, 2, [1, 1, 1]),
+    (4, 1, [1, 1, 3, 3]),
+    (4, 4, [1, 3, 5, 13]),
+    (5, 2, [1, 1, 5, 5, 17]),
+    (5, 4, [1, 1, 5, 5, 5]),
+    (5, 7, [1, 1, 7, 11, 19]),
+]
+_SOBOL_BITS = 32
+_SOBOL_MAX_DIM = len(_SOBOL_PARAMS) + 1
+
+SAMPLERS = ("dirichlet", "sobol")
+
+
+def _sobol_direction_numbers(dim: int) -> "np.ndarray":
+    """Direction numbers V[j, k] for the first `dim` Sobol dimensions"""
+    directions = np.zeros((dim, _SOBOL_BITS), dtype=np.uint64)
+    directions[0] = [1 << (_SOBOL_BITS - 1 - k) for k in range(_SOBOL_BITS)]
+
+    for j in range(1, dim):
+        s, a, m = _SOBOL_PARAMS[j - 1]
+        v = [m[k] << (_SOBOL_BITS - 1 - k) for k in range(s)]
+        for k in range(s, _SOBOL_BITS):
+            value = v[k - s] ^ (v[k - s] >> s)
+            for i in range(1, s):
+                if (a >> (s - 1 - i)) & 1:
+                    value ^= v[k - i]
+            v.append(value)
+        directions[j] = v
+
+    return directions
+
+
+_SOBOL_DIRECTIONS = _sobol_direction_numbers(_SOBOL_MAX_DIM)
+
+
+def _scramble_directions(directions: "np.ndarray", rng) -> "np.ndarray":
+    """Linear matrix scramble: multiply each dimension's direction numbers by a random
+    unit lower-triangular binary matrix (mod 2), as in Matousek (1998)"""
+    dim = len(directions)
+    shifts = np.arange(_SOBOL_BITS - 1, -1, -1, dtype=np.uint64)
+    # bits[j, k, r] is bit r (most significant first) of direction number k of dimension j
+    bits = ((directions[:, :, None] >> shifts) & np.uint64(1)).astype(np.int64)
+    lower = np.tril(rng.uniform(size=(dim, _SOBOL_BITS, _SOBOL_BITS)) < 0.5, -1).astype(np.int64)
+    lower += np.eye(_SOBOL_BITS, dtype=np.int64)
+    scrambled = (bits @ lower.transpose(0, 2, 1)) % 2
+    return (scrambled.astype(np.uint64) << shifts).sum(axis=2, dtype=np.uint64)
+
+
+def sobol_points(n: int, dim: int, rng=None) -> "np.ndarray":
+    """First `n` points of a `dim`-dimensional Sobol sequence in (0, 1).
+
+    With `rng` the points are scrambled with a random linear matrix scramble
+    plus a random digital shift, which keeps the net structure while different
+    seeds give independent low-discrepancy sets.
+    """
+    if dim > _SOBOL_MAX_DIM:
+        raise ValueError(f"Sobol sampler supports at most {_SOBOL_MAX_DIM} dimensions, got {dim}")
+
+    directions = _SOBOL_DIRECTIONS[:dim]
+    if rng is not None:
+        directions = _scramble_directions(directions, rng)
+
+    index = np.arange(n, dtype=np.uint64)
+    ints = np.zeros((n, dim), dtype=np.uint64)
+    for bit in range(max(1, int(n).bit_length())):
+        mask = ((index >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+        ints[mask] ^= directions[:, bit]
+
+    if rng is not None:
+        shift = (rng.uniform(size=dim) * 2.0 ** _SOBOL_BITS).astype(np.uint64)
+        ints ^= shift
+
+    return (ints.astype(np.float64) + 0.5) / 2.0 ** _SOBOL_BITS
+
+
+def cube_to_simplex(points: "np.ndarray") -> "np.ndarray":
+    """Map (n, d) unit-cube points onto the (d+1)-part simplex via sorted spacings.
+
+    Uniform points map to uniform simplex points, and the low-discrepancy
+    structure of quasi-random inputs carries over.
+    """
+    n = len(points)
+    edges = np.concatenate([np.zeros((n, 1)), np.sort(points, axis=1), np.ones((n, 1))], axis=1)
+    return np.diff(edges, axis=1)
+
+
+def sample_simplex(n: int, parts: int, rng, sampler: str = "dirichlet",
+                   alpha: Optional["np.ndarray"] = None) -> "np.ndarray":
+    """Draw `n` points on the `parts`-simplex.
+
+    "dirichlet" draws i.i.d. Dirichlet(alpha) samples (uniform when alpha is None);
+    "sobol" draws scrambled Sobol points, which are always uniform.
+    """
+    if parts == 0:
+        return np.zeros((n, 0))
+    if sampler == "sobol":
+        if parts == 1:
+            return np.ones((n, 1))
+        return cube_to_simplex(sobol_points(n, parts - 1, rng))
+    if sampler != "dirichlet":
+        raise ValueError(f"Unknown sampler '{sampler}', expected one of {SAMPLERS}")
+    if alpha is None:
+        alpha = np.ones(parts)
+    return rng.dirichlet(alpha, size=n)
+
+
+def bounded_allocations(fractions: "np.ndarray", total_budget: float,
+                        lower: "np.ndarray", upper: "np.ndarray") -> "np.ndarray":
+    """Map simplex fractions over the free channels onto {lower <= x <= upper, sum(x) = total_budget}.
+
+    `fractions` has one column per free channel (upper > lower); fixed channels
+    (including excluded ones, where lower == upper == 0) stay at their lower bound.
+    The slack above the lower bounds is split by the fractions, then any amount
+    over a cap is clipped and handed to channels with room left, in proportion
+    to that room. Assumes the bounds are feasible.
+    """
+    free = upper > lower
+    x = np.tile(np.asarray(lower, dtype=np.float64), (len(fractions), 1))
+    x[:, free] += (total_budget - lower.sum()) * fractions
+
+    for _ in range(int(free.sum())):
+        excess = np.maximum(x - upper, 0.0).sum(axis=1)
+        if not (excess > 1e-9).any():
+            break
+        x = np.minimum(x, upper)
+        room = upper - x
+        room_total = room.sum(axis=1, keepdims=True)
+        x += excess[:, None] * np.divide(room, room_total, out=np.zeros_like(room), where=room_total > 0)
+
+    return x
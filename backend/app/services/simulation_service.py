@@ -177,6 +177,26 @@ class SimulationService:
                     avg_score = sum(c.get("score", {}).get("overall", 70) for c in campaign["creatives"]) / len(campaign["creatives"])
                     creative_quality = avg_score / 100
                 
+                # Channel mapping
+                channel_mapping = {
+                    "instagram": "instagram",
+                    "google": "google-ads",
+                    "tiktok": "tiktok",
+                    "facebook": "facebook",
+                    "youtube": "youtube",
+                    "linkedin": "linkedin"
+                }
+                
+                # Keep the optimizer to the same channels the simulation ran on
+                preferred = [getattr(ch, "value", ch) for ch in campaign["channels"].get("preferred", [])]
+                avoided = [getattr(ch, "value", ch) for ch in campaign["channels"].get("avoided", [])]
+                excluded_channels = [
+                    ml_channel for ml_channel, app_channel in channel_mapping.items()
+                    if app_channel in avoided or (preferred and app_channel not in preferred)
+                ]
+                if len(excluded_channels) == len(channel_mapping):
+                    excluded_channels = []
+                
                 ml_request = MLCampaignOptimizationRequest(
                     total_budget=campaign["budget"]["total"],
                     aov=campaign["product"]["price"],
@@ -185,7 +205,8 @@ class SimulationService:
                     income_level=income_map.get(campaign["targeting"]["income"], "high"),
                     creative_quality=creative_quality,
                     campaign_days=campaign["budget"]["duration"],
-                    target_margin=campaign["product"]["target_margin"] / 100
+                    target_margin=campaign["product"]["target_margin"] / 100,
+                    excluded_channels=excluded_channels
                 )
                 
                 ml_response = await MLService.optimize_campaign_budget(ml_request)
@@ -194,16 +215,6 @@ class SimulationService:
                 suggestions = []
                 current_allocation = campaign["budget"]["channels"]
                 
-                # Channel mapping
-                channel_mapping = {
-                    "instagram": "instagram",
-                    "google": "google-ads",
-                    "tiktok": "tiktok",
-                    "facebook": "facebook",
-                    "youtube": "youtube",
-                    "linkedin": "linkedin"
-                }
-                
                 for ml_channel, optimal_amount in ml_response.recommended_split.items():
                     app_channel = channel_mapping.get(ml_channel)
                     if app_channel:
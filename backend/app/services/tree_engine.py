@@ -0,0 +1,249 @@
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# LightGBM's IsZero() threshold for missing_type == "Zero"
+_ZERO_THRESHOLD = 1e-35
+
+_MISSING_NONE, _MISSING_ZERO, _MISSING_NAN = 0, 1, 2
+_MISSING_TYPES = {"None": _MISSING_NONE, "Zero": _MISSING_ZERO, "NaN": _MISSING_NAN}
+
+# Traversal levels between frontier compactions: a level is a few gathers over the
+# frontier, so dropping finished cursors after every level costs more than it saves
+_LEVELS_PER_COMPACTION = 3
+
+_IDENTITY_OBJECTIVES = {"regression", "regression_l1", "huber", "fair", "quantile", "mape"}
+_EXP_OBJECTIVES = {"poisson", "gamma", "tweedie"}
+
+
+class CompiledTreeEnsemble:
+    """LightGBM regression ensemble flattened into contiguous NumPy arrays.
+
+    Every node of every tree gets a global id. Leaves point back to themselves,
+    so a whole (rows x trees) frontier can be advanced one level at a time with
+    gathers only; cursors that reach a leaf are dropped every few levels. Split
+    semantics (<= threshold, missing_type, default_left) follow LightGBM's
+    NumericalDecision, and trees are accumulated in order, so predictions match
+    the native predictor bit for bit.
+    """
+
+    def __init__(self, feature, threshold, left, right, value, default_left, missing_type,
+                 roots, leaf_nodes: List["np.ndarray"], max_depth: int, num_features: int,
+                 objective: str, average_output: bool):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.default_left = default_left
+        self.missing_type = missing_type
+        self.roots = roots
+        # leaf_nodes[t][leaf_index] -> global node id (LightGBM pred_leaf numbering)
+        self.leaf_nodes = leaf_nodes
+        self.max_depth = max_depth
+        self.num_features = num_features
+        self.objective = objective
+        self.average_output = average_output
+        self.num_trees = len(roots)
+        self.has_missing_handling = bool(np.any(missing_type != _MISSING_NONE))
+        self.is_leaf = left == np.arange(len(left))
+        # children[2 * node + go_right]: one gather picks the next node
+        self.children = np.empty(2 * len(left), dtype=np.intp)
+        self.children[0::2] = left
+        self.children[1::2] = right
+
+        # Dense (tree, leaf_index) -> leaf value table for pred_leaf lookups
+        max_leaves = max(len(nodes) for nodes in leaf_nodes) if leaf_nodes else 0
+        self.leaf_table = np.zeros((self.num_trees, max_leaves), dtype=np.float64)
+        for t, nodes in enumerate(leaf_nodes):
+            self.leaf_table[t, :len(nodes)] = value[nodes]
+
+    @classmethod
+    def from_model(cls, model, num_iteration: Optional[int] = None) -> "CompiledTreeEnsemble":
+        """Compile an LGBMRegressor / lightgbm.Booster. Raises ValueError if unsupported."""
+        booster = getattr(model, "booster_", model)
+        dump = booster.dump_model(num_iteration=num_iteration)
+        return cls.from_dump(dump)
+
+    @classmethod
+    def from_dump(cls, dump: Dict[str, Any]) -> "CompiledTreeEnsemble":
+        if dump.get("num_class", 1) != 1 or dump.get("num_tree_per_iteration", 1) != 1:
+            raise ValueError("Only single-output regression ensembles are supported")
+
+        objective = str(dump.get("objective", "regression")).split()[0]
+        if objective not in _IDENTITY_OBJECTIVES | _EXP_OBJECTIVES:
+            raise ValueError(f"Unsupported objective '{objective}'")
+
+        feature: List[int] = []
+        threshold: List[float] = []
+        left: List[int] = []
+        right: List[int] = []
+        value: List[float] = []
+        default_left: List[bool] = []
+        missing_type: List[int] = []
+        roots: List[int] = []
+        leaf_nodes: List["np.ndarray"] = []
+        max_depth = 0
+
+        for tree in dump["tree_info"]:
+            if tree.get("num_cat", 0):
+                raise ValueError("Categorical splits are not supported")
+
+            leaves: Dict[int, int] = {}
+            # Iterative DFS; children are patched in once their ids are known
+            root_id = len(feature)
+            stack = [(tree["tree_structure"], None, False, 0)]
+            while stack:
+                node, parent, is_left, depth = stack.pop()
+                node_id = len(feature)
+                if parent is not None:
+                    if is_left:
+                        left[parent] = node_id
+                    else:
+                        right[parent] = node_id
+                max_depth = max(max_depth, depth)
+
+                if "split_index" in node:
+                    if node.get("decision_type", "<=") != "<=":
+                        raise ValueError("Only numerical '<=' splits are supported")
+                    feature.append(int(node["split_feature"]))
+                    threshold.append(float(node["threshold"]))
+                    left.append(-1)
+                    right.append(-1)
+                    value.append(0.0)
+                    default_left.append(bool(node.get("default_left", True)))
+                    missing_type.append(_MISSING_TYPES[node.get("missing_type", "None")])
+                    stack.append((node["right_child"], node_id, False, depth + 1))
+                    stack.append((node["left_child"], node_id, True, depth + 1))
+                else:
+                    if "leaf_coeff" in node:
+                        raise ValueError("Linear trees are not supported")
+                    feature.append(0)
+                    threshold.append(np.inf)
+                    left.append(node_id)
+                    right.append(node_id)
+                    value.append(float(node["leaf_value"]))
+                    default_left.append(True)
+                    missing_type.append(_MISSING_NONE)
+                    leaves[int(node.get("leaf_index", 0))] = node_id
+
+            roots.append(root_id)
+            leaf_nodes.append(np.array([leaves[i] for i in sorted(leaves)], dtype=np.intp))
+
+        return cls(
+            feature=np.array(feature, dtype=np.intp),
+            threshold=np.array(threshold, dtype=np.float64),
+            left=np.array(left, dtype=np.intp),
+            right=np.array(right, dtype=np.intp),
+            value=np.array(value, dtype=np.float64),
+            default_left=np.array(default_left, dtype=bool),
+            missing_type=np.array(missing_type, dtype=np.int8),
+            roots=np.array(roots, dtype=np.intp),
+            leaf_nodes=leaf_nodes,
+            max_depth=max_depth,
+            num_features=int(dump.get("max_feature_idx", 0)) + 1,
+            objective=objective,
+            average_output=bool(dump.get("average_output", False)),
+        )
+
+    def apply(self, X: "np.ndarray") -> "np.ndarray":
+        """Global leaf node id reached in every tree, shape (n_rows, n_trees)"""
+        X = np.ascontiguousarray(X, dtype=np.float64)
+        if not self.has_missing_handling and np.isnan(X).any():
+            # missing_type None: LightGBM treats NaN as 0.0
+            X = np.where(np.isnan(X), 0.0, X)
+        n_rows, n_cols = X.shape
+        flat_x = X.ravel()
+
+        # One (row, tree) cursor per cell. A leaf's threshold is +inf and both its
+        # children are itself, so finished cursors stay put until the next compaction
+        nodes = np.tile(self.roots, n_rows)
+        row_base = np.repeat(np.arange(n_rows, dtype=np.intp) * n_cols, self.num_trees)
+        cells = np.nonzero(~self.is_leaf[nodes])[0]
+        current, row_base = nodes[cells], row_base[cells]
+        while current.size:
+            for _ in range(_LEVELS_PER_COMPACTION):
+                x = flat_x[row_base + self.feature[current]]
+                if self.has_missing_handling:
+                    missing_type = self.missing_type[current]
+                    x = np.where(np.isnan(x) & (missing_type != _MISSING_NAN), 0.0, x)
+                    is_missing = (((missing_type == _MISSING_ZERO) & (np.abs(x) <= _ZERO_THRESHOLD))
+                                  | ((missing_type == _MISSING_NAN) & np.isnan(x)))
+                    go_right = ~np.where(is_missing, self.default_left[current], x <= self.threshold[current])
+                else:
+                    go_right = x > self.threshold[current]
+                current = self.children[2 * current + go_right]
+            nodes[cells] = current
+            live = ~self.is_leaf[current]
+            cells, current, row_base = cells[live], current[live], row_base[live]
+        return nodes.reshape(n_rows, self.num_trees)
+
+    def per_tree_values(self, X: "np.ndarray") -> "np.ndarray":
+        """Raw leaf value of every tree for every row, shape (n_trees, n_rows)"""
+        return np.ascontiguousarray(self.value[self.apply(X)].T)
+
+    def leaf_values(self, leaf_indices: "np.ndarray") -> "np.ndarray":
+        """Map LightGBM pred_leaf output (n_rows, n_trees) to leaf values (n_trees, n_rows)"""
+        leaf_indices = np.asarray(leaf_indices, dtype=np.intp)
+        tree_idx = np.arange(self.num_trees, dtype=np.intp)[None, :]
+        return np.ascontiguousarray(self.leaf_table[tree_idx, leaf_indices].T)
+
+    def finalize(self, per_tree: "np.ndarray") -> "np.ndarray":
+        """Accumulate per-tree values in tree order and apply the objective's output transform"""
+        if len(per_tree) == 0:
+            raw = np.zeros(per_tree.shape[1])
+        else:
+            # cumsum adds strictly in tree order, like LightGBM's PredictRaw loop
+            raw = np.cumsum(per_tree, axis=0)[-1]
+        if self.average_output:
+            raw = raw / self.num_trees
+        if self.objective in _EXP_OBJECTIVES:
+            return np.exp(raw)
+        return raw
+
+    def predict(self, X: "np.ndarray") -> "np.ndarray":
+        return self.finalize(self.per_tree_values(X))
+
+    def staged_predictions(self, per_tree: "np.ndarray") -> "np.ndarray":
+        """Prediction after each number of trees, shape (n_trees, n_rows); the last row equals finalize()"""
+        staged = np.cumsum(per_tree, axis=0)
+        if self.average_output:
+            staged = staged / np.arange(1, len(staged) + 1)[:, None]
+        if self.objective in _EXP_OBJECTIVES:
+            return np.exp(staged)
+        return staged
+
+    def prediction_interval(self, per_tree: "np.ndarray", z: float = 1.96, tail_fraction: float = 0.5):
+        """Partial-ensemble interval around each row's prediction from its per-tree values.
+
+        The spread is the RMS distance between the full prediction and the
+        staged predictions over the last `tail_fraction` of the trees: rows the
+        late trees still move a lot are the ones the ensemble is least settled
+        on. Returns (prediction, lower, upper).
+        """
+        staged = self.staged_predictions(per_tree)
+        prediction = staged[-1]
+        start = min(len(staged) - 1, int(len(staged) * (1 - tail_fraction)))
+        spread = np.sqrt(np.mean((staged[start:] - prediction) ** 2, axis=0))
+        return prediction, prediction - z * spread, prediction + z * spread
+
+    def threshold_probe_rows(self, n_rows: int, seed: int = 0) -> "np.ndarray":
+        """Rows whose features sit exactly on split thresholds, to exercise the <= edge cases"""
+        rng = np.random.RandomState(seed)
+        X = np.zeros((n_rows, self.num_features))
+        internal = ~self.is_leaf
+        for f in range(self.num_features):
+            thresholds = self.threshold[internal & (self.feature == f)]
+            if len(thresholds):
+                X[:, f] = rng.choice(thresholds, size=n_rows)
+        return X
+
+    def validate(self, model, X: "np.ndarray") -> Dict[str, Any]:
+        """Compare against the native predictor; `exact` means bit-for-bit equal"""
+        native = np.asarray(model.predict(X), dtype=np.float64)
+        compiled = self.predict(X)
+        return {
+            "rows": int(len(X)),
+            "exact": bool(np.array_equal(native, compiled)),
+            "max_abs_diff": float(np.max(np.abs(native - compiled))) if len(X) else 0.0,
+        }
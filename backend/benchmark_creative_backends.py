@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark the DistilBERT creative scorer backends (fp32, int8, ONNX) on CPU
+"""
+import sys
+import os
+import gc
+import time
+import resource
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import torch
+from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+from app.services.creative_backends import AGREEMENT_SAMPLES, BACKENDS, TorchBackend, agreement_check, build_backend
+from app.services.ml_service import DISTILBERT_LABEL_MAPPING
+
+MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "distilbert_creative_scorer")
+BATCH_SIZES = [1, 16]
+REPEATS = 20
+
+def rss_mb():
+    """Current resident set size (peak on platforms without /proc)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def median_ms(backend, inputs, repeats=REPEATS):
+    """Median wall time of one predict_proba call in milliseconds"""
+    backend.predict_proba(inputs)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        backend.predict_proba(inputs)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+def main():
+    print("Creative Backend Benchmark")
+    print("=" * 40)
+    print(f"torch {torch.__version__}, {torch.get_num_threads()} threads")
+
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_DIR)
+    model = AutoModelForSequenceClassification.from_pretrained(MODEL_DIR)
+    model.eval()
+    reference = TorchBackend(model)
+
+    batches = {
+        n: tokenizer(list(np.resize(AGREEMENT_SAMPLES, n)), truncation=True, padding=True, return_tensors="pt")
+        for n in BATCH_SIZES
+    }
+
+    print(f"\n{'backend':>11} {'size MB':>9} {'+RSS MB':>9} " + " ".join(f"{f'b={n} ms':>10}" for n in BATCH_SIZES)
+          + f" {'max dscore':>11} {'top agree':>10}")
+    for name in BACKENDS:
+        gc.collect()
+        rss_before = rss_mb()
+        try:
+            backend = reference if name == "torch" else build_backend(name, model, tokenizer, MODEL_DIR)
+        except Exception as e:
+            print(f"{name:>11} unavailable: {e}")
+            continue
+        latencies = [median_ms(backend, batches[n]) for n in BATCH_SIZES]
+        rss_delta = rss_mb() - rss_before
+        agreement = agreement_check(reference, backend, tokenizer, DISTILBERT_LABEL_MAPPING)
+        print(f"{name:>11} {backend.size_bytes() / 2 ** 20:>9.1f} {rss_delta:>9.1f} "
+              + " ".join(f"{ms:>10.2f}" for ms in latencies)
+              + f" {agreement['max_expected_score_diff']:>11.4f} {agreement['top_class_agreement']:>10.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled keyword lexicon against the per-word substring loops it replaced
+"""
+import sys
+import os
+import time
+import random
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from app.services.lexicon import BENEFIT_WORDS, CTA_WORDS, URGENCY_WORDS, Lexicon, creative_lexicon
+
+N_TEXTS = 5000
+REPEATS = 5
+FILLER = ("experience crystal clear sound with our award winning headphones perfect for music lovers "
+          "and professionals who know what they want from everyday listening at home or on the go").split()
+KEYWORDS = URGENCY_WORDS + BENEFIT_WORDS + CTA_WORDS
+# Vocabulary sizes for the scaling comparison (real lists padded with synthetic words)
+VOCABULARY_SIZES = [30, 300, 1000]
+
+def make_creatives(n, seed=0):
+    """Synthetic (body, cta) pairs with a sprinkling of keywords, some embedded in longer words"""
+    rng = random.Random(seed)
+    creatives = []
+    for _ in range(n):
+        words = [rng.choice(FILLER) for _ in range(rng.randint(8, 60))]
+        for _ in range(rng.randint(0, 6)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(KEYWORDS + ["known", "yourself", "started"]))
+        creatives.append((" ".join(words), rng.choice(["Shop Now", "Get Started", "Learn more", "Order today"])))
+    return creatives
+
+def loop_scores(body, cta):
+    """The previous substring loops (matches inside longer words, e.g. "now" in "known")"""
+    text = f"{body} {cta}".lower()
+    return (sum(1 for word in URGENCY_WORDS if word in text),
+            sum(1 for word in BENEFIT_WORDS if word in text),
+            sum(1 for word in CTA_WORDS if word in cta.lower()))
+
+def lexicon_scores(body, cta):
+    cta_match = creative_lexicon.scan(cta)
+    text_match = creative_lexicon.scan(body) + cta_match
+    return text_match.distinct("urgency"), text_match.distinct("benefit"), cta_match.distinct("cta")
+
+def median_ms(fn, creatives, repeats=REPEATS):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for body, cta in creatives:
+            fn(body, cta)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+def synthetic_vocabulary(size, seed=1):
+    rng = random.Random(seed)
+    words = list(dict.fromkeys(KEYWORDS))
+    while len(words) < size:
+        words.append("".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(4, 9))))
+    return words
+
+def time_ms(fn, texts, repeats=REPEATS):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for text in texts:
+            fn(text)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+def main():
+    print("Keyword Lexicon Benchmark")
+    print("=" * 40)
+    creatives = make_creatives(N_TEXTS)
+
+    loop_ms = median_ms(loop_scores, creatives)
+    lexicon_ms = median_ms(lexicon_scores, creatives)
+    print(f"{N_TEXTS} creatives, {len(KEYWORDS)} keywords")
+    print(f"substring loops: {loop_ms:8.2f} ms ({N_TEXTS / loop_ms * 1000:,.0f} creatives/s)")
+    print(f"compiled regex:  {lexicon_ms:8.2f} ms ({N_TEXTS / lexicon_ms * 1000:,.0f} creatives/s)")
+    verdict = "slower" if lexicon_ms > loop_ms else "faster"
+    print(f"the regex is {verdict} than the loops at this vocabulary size ({lexicon_ms / loop_ms:.2f}x)")
+
+    differing = sum(1 for body, cta in creatives if loop_scores(body, cta) != lexicon_scores(body, cta))
+    print(f"{differing} of {N_TEXTS} creatives score differently (substring hits inside longer words no longer count)")
+
+    print(f"\n{'keywords':>9} {'loops ms':>10} {'regex ms':>10}")
+    texts = [f"{body} {cta}" for body, cta in creatives]
+    for size in VOCABULARY_SIZES:
+        vocabulary = synthetic_vocabulary(size)
+        lexicon = Lexicon({"all": vocabulary})
+        loop_ms = time_ms(lambda text: sum(1 for word in vocabulary if word in text.lower()), texts)
+        lexicon_ms = time_ms(lambda text: lexicon.scan(text).distinct("all"), texts)
+        print(f"{size:>9} {loop_ms:>10.2f} {lexicon_ms:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled NumPy tree engine against the native LightGBM predictors
+"""
+import sys
+import os
+import time
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import joblib
+import numpy as np
+
+from app.services.feature_encoder import FeatureEncoder
+from app.services.ml_service import MLService
+from app.services.tree_engine import CompiledTreeEnsemble
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+BATCH_SIZES = [1, 8, 64, 500, 4000]
+REPEATS = 30
+
+def median_ms(fn, X, repeats=REPEATS):
+    """Median wall time of fn(X) in milliseconds"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+def main():
+    print("Tree Engine Benchmark")
+    print("=" * 40)
+
+    model = joblib.load(os.path.join(MODELS_DIR, "campaign_optimizer_usd.pkl"))
+    with open(os.path.join(MODELS_DIR, "model_feature_columns_usd.json")) as f:
+        encoder = FeatureEncoder(json.load(f))
+
+    start = time.perf_counter()
+    ensemble = CompiledTreeEnsemble.from_model(model)
+    print(f"Compiled {ensemble.num_trees} trees, {len(ensemble.value)} nodes, "
+          f"max depth {ensemble.max_depth} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    # Validation: realistic candidate rows plus rows sitting exactly on split thresholds
+    X_valid = np.vstack([
+        MLService.build_validation_matrix(encoder, n_requests=32, rows_per_request=128),
+        ensemble.threshold_probe_rows(4096),
+    ])
+    validation = ensemble.validate(model, X_valid)
+    status = "OK" if validation["exact"] else "MISMATCH"
+    print(f"Validation on {validation['rows']} rows: {status} (max abs diff {validation['max_abs_diff']})")
+
+    booster = getattr(model, "booster_", model)
+    print(f"\n{'rows':>6} {'sklearn ms':>12} {'booster ms':>12} {'numpy ms':>12} {'numpy/booster':>14}")
+    slower = []
+    for n in BATCH_SIZES:
+        X = np.resize(X_valid, (n, X_valid.shape[1]))
+        booster_ms, numpy_ms = median_ms(booster.predict, X), median_ms(ensemble.predict, X)
+        if numpy_ms > booster_ms:
+            slower.append(n)
+        print(f"{n:>6} {median_ms(model.predict, X):>12.3f} "
+              f"{booster_ms:>12.3f} {numpy_ms:>12.3f} {numpy_ms / booster_ms:>13.2f}x")
+
+    if slower:
+        print(f"\nNote: the NumPy engine is slower than Booster.predict at {', '.join(map(str, slower))} rows. "
+              "It is not a speed option; ML_TREE_ENGINE=booster is the fast path, and the compiled "
+              "arrays are kept for per-tree outputs (revenue intervals) and validation.")
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,10 @@ from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.api.routes import campaigns, creative, ml, auth, dashboard
-from app.services.ml_service import load_ml_models
+from app.services.ml_service import (
+    load_ml_models, start_background_model_loading, shutdown_ml_executors, model_registry, model_states,
+    load_ml_caches, save_ml_caches
+)
 from app.core.storage import storage
 
 # Set up logging
@@ -22,15 +25,22 @@ async def lifespan(app: FastAPI):
     
     # Initialize storage
     storage.initialize()
+    load_ml_caches()
     
-    # Load ML models
-    await load_ml_models()
+    # Load ML models; in the background by default so the port opens immediately
+    # and requests use the fallback logic until each model is ready
+    if settings.ML_BACKGROUND_LOADING:
+        start_background_model_loading()
+    else:
+        await load_ml_models()
     
     logger.info("Backend startup complete!")
     yield
     
     # Shutdown
     logger.info("Shutting down backend...")
+    shutdown_ml_executors()
+    save_ml_caches()
 
 # Create FastAPI app
 app = FastAPI(
@@ -49,21 +59,41 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Health check endpoint
+# Health check endpoints: /health/live says the process is up, /health/ready waits
+# for model loading to finish, and /health (Railway's check) answers as soon as the
+# port is open while reporting each model's state
 @app.get("/health")
 async def health_check():
+    models = model_states()
+    # A model whose dependencies are not installed (e.g. no torch on the light tier) is
+    # served by the fallbacks by design; only installed models have to be ready
+    installed = [model for model in models.values() if model["state"] != "unavailable"]
+    ml_ready = bool(installed) and all(model["state"] == "ready" for model in installed)
     return {
-        "status": "healthy",
+        "status": "healthy" if ml_ready else "degraded",
         "version": "1.0.0",
         "services": {
             "campaigns": True,
             "creative_scoring": True,
-            "ml_models": True,
+            "ml_models": ml_ready,
             "authentication": True,
             "user_dashboard": True
-        }
+        },
+        "models": models
     }
 
+@app.get("/health/live")
+async def liveness_check():
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    models = model_states()
+    if not model_registry.settled():
+        return JSONResponse(status_code=503, content={"status": "loading", "models": models})
+    # Models that failed or are unavailable are served by the fallback logic
+    return {"status": "ready", "models": models}
+
 @app.get("/")
 async def root():
     return {
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the micro-batcher flush triggers and per-item error isolation
+"""
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.core.batching import MicroBatcher
+
+
+class Recorder:
+    """process_batch that doubles each item, records batch sizes and rejects negatives"""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, items):
+        self.calls.append(list(items))
+        if any(item < 0 for item in items):
+            raise ValueError(f"bad item in {items}")
+        return [item * 2 for item in items]
+
+
+def submit_all(batcher, items):
+    async def run():
+        return await asyncio.gather(*(batcher.submit(item) for item in items), return_exceptions=True)
+    return asyncio.run(run())
+
+
+def test_full_batch_flushes_without_waiting():
+    process = Recorder()
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=60_000)
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(8))), timeout=5)
+
+    assert asyncio.run(run()) == [0, 2, 4, 6, 8, 10, 12, 14]
+    assert process.calls == [[0, 1, 2, 3], [4, 5, 6, 7]]
+
+
+def test_partial_batch_flushes_after_max_wait():
+    process = Recorder()
+    batcher = MicroBatcher(process, max_batch_size=16, max_wait_ms=20)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)))
+        return results, loop.time() - start
+
+    results, elapsed = asyncio.run(run())
+    assert results == [0, 2, 4]
+    assert process.calls == [[0, 1, 2]]
+    assert elapsed >= 0.015
+
+
+def test_failed_batch_retries_items_one_at_a_time():
+    process = Recorder()
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=5)
+    results = submit_all(batcher, [1, -1, 2, 3])
+
+    assert results[0] == 2 and results[2] == 4 and results[3] == 6
+    assert isinstance(results[1], ValueError)
+    assert process.calls[0] == [1, -1, 2, 3]
+    assert process.calls[1:] == [[1], [-1], [2], [3]]
+    stats = batcher.stats()
+    assert stats["failed_batches"] == 1 and stats["failed_items"] == 1
+    assert stats["batches"] == 1 and stats["items"] == 4
+
+
+def test_failed_single_item_batch_is_not_retried():
+    process = Recorder()
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=1)
+    with pytest.raises(ValueError):
+        asyncio.run(batcher.submit(-1))
+    assert process.calls == [[-1]]
+    assert batcher.stats()["failed_items"] == 1
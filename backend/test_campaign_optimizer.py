@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Tests for the campaign optimizer searches, channel constraints and caches,
+run against the bundled campaign model
+"""
+import sys
+import os
+import asyncio
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.models.types import MLCampaignOptimizationRequest
+from app.services import ml_service
+from app.services.ml_service import CHANNELS, CampaignModelBundle, MLService
+from app.services.sampling import bounded_allocations, sample_simplex
+
+MODELS_DIR = Path(os.path.dirname(os.path.abspath(__file__))) / "models"
+
+
+@pytest.fixture(scope="module")
+def bundle():
+    return CampaignModelBundle.load(MODELS_DIR)
+
+
+@pytest.fixture
+def campaign(bundle, monkeypatch):
+    """Active campaign model with empty optimizer caches"""
+    monkeypatch.setattr(ml_service.model_registry, "active", lambda name: bundle if name == "campaign" else None)
+    ml_service.optimizer_cache.clear()
+    ml_service.warm_start_cache.clear()
+    return bundle
+
+
+def request(**overrides):
+    fields = dict(total_budget=10000, aov=300, age=35, gender="all", income_level="high",
+                  creative_quality=0.8, campaign_days=30, target_margin=0.25, seed=1)
+    fields.update(overrides)
+    return MLCampaignOptimizationRequest(**fields)
+
+
+def optimize(req):
+    return asyncio.run(MLService.optimize_campaign_budget(req))
+
+
+def model_revenue(bundle, req, result):
+    split = np.array([[result.recommended_split[ch] for ch in CHANNELS]])
+    features = MLService.build_features_matrix(
+        req.total_budget, split, req.aov, req.creative_quality, req.campaign_days,
+        req.target_margin, req.age, req.gender, req.income_level
+    )
+    return float(bundle.predict(features)[0])
+
+
+def test_budget_buckets_are_relative():
+    width = 0.005
+    for budget in (120.0, 10000.0, 2500000.0):
+        bucket = MLService.budget_bucket(budget, width)
+        assert MLService.budget_bucket(budget * 1.006, width) != bucket
+        low, high = (1 + width) ** bucket, (1 + width) ** (bucket + 1)
+        assert low <= budget < high and high / low == pytest.approx(1 + width)
+    assert MLService.budget_bucket(1234.5, 0) == 1234.5
+
+
+def test_cache_key_groups_nearby_budgets(campaign, monkeypatch):
+    monkeypatch.setattr(settings, "ML_OPTIMIZER_CACHE_BUDGET_BUCKET", 0.005)
+    bucket = MLService.budget_bucket(10000, 0.005)
+    low = (1 + 0.005) ** bucket
+    key = MLService.optimizer_cache_key(request(total_budget=low * 1.001))
+    assert MLService.optimizer_cache_key(request(total_budget=low * 1.004, campaign_id="c1")) == key
+    assert MLService.optimizer_cache_key(request(total_budget=low * 1.006)) != key
+    assert MLService.optimizer_cache_key(request(aov=301)) != MLService.optimizer_cache_key(request())
+    # Absolute channel bounds keep the exact budget in the key
+    assert MLService.optimizer_cache_key(request(total_budget=10000, channel_min={"google": 1000})) != \
+        MLService.optimizer_cache_key(request(total_budget=10001, channel_min={"google": 1000}))
+
+
+def test_rescaled_hit_is_approximate_and_close(campaign):
+    cached = MLService.run_optimizer_search(request(total_budget=10000))
+    exact = MLService.rescale_cached_result(cached, 10000, request(total_budget=10000))
+    assert not exact.approximate and exact.search_stats["cache"] == "hit"
+
+    req = request(total_budget=10030)
+    rescaled = MLService.rescale_cached_result(cached, 10000, req)
+    assert rescaled.approximate
+    assert rescaled.search_stats["cache"] == "rescaled" and rescaled.search_stats["cached_budget"] == 10000
+    assert sum(rescaled.recommended_split.values()) == pytest.approx(10030)
+    assert rescaled.predicted_revenue == pytest.approx(cached.predicted_revenue * 1.003, abs=0.01)
+    assert abs(rescaled.predicted_revenue / model_revenue(campaign, req, rescaled) - 1) < 0.005
+
+
+def test_optimize_reuses_cache_within_bucket_only(campaign):
+    bucket = MLService.budget_bucket(10000, settings.ML_OPTIMIZER_CACHE_BUDGET_BUCKET)
+    low = (1 + settings.ML_OPTIMIZER_CACHE_BUDGET_BUCKET) ** bucket
+    first = optimize(request(total_budget=round(low * 1.001, 2)))
+    assert not first.approximate and "cache" not in first.search_stats
+
+    assert optimize(request(total_budget=round(low * 1.001, 2))).search_stats["cache"] == "hit"
+    assert optimize(request(total_budget=round(low * 1.004, 2))).approximate
+    assert not optimize(request(total_budget=round(low * 1.02, 2))).approximate
+
+
+def test_interval_comes_from_the_scoring_pass(campaign):
+    req = request()
+    splits = MLService.sweep_candidates(req)
+    pred_revenue, _, per_tree = MLService.predict_split_matrix(req, splits)
+    assert per_tree.shape == (campaign.ensemble.num_trees, len(splits))
+    assert np.array_equal(pred_revenue, campaign.model.predict(MLService.build_features_matrix(
+        req.total_budget, splits, req.aov, req.creative_quality, req.campaign_days,
+        req.target_margin, req.age, req.gender, req.income_level
+    )))
+
+    result = MLService.run_optimizer_search(req)
+    assert result.predicted_revenue_lower <= result.predicted_revenue <= result.predicted_revenue_upper
+    assert 0.5 <= result.confidence_score <= 1.0
+
+
+@pytest.mark.parametrize("overrides, message", [
+    (dict(channel_min={"google": 20000}), "exceeds the total budget"),
+    (dict(channel_min={"google": 3000}, channel_max={"google": 2000}), "exceeds its maximum"),
+    (dict(channel_min={"google": 6000, "tiktok": 6000}), "cannot be met"),
+    (dict(channel_max={ch: 1000 for ch in CHANNELS}), "cannot be met"),
+    (dict(excluded_channels=["google"], channel_min={"google": 100}), "excluded but has a minimum"),
+    (dict(excluded_channels=list(CHANNELS)), "cannot be met"),
+    (dict(excluded_channels=["myspace"]), "Unknown channels"),
+])
+def test_infeasible_bounds_are_rejected(overrides, message):
+    with pytest.raises(ValueError, match=message):
+        MLService.split_bounds(request(**overrides))
+
+
+def test_all_channels_excluded_is_a_400():
+    import main
+    body = request(excluded_channels=list(CHANNELS)).model_dump(exclude_none=True)
+    assert TestClient(main.app).post("/api/ml/campaign/optimize", json=body).status_code == 400
+
+
+def test_split_bounds_and_free_channels():
+    assert MLService.split_bounds(request()) is None
+    assert MLService.free_channel_count(None) == len(CHANNELS)
+    bounds = MLService.split_bounds(request(excluded_channels=["linkedin"], channel_min={"google": 2000},
+                                            channel_max={"tiktok": 500, "youtube": 2000}))
+    lower, upper = dict(zip(CHANNELS, bounds[0])), dict(zip(CHANNELS, bounds[1]))
+    assert (lower["linkedin"], upper["linkedin"]) == (0.0, 0.0)
+    assert (lower["google"], upper["google"]) == (2000.0, 10000)
+    assert upper["tiktok"] == 500
+    assert MLService.free_channel_count(bounds) == len(CHANNELS) - 1
+
+
+@pytest.mark.parametrize("sampler", ["dirichlet", "sobol"])
+def test_bounded_splits_stay_inside_bounds(sampler):
+    req = request(total_budget=10000, excluded_channels=["linkedin"], channel_min={"google": 2000, "facebook": 500},
+                  channel_max={"tiktok": 300, "youtube": 1500, "google": 6000})
+    bounds = MLService.split_bounds(req)
+    fractions = sample_simplex(2000, MLService.free_channel_count(bounds), np.random.RandomState(0), sampler=sampler)
+    splits = MLService.fractions_to_splits(req.total_budget, fractions, bounds)
+    lower, upper = np.asarray(bounds[0]), np.asarray(bounds[1])
+    assert np.all(splits >= lower - 0.01) and np.all(splits <= upper + 0.01)
+    assert np.allclose(splits.sum(axis=1), req.total_budget, atol=0.005)
+    assert np.all(splits[:, CHANNELS.index("linkedin")] == 0)
+
+    # Unrounded allocations meet the bounds exactly
+    allocations = bounded_allocations(fractions, req.total_budget, lower, upper)
+    assert np.all(allocations >= lower - 1e-9) and np.all(allocations <= upper + 1e-9)
+    assert np.allclose(allocations.sum(axis=1), req.total_budget)
+
+
+def optimize_batch(items):
+    return asyncio.run(MLService.optimize_campaign_budget_batch(items))
+
+
+BATCH = [request(total_budget=5000, seed=1), request(total_budget=12000, seed=2, age=28, gender="woman"),
+         request(total_budget=20000, seed=3, excluded_channels=["linkedin"])]
+
+
+def test_batch_matches_single_item_optimization(campaign):
+    batch = optimize_batch(BATCH)
+    assert all(item.success and item.result.search_stats["batched"] for item in batch.results)
+    for req, item in zip(BATCH, batch.results):
+        single = MLService.run_optimizer_search(req)
+        assert item.result.recommended_split == single.recommended_split
+        assert item.result.predicted_revenue == single.predicted_revenue
+        assert item.result.confidence_score == single.confidence_score
+    assert batch.rows_evaluated == 3 * settings.ML_OPTIMIZER_CANDIDATES
+
+
+def test_bad_batch_items_do_not_affect_neighbours(campaign):
+    items = [BATCH[0], {"total_budget": "lots"}, request(channel_min={"google": 20000}), BATCH[1]]
+    results = optimize_batch(items).results
+    assert [item.success for item in results] == [True, False, False, True]
+    assert "exceeds the total budget" in results[2].error
+    assert results[3].result.recommended_split == MLService.run_optimizer_search(BATCH[1]).recommended_split
+
+
+def test_failed_shared_predict_rescores_items_one_at_a_time(campaign, monkeypatch):
+    aov_column = campaign.feature_columns.index("aov")
+    original = CampaignModelBundle.predict_with_trees
+
+    def predict_with_trees(self, features):
+        if (features[:, aov_column] == 666).any():
+            raise RuntimeError("model error")
+        return original(self, features)
+
+    monkeypatch.setattr(CampaignModelBundle, "predict_with_trees", predict_with_trees)
+    results = optimize_batch([BATCH[0], request(aov=666), BATCH[1]]).results
+    assert [item.success for item in results] == [True, False, True]
+    assert "model error" in results[1].error
+    assert not results[0].result.search_stats["batched"]
+    assert results[0].result.recommended_split == MLService.run_optimizer_search(BATCH[0]).recommended_split
+
+
+def optimizer_used(req):
+    return optimize(req).search_stats["optimizer"]
+
+
+def test_input_drift():
+    previous = MLService.warm_start_inputs(request())
+    assert MLService.input_drift(previous, request()) == 0.0
+    assert MLService.input_drift(previous, request(total_budget=11000, aov=330)) == pytest.approx(0.1)
+    assert MLService.input_drift(previous, request(gender="woman")) == float("inf")
+    assert MLService.input_drift(previous, request(excluded_channels=["linkedin"])) == float("inf")
+
+
+def test_warm_start_below_drift_threshold_and_full_search_above(campaign):
+    assert optimizer_used(request(campaign_id="c1")) == "sweep"
+    warm = optimize(request(campaign_id="c1", total_budget=11000))
+    assert warm.search_stats["optimizer"] == "warm_start"
+    assert warm.search_stats["rows_evaluated"] == settings.ML_WARM_START_CANDIDATES
+    assert sum(warm.recommended_split.values()) == pytest.approx(11000)
+    assert optimizer_used(request(campaign_id="c1", total_budget=20000)) == "sweep"
+    assert optimizer_used(request(campaign_id="c1", total_budget=20000, gender="man")) == "sweep"
+
+
+def test_drift_is_anchored_to_the_last_full_search(campaign):
+    # Each step moves the budget by under 10%, but the third is 30% from the full search
+    assert optimizer_used(request(campaign_id="c2", total_budget=10000)) == "sweep"
+    assert optimizer_used(request(campaign_id="c2", total_budget=11000)) == "warm_start"
+    assert optimizer_used(request(campaign_id="c2", total_budget=12000)) == "warm_start"
+    assert optimizer_used(request(campaign_id="c2", total_budget=13000)) == "sweep"
+    # The new full search is the new anchor
+    assert optimizer_used(request(campaign_id="c2", total_budget=14000)) == "warm_start"
+
+
+def test_explicit_warm_start(campaign):
+    previous = MLService.run_optimizer_search(request())
+    inputs = MLService.warm_start_inputs(request())
+    warm_start = {"recommended_split": previous.recommended_split, "inputs": inputs}
+    assert optimizer_used(request(total_budget=10500, warm_start=warm_start)) == "warm_start"
+    assert optimizer_used(request(total_budget=15000, warm_start=warm_start)) == "sweep"
+
+
+@pytest.mark.parametrize("sampler", ["dirichlet", "sobol"])
+def test_adaptive_search_stays_within_row_budget(campaign, sampler):
+    req = request(optimizer="adaptive", sampler=sampler, samples_per_round=32, max_rounds=4)
+    splits, revenue, roi, per_tree, stats = MLService.adaptive_search(req)
+    assert 1 <= stats["rounds"] <= 4
+    assert stats["rows_evaluated"] == len(splits) == 32 * stats["rounds"] <= 32 * 4
+    assert len(revenue) == len(roi) == per_tree.shape[1] == len(splits)
+    assert np.all(splits >= 0)
+    np.testing.assert_allclose(splits.sum(axis=1), 10000)
+
+
+@pytest.mark.parametrize("patience", [1, 2])
+def test_adaptive_search_stops_when_roi_stops_improving(campaign, monkeypatch, patience):
+    # No later round can beat the first by this margin, so every later round is stale
+    monkeypatch.setattr(settings, "ML_ADAPTIVE_TOLERANCE", 1e9)
+    monkeypatch.setattr(settings, "ML_ADAPTIVE_PATIENCE", patience)
+    stats = MLService.adaptive_search(request(optimizer="adaptive", samples_per_round=16, max_rounds=10))[-1]
+    assert stats["rounds"] == 1 + patience
+
+
+def test_adaptive_search_converges(campaign, monkeypatch):
+    monkeypatch.setattr(settings, "ML_ADAPTIVE_TOLERANCE", 0.0)
+    monkeypatch.setattr(settings, "ML_ADAPTIVE_PATIENCE", 50)
+    req = request(optimizer="adaptive", samples_per_round=64, max_rounds=8)
+    _, _, roi, _, stats = MLService.adaptive_search(req)
+    best_per_round = np.maximum.accumulate(roi.reshape(stats["rounds"], -1).max(axis=1))
+    assert best_per_round[-1] >= best_per_round[0]
+    # Later rounds sample near the elites, so their typical split scores better than the first round's
+    rounds = roi.reshape(stats["rounds"], -1)
+    assert np.median(rounds[-1]) > np.median(rounds[0])
+
+
+def test_adaptive_optimization_is_valid(campaign):
+    req = request(optimizer="adaptive", total_budget=25000, excluded_channels=["linkedin"],
+                  channel_min={"google": 5000}, channel_max={"tiktok": 2000})
+    result = optimize(req)
+    split = result.recommended_split
+    assert result.search_stats["optimizer"] == "adaptive"
+    assert all(value >= 0 for value in split.values())
+    assert sum(split.values()) == pytest.approx(25000)
+    assert split.get("linkedin", 0) == 0
+    assert split["google"] >= 5000 - 1e-6 and split["tiktok"] <= 2000 + 1e-6
+    assert result.predicted_revenue >= 0
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for creative backend selection: anything other than an agreeing backend falls back to fp32 torch
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.core.config import settings
+from app.services import ml_service
+from app.services.ml_service import CreativeModelBundle
+
+
+class FakeBackend:
+    def __init__(self, model, name="torch"):
+        self.model = model
+        self.name = name
+
+
+def fake_build_backend(name, model, tokenizer, model_dir, onnx_path=None, threads=0):
+    if name == "onnx":
+        raise ImportError("No module named 'onnxruntime'")
+    if name != "torch-int8":
+        raise ValueError(f"Unknown creative backend '{name}'")
+    return FakeBackend(model, name=name)
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    """Backend selection with fake backends and a settable expected-score gap"""
+    agreement = {"max_expected_score_diff": 0.0}
+    monkeypatch.setattr(ml_service, "TorchBackend", FakeBackend, raising=False)
+    monkeypatch.setattr(ml_service, "build_backend", fake_build_backend, raising=False)
+    monkeypatch.setattr(ml_service, "agreement_check",
+                        lambda reference, candidate, tokenizer, labels: {"backend": candidate.name, **agreement},
+                        raising=False)
+    monkeypatch.setattr(settings, "ML_CREATIVE_AGREEMENT_TOLERANCE", 0.05)
+    return agreement
+
+
+def select(monkeypatch, name):
+    monkeypatch.setattr(settings, "ML_CREATIVE_BACKEND", name)
+    return CreativeModelBundle.select_backend("model", "tokenizer", "/models/distilbert")
+
+
+def test_torch_needs_no_agreement_check(backends, monkeypatch):
+    backend, agreement = select(monkeypatch, "torch")
+    assert backend.name == "torch" and agreement is None
+
+
+@pytest.mark.parametrize("name, error", [("tensorrt", "Unknown creative backend"), ("onnx", "onnxruntime")])
+def test_unknown_or_unbuildable_backend_falls_back_to_torch(backends, monkeypatch, name, error):
+    backend, agreement = select(monkeypatch, name)
+    assert backend.name == "torch" and backend.model == "model"
+    assert agreement["backend"] == name and not agreement["accepted"] and error in agreement["error"]
+
+
+@pytest.mark.parametrize("gap, chosen", [(0.01, "torch-int8"), (0.05, "torch-int8"), (0.2, "torch")])
+def test_agreement_tolerance(backends, monkeypatch, gap, chosen):
+    backends["max_expected_score_diff"] = gap
+    backend, agreement = select(monkeypatch, "torch-int8")
+    assert backend.name == chosen
+    assert agreement["accepted"] == (chosen == "torch-int8")
+
+
+def test_build_backend_rejects_unknown_names():
+    pytest.importorskip("torch")
+    from app.services.creative_backends import build_backend
+    with pytest.raises(ValueError, match="Unknown creative backend"):
+        build_backend("tensorrt", None, None, "/models/distilbert")
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Tests for the creative scoring caches, phrase banks, near-duplicate reuse and cascade, run against
+small stand-ins for the tokenizer, DistilBERT backend and sentence embedder (no torch)
+"""
+import sys
+import os
+import asyncio
+import hashlib
+import json
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.core.near_duplicates import NearDuplicateIndex, simhash
+from app.models.types import MLCreativeScoreRequest
+from app.services import ml_service
+from app.services.ml_service import MLService
+from app.services.phrase_bank import PhraseBank, load_phrase_definitions
+
+
+class FakeTokenizer:
+    """One token per word, the token id being the word length"""
+
+    def __call__(self, texts, truncation=True, max_length=128, padding=False, return_tensors=None):
+        ids = [[len(word) for word in text.split()][:max_length] or [1] for text in texts]
+        encodings = {"input_ids": ids, "attention_mask": [[1] * len(i) for i in ids]}
+        return self.pad(encodings) if padding else encodings
+
+    def pad(self, encodings, padding=True, return_tensors=None):
+        length = max(len(ids) for ids in encodings["input_ids"])
+        return {key: np.array([row + [0] * (length - len(row)) for row in encodings[key]])
+                for key in ("input_ids", "attention_mask")}
+
+
+class FakeBackend:
+    name = "torch"
+
+    def __init__(self):
+        self.sequences = 0
+
+    def predict_proba(self, inputs):
+        ids = np.asarray(inputs["input_ids"], dtype=np.float64)
+        self.sequences += len(ids)
+        logits = np.stack([np.sin(ids.sum(axis=1) * (k + 1)) for k in range(6)], axis=1)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=1, keepdims=True)
+
+
+class FakeEmbedder:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, normalize_embeddings=True, convert_to_numpy=True):
+        self.encoded.extend(texts)
+        vectors = np.array([[b - 128 for b in hashlib.sha256(t.encode()).digest()[:16]] for t in texts],
+                           dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class FakeCreativeBundle:
+    version = "test-torch+fake"
+
+    def __init__(self):
+        self.tokenizer = FakeTokenizer()
+        self.backend = FakeBackend()
+        self.embedder = FakeEmbedder()
+        self.phrase_bank = PhraseBank.build(self.embedder, "fake", load_phrase_definitions(None))
+        self.embedder.encoded.clear()
+
+
+@pytest.fixture
+def creative(monkeypatch):
+    """Active fake creative model with empty caches"""
+    bundle = FakeCreativeBundle()
+    monkeypatch.setattr(ml_service, "ML_AVAILABLE", True)
+    monkeypatch.setattr(ml_service.model_registry, "active", lambda name: bundle if name == "creative" else None)
+    for cache in (ml_service.creative_cache, ml_service.creative_signal_cache):
+        cache.clear()
+    ml_service.creative_near_duplicates.clear()
+    monkeypatch.setattr(ml_service.creative_near_duplicates, "max_distance", -1)
+    return bundle
+
+
+def request(**overrides):
+    fields = dict(title="Summer Sale on Wireless Headphones",
+                  description="Crystal clear sound and free shipping on every order this week.",
+                  cta="Shop Now", channel="instagram")
+    fields.update(overrides)
+    return MLCreativeScoreRequest(**fields)
+
+
+def score(req):
+    return asyncio.run(MLService.score_creative_content(req))
+
+
+def test_staged_signals_match_uncached_pass(creative):
+    texts = ["Summer sale. Free shipping. Shop now", "Premium headphones. Great sound. Learn more"]
+    staged, usage = MLService.predict_creative_signals_sorted(texts, ["instagram", "google"], [None, None])
+    assert staged == MLService.predict_creative_signals_batch(texts, channels=["instagram", "google"])
+    assert usage["signal_cache_hits"] == 0
+
+    again, usage = MLService.predict_creative_signals_sorted(texts, ["instagram", "google"], [None, None])
+    assert again == staged
+    assert usage["signal_cache_hits"] == 2 and usage["batches"] == 0
+
+
+def test_cached_response_matches_uncached_computation(creative):
+    req = request()
+    text = f"{req.title}. {req.description}. {req.cta}"
+    distilbert_score, boost = MLService.predict_creative_signals_batch([text], channels=[req.channel])[0]
+    expected = MLService.build_creative_response(req, distilbert_score, boost, model_version=creative.version)
+
+    response = score(req)
+    assert (response.scores, response.feedback, response.improvements) == \
+        (expected.scores, expected.feedback, expected.improvements)
+
+
+def test_cta_edit_reruns_only_the_combined_pass(creative):
+    score(request())
+    sequences, encoded = creative.backend.sequences, len(creative.embedder.encoded)
+    misses = ml_service.creative_signal_cache.stats()["misses"]
+
+    edited = score(request(cta="Buy today"))
+    assert creative.backend.sequences == sequences + 1
+    assert len(creative.embedder.encoded) == encoded + 1
+    assert ml_service.creative_signal_cache.stats()["misses"] == misses + 1
+    assert edited.scores["cta"] == 8.0
+
+
+def test_channel_change_runs_no_model(creative):
+    score(request())
+    sequences, encoded = creative.backend.sequences, len(creative.embedder.encoded)
+    response = score(request(channel="google"))
+    assert response.channel == "google"
+    assert (creative.backend.sequences, len(creative.embedder.encoded)) == (sequences, encoded)
+
+
+def test_batch_shares_one_pass_for_duplicate_texts(creative):
+    result = asyncio.run(MLService.score_creative_batch([request(), request(channel="facebook"), request(cta="Order")]))
+    assert [item.success for item in result.results] == [True, True, True]
+    assert result.stats["model_scored"] == 3
+    assert creative.backend.sequences == 2
+
+
+@pytest.fixture
+def near_duplicates(creative, monkeypatch):
+    """Near-duplicate index at the default distance"""
+    index = NearDuplicateIndex(max_distance=3, maxsize=100)
+    monkeypatch.setattr(ml_service, "creative_near_duplicates", index)
+    return index
+
+
+def test_simhash_ignores_case_punctuation_and_emoji():
+    assert simhash("Summer Sale on Wireless Headphones!") == simhash("summer sale on wireless headphones 🎧")
+    assert bin(simhash("Summer Sale on Wireless Headphones") ^ simhash("Winter Sale on Wireless Headphones")).count("1") > 3
+
+
+def test_near_duplicate_index_lookup_and_eviction():
+    index = NearDuplicateIndex(max_distance=3, maxsize=2)
+    index.set("scope", 0b1111, "a")
+    assert index.get("scope", 0b1110) == ("a", 1)
+    assert index.get("scope", 0b1111 ^ (0b1111 << 40)) is None
+    assert index.get("other", 0b1111) is None
+    index.set("scope", 1 << 63, "b")
+    index.set("scope", 1 << 30, "c")
+    assert len(index) == 2 and index.get("scope", 0b1111) is None
+    assert NearDuplicateIndex(max_distance=-1).get("scope", 0) is None
+
+
+def test_punctuation_variant_reuses_signals_as_approximate(creative, near_duplicates):
+    first = score(request())
+    sequences = creative.backend.sequences
+    variant_request = request(title="SUMMER SALE on wireless headphones!!! 🎧", cta="shop now")
+    variant = score(variant_request)
+    assert variant.approximate and variant.near_duplicate_distance == 0
+    assert creative.backend.sequences == sequences
+    # Text-dependent fields come from the variant's own text, not the indexed creative's
+    [(_, _, (distilbert_score, semantic_boost))] = near_duplicates.snapshot()
+    expected = MLService.build_creative_response(variant_request, distilbert_score, semantic_boost,
+                                                 model_version=creative.version)
+    assert (variant.scores, variant.feedback, variant.improvements) == \
+        (expected.scores, expected.feedback, expected.improvements)
+    assert variant.scores["final"] == first.scores["final"]
+    assert variant.scores["title"] != first.scores["title"] and variant.improvements != first.improvements
+
+
+def test_changed_word_and_full_precision_run_the_model(creative, near_duplicates):
+    score(request())
+    assert not score(request(title="Winter Sale on Wireless Headphones")).approximate
+    precise = score(request(title="Summer sale on wireless headphones!", full_precision=True))
+    assert not precise.approximate and precise.scorer == "model"
+
+
+def test_near_duplicate_index_persists(creative, near_duplicates, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "ML_CREATIVE_NEAR_DUP_PATH", str(tmp_path / "index.json"))
+    score(request())
+    ml_service.save_near_duplicate_index()
+    near_duplicates.clear()
+    ml_service.load_near_duplicate_index()
+    assert len(near_duplicates) == 1
+    ml_service.creative_cache.clear()
+    assert score(request(title="Summer sale on wireless headphones!")).approximate
+
+
+@pytest.fixture
+def cascade(creative, monkeypatch):
+    """Cascade scoring on with the default band and fresh stats"""
+    monkeypatch.setattr(settings, "ML_CREATIVE_CASCADE", True)
+    monkeypatch.setattr(settings, "ML_CREATIVE_CASCADE_LOW", 5.0)
+    monkeypatch.setattr(settings, "ML_CREATIVE_CASCADE_HIGH", 7.5)
+    monkeypatch.setattr(ml_service, "_cascade_stats", {key: 0 for key in ml_service._cascade_stats})
+    return creative
+
+
+# Rule scores: (10 + 10 + 8 + 7) / 4 = 8.75 and (1.5 + 1 + 5 + 7) / 4 = 3.6, both outside
+# the band; request() itself scores (7.5 + 5.5 + 8 + 7) / 4 = 7.0, inside it
+CONFIDENT = dict(title="Premium Wireless Headphones With Award Winning Crystal Clear Sound",
+                 description=" ".join(["Enjoy free shipping and easy returns on every order."] * 3), cta="Shop Now")
+WEAK = dict(title="Hi", description="ok", cta="Learn")
+
+
+def test_cascade_answers_outside_the_band_with_rules(cascade):
+    assert MLService.score_creative_rules(request()).scores["final"] == 7.0
+    assert score(request(**CONFIDENT)).scorer == "rules"
+    assert score(request(**WEAK)).scorer == "rules"
+    assert cascade.backend.sequences == 0
+
+    assert score(request()).scorer == "model"
+    assert cascade.backend.sequences == 1
+    stats = MLService.cascade_stats()
+    assert (stats["requests"], stats["resolved_by_rules"], stats["escalated_band"]) == (3, 2, 1)
+    assert stats["escalation_rate"] == round(1 / 3, 4)
+
+
+def test_full_precision_and_disabled_cascade_use_the_model(cascade, monkeypatch):
+    assert score(request(full_precision=True, **CONFIDENT)).scorer == "model"
+    assert MLService.cascade_stats()["escalated_full_precision"] == 1
+
+    monkeypatch.setattr(settings, "ML_CREATIVE_CASCADE", False)
+    ml_service.creative_cache.clear()
+    assert score(request(**CONFIDENT)).scorer == "model"
+    assert MLService.cascade_stats()["requests"] == 1
+
+
+def test_batch_sends_only_uncertain_creatives_to_the_model(cascade):
+    batch = [request(**CONFIDENT), request(), request(**WEAK), request(full_precision=True, **WEAK)]
+    result = asyncio.run(MLService.score_creative_batch(batch))
+    assert [item.result.scorer for item in result.results] == ["rules", "model", "rules", "model"]
+    assert result.stats["cascade_resolved"] == 2
+    assert cascade.backend.sequences == 2
+
+
+def test_phrase_bank_is_memory_mapped_after_the_first_build(tmp_path):
+    definitions = load_phrase_definitions(None)
+    first = PhraseBank.build(FakeEmbedder(), "fake", definitions, cache_dir=str(tmp_path))
+    assert first.describe() == {"default": {"phrases": 10, "source": "encoded"}}
+
+    embedder = FakeEmbedder()
+    second = PhraseBank.build(embedder, "fake", definitions, cache_dir=str(tmp_path))
+    assert second.describe()["default"]["source"] == "mmap" and embedder.encoded == []
+    np.testing.assert_array_equal(second.matrices["default"], first.matrices["default"])
+
+    changed = PhraseBank.build(embedder, "fake", {"default": ["free shipping"]}, cache_dir=str(tmp_path))
+    assert changed.describe()["default"]["source"] == "encoded" and embedder.encoded == ["free shipping"]
+
+
+def test_semantic_boost_matches_encoding_the_phrases_with_the_creative(creative):
+    text = "Summer sale. Free shipping. Shop now"
+    vectors = FakeEmbedder().encode([text] + load_phrase_definitions(None)["default"])
+    expected = float((vectors[1:] @ vectors[0]).max()) * 2
+    _, boost = MLService.predict_creative_signals(text, creative=creative, channel="instagram")
+    assert boost == pytest.approx(expected, abs=1e-6)
+    # Only the creative is encoded at scoring time
+    assert creative.embedder.encoded == [text]
+
+
+def test_channel_and_category_banks_apply_only_to_their_creatives(creative, tmp_path):
+    req = request()
+    text = f"{req.title}. {req.description}. {req.cta}"
+    path = tmp_path / "phrases.json"
+    path.write_text(json.dumps({"channels": {"TikTok": [text]}, "categories": {"audio": [text]}}))
+    definitions = load_phrase_definitions(str(path))
+    assert set(definitions) == {"default", "channel:tiktok", "category:audio"}
+    creative.phrase_bank = PhraseBank.build(creative.embedder, "fake", definitions)
+
+    default = MLService.predict_creative_signals(text, creative=creative, channel="instagram")[1]
+    assert MLService.predict_creative_signals(text, creative=creative, channel="tiktok")[1] == pytest.approx(2.0)
+    assert MLService.predict_creative_signals(text, creative=creative, category="Audio")[1] == pytest.approx(2.0)
+    assert default < 2.0
+    assert score(request(channel="tiktok")).scores["final"] > score(req).scores["final"]
+
+
+def test_unreadable_phrase_file_keeps_the_default_bank(tmp_path):
+    path = tmp_path / "phrases.json"
+    path.write_text("{not json")
+    assert list(load_phrase_definitions(str(path))) == ["default"]
+    assert list(load_phrase_definitions(str(tmp_path / "missing.json"))) == ["default"]
+
+
+def test_cache_key_normalizes_whitespace_and_channel_case(creative):
+    first = score(request())
+    sequences, hits = creative.backend.sequences, ml_service.creative_cache.stats()["hits"]
+    again = score(request(title="  Summer   Sale on Wireless Headphones ", channel="Instagram"))
+    assert creative.backend.sequences == sequences
+    assert ml_service.creative_cache.stats()["hits"] == hits + 1
+    assert again.scores == first.scores and again.channel == "Instagram"
+
+    # Text case is content, not formatting
+    score(request(title="SUMMER SALE ON WIRELESS HEADPHONES"))
+    assert creative.backend.sequences == sequences + 1
+
+
+def test_cache_is_scoped_to_the_model_version(creative):
+    score(request())
+    sequences = creative.backend.sequences
+    creative.version = "test-torch+retrained"
+    assert score(request()).model_version == "test-torch+retrained"
+    assert creative.backend.sequences == sequences + 1
+
+
+def test_fallback_scores_are_not_cached(creative, monkeypatch):
+    monkeypatch.setattr(ml_service, "ML_AVAILABLE", False)
+    assert score(request()).scorer == "rules"
+    assert ml_service.creative_cache.stats()["size"] == 0
+
+
+def test_creative_cache_persists_across_restarts(creative, monkeypatch, tmp_path):
+    path = tmp_path / "creative_cache.json"
+    monkeypatch.setattr(settings, "ML_CREATIVE_CACHE_PATH", str(path))
+    first = score(request())
+    ml_service.save_ml_caches()
+    ml_service.creative_cache.clear()
+    ml_service.creative_signal_cache.clear()
+
+    ml_service.load_ml_caches()
+    sequences = creative.backend.sequences
+    restored = score(request())
+    assert creative.backend.sequences == sequences
+    assert restored == first
+
+    # Entries whose wall-clock expiry has passed are dropped on load
+    entries = json.loads(path.read_text())
+    entries[0]["expires_at"] = 0
+    path.write_text(json.dumps(entries))
+    ml_service.creative_cache.clear()
+    ml_service.load_ml_caches()
+    assert ml_service.creative_cache.stats()["size"] == 0
+
+
+def words(n):
+    return " ".join(["word"] * n)
+
+
+def test_long_creatives_are_truncated_at_max_length(creative, monkeypatch):
+    monkeypatch.setattr(settings, "ML_CREATIVE_MAX_LENGTH", 8)
+    truncated = MLService.token_usage_stats()["truncated_sequences"]
+    signals, usage = MLService.predict_creative_signals_sorted([words(40), words(3)], [None, None], [None, None])
+    assert usage["tokens"] == 8 + 3
+    assert MLService.token_usage_stats()["truncated_sequences"] == truncated + 1
+    assert MLService.token_usage_stats()["max_length"] == 8
+    # Words past the limit do not change the score
+    assert signals[0][0] == MLService.predict_creative_signals_sorted([words(9)], [None], [None])[0][0][0]
+
+
+def test_length_buckets_pad_each_chunk_to_its_own_longest_item(creative):
+    texts = [words(60), words(4), words(20), words(5), words(30), words(3)]
+    _, usage = MLService.predict_creative_signals_sorted(texts, [None] * 6, [None] * 6, chunk_size=32)
+    # Buckets <=16, <=32 and <=64: (3, 4, 5), (20, 30), (60)
+    assert usage["batches"] == 3
+    assert usage["tokens"] == 122
+    assert usage["padded_tokens"] == (2 + 1) + 10 + 0
+    # One padded pass would have padded everything to 60 tokens
+    assert usage["padded_tokens"] < 60 * len(texts) - 122
+
+
+def test_batch_endpoint_reports_token_usage(creative):
+    result = asyncio.run(MLService.score_creative_batch([request(), request(title="Hi", description="Short.")]))
+    assert result.stats["model_scored"] == 2
+    assert result.stats["tokens"] > 0 and "padded_tokens" in result.stats
+    health = MLService.token_usage_stats()
+    assert health["tokens"] >= result.stats["tokens"]
+    assert health["length_buckets"] == ml_service.CREATIVE_LENGTH_BUCKETS
+
+
+def test_length_buckets_cover_every_index_once_shortest_first():
+    lengths = [70, 3, 40, 16, 17, 2, 64, 33, 5]
+    chunks = MLService.length_buckets(lengths, chunk_size=2)
+    assert sorted(i for chunk in chunks for i in chunk) == list(range(len(lengths)))
+    assert chunks == [[5, 1], [8, 3], [4], [7, 2], [6], [0]]
+    assert all(len(chunk) <= 2 for chunk in chunks)
+
+
+def test_sorted_signals_come_back_in_input_order(creative):
+    texts = [words(50), words(2), "Summer sale. Free shipping. Shop now", words(20), words(2), words(9)]
+    channels = ["tiktok", "google", "instagram", None, "facebook", "google"]
+    signals, usage = MLService.predict_creative_signals_sorted(texts, channels, [None] * 6, chunk_size=2)
+    assert usage["batches"] == 4
+    expected = [MLService.predict_creative_signals_batch([text], channels=[channel])[0]
+                for text, channel in zip(texts, channels)]
+    np.testing.assert_allclose(signals, expected)
+
+
+def test_batch_results_keep_request_order(creative):
+    batch = [request(description=words(40)), request(title="Hi"), {"title": "missing fields"},
+             request(cta="Order today", channel="google"), request()]
+    result = asyncio.run(MLService.score_creative_batch(batch))
+    assert [item.index for item in result.results] == [0, 1, 2, 3, 4]
+    assert [item.success for item in result.results] == [True, True, False, True, True]
+    assert [item.result.channel for item in result.results if item.success] == \
+        ["instagram", "instagram", "google", "instagram"]
+    for item, req in zip(result.results, batch):
+        if item.success:
+            assert item.result == score(req)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming CSV / NDJSON creative upload parser and endpoint
+"""
+import io
+import sys
+import os
+import json
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.services.creative_upload import detect_format, iter_upload_rows
+
+HEADER = "title,description,cta,channel\n"
+
+
+def parse(body: str, fmt: str = "csv"):
+    async def collect():
+        return [row async for row in iter_upload_rows(io.BytesIO(body.encode("utf-8")), fmt)]
+    return asyncio.run(collect())
+
+
+@pytest.fixture(scope="module")
+def client():
+    import main
+    return TestClient(main.app)
+
+
+def test_quoted_field_spanning_lines():
+    rows = parse(HEADER + '"Line one\nline two, with comma",d,Shop now,instagram\n')
+    assert rows == [(1, {"title": "Line one\nline two, with comma", "description": "d",
+                         "cta": "Shop now", "channel": "instagram"}, None)]
+
+
+def test_stray_quote_in_unquoted_field_is_literal():
+    rows = parse(HEADER + 'Big 5" TV deal,Huge screen,Shop now,instagram\nSecond,d,Buy,tiktok\nThird,d,Get,facebook\n')
+    assert [row[0] for row in rows] == [1, 2, 3]
+    assert rows[0][1]["title"] == 'Big 5" TV deal'
+    assert all(error is None for _, _, error in rows)
+
+
+def test_malformed_row_is_reported_and_parsing_continues():
+    rows = parse(HEADER + '"never closed,' + "x" * 200000 + "\nNext,d,Buy,tiktok\n")
+    assert rows[0][1] is None and "Malformed CSV row" in rows[0][2]
+    assert rows[-1][1] == {"title": "Next", "description": "d", "cta": "Buy", "channel": "tiktok"}
+
+
+def test_missing_column_and_extra_fields():
+    rows = parse("headline,body,callToAction,platform\nA,b,,tiktok\nA,b,c,tiktok,extra\n")
+    assert rows[0] == (1, None, "Missing 'cta'")
+    assert "fields" in rows[1][2]
+
+
+def test_ndjson_rows():
+    rows = parse('{"title":"A","description":"B","cta":"Shop","channel":"facebook"}\n[1]\n{bad\n\n', "ndjson")
+    assert rows[0][1]["title"] == "A"
+    assert rows[1] == (2, None, "Each line must be a JSON object")
+    assert rows[2][1] is None
+    assert len(rows) == 3
+
+
+def test_detect_format():
+    assert detect_format("text/csv") == "csv"
+    assert detect_format(None, filename="ads.jsonl") == "ndjson"
+    assert detect_format("application/octet-stream", requested="ndjson") == "ndjson"
+    with pytest.raises(ValueError):
+        detect_format("application/octet-stream")
+
+
+def test_upload_streams_rows_and_summary(client):
+    body = HEADER + 'Big 5" TV deal,Huge screen,Shop now,instagram\nbad,d,c,myspace\n'
+    response = client.post("/api/creative/score/upload", content=body.encode(),
+                           headers={"content-type": "text/csv"})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line.get("success") for line in lines[:2]] == [True, False]
+    assert lines[-1]["summary"]["rows"] == 2
+    assert lines[-1]["summary"]["scored"] == 1
+
+
+def test_upload_over_byte_limit_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(settings, "ML_CREATIVE_UPLOAD_MAX_BYTES", 16)
+    body = (HEADER + "A,b,Shop,instagram\n").encode()
+    assert client.post("/api/creative/score/upload", content=body,
+                       headers={"content-type": "text/csv"}).status_code == 413
+    assert client.post("/api/creative/score/upload",
+                       files={"file": ("ads.csv", body, "text/csv")}).status_code == 413
+
+
+def test_truncated_stream_closes_rows_and_spool():
+    from app.services.creative_service import CreativeService
+    body = HEADER + "".join(f"Title {i},Description {i},Shop now,instagram\n" for i in range(5))
+    spool = io.BytesIO(body.encode("utf-8"))
+
+    async def run():
+        chunks = [chunk async for chunk in CreativeService.score_creatives_stream(
+            iter_upload_rows(spool, "csv"), batch_size=2, max_rows=3)]
+        # Closed by the stream itself, not by the event loop shutting down leftover generators
+        return chunks, spool.closed
+
+    chunks, closed = asyncio.run(run())
+    lines = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [line["row"] for line in lines[:-1]] == [1, 2, 3]
+    assert lines[-1]["summary"]["truncated"] and lines[-1]["summary"]["rows"] == 3
+    assert closed
+
+
+def test_format_query_parameter(client):
+    body = b'{"title":"A","description":"B","cta":"Shop","channel":"facebook"}\n'
+    headers = {"content-type": "application/octet-stream"}
+    response = client.post("/api/creative/score/upload?format=ndjson", content=body, headers=headers)
+    assert response.status_code == 200
+    assert json.loads(response.text.splitlines()[-1])["summary"]["scored"] == 1
+    assert client.post("/api/creative/score/upload?format=xml", content=body, headers=headers).status_code == 400
+    assert client.post("/api/creative/score/upload", content=body, headers=headers).status_code == 400
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Parity tests for the compiled feature encoder against the model's feature order
+and the get_dummies + reindex encoding it replaced
+"""
+import sys
+import os
+import json
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.feature_encoder import CHANNELS, FeatureEncoder
+from app.services.ml_service import CampaignModelBundle
+
+MODELS_DIR = Path(os.path.dirname(os.path.abspath(__file__))) / "models"
+
+ROWS = [
+    # total_budget, split, aov, creative_quality, campaign_days, target_margin, age, gender, income_level
+    (10000, [2000, 3000, 1000, 2000, 1500, 500], 300, 0.8, 30, 0.25, 35, "all", "high"),
+    (5000, [0, 5000, 0, 0, 0, 0], 49.5, 0.3, 7, 0.1, 22, "woman", "low"),
+    (120000, [20000] * 6, 1200, 1.0, 90, 0.4, 58, "man", "all"),
+    # Unseen category values encode as all-zero one-hot slots
+    (8000, [1000, 1000, 2000, 2000, 1000, 1000], 80, 0.5, 14, 0.2, 41, "nonbinary", "medium"),
+    (0, [0] * 6, 100, 0.5, 30, 0.2, 30, "", "HIGH"),
+]
+
+
+def reference_row(feature_columns, total_budget, split, aov, creative_quality, campaign_days,
+                  target_margin, age, gender, income_level):
+    """The pandas encoding used before the compiled encoder"""
+    feat = {
+        **{f"budget_{ch}": value for ch, value in zip(CHANNELS, split)},
+        **{f"pct_{ch}": (value / total_budget if total_budget > 0 else 0.0) for ch, value in zip(CHANNELS, split)},
+        "total_budget": float(total_budget),
+        "aov": float(aov),
+        "creative_quality": float(creative_quality),
+        "campaign_days": int(campaign_days),
+        "target_margin": float(target_margin),
+        "age": int(age),
+        "gender": gender,
+        "income_level": income_level,
+    }
+    df = pd.get_dummies(pd.DataFrame([feat]), columns=["gender", "income_level"])
+    for col in feature_columns:
+        if col not in df.columns:
+            df[col] = 0
+    return df[feature_columns].astype(float)
+
+
+def encode(encoder, total_budget, split, *rest):
+    return encoder.encode(total_budget, np.array([split], dtype=float), *rest)
+
+
+@pytest.fixture(scope="module")
+def bundle():
+    return CampaignModelBundle.load(MODELS_DIR)
+
+
+def test_encoder_columns_match_model_feature_order(bundle):
+    with open(MODELS_DIR / "model_feature_columns_usd.json") as f:
+        feature_columns = json.load(f)
+    assert bundle.encoder.feature_columns == feature_columns == bundle.model.booster_.feature_name()
+    assert bundle.encoder.n_features == bundle.model.booster_.num_feature()
+
+
+@pytest.mark.parametrize("row", ROWS)
+def test_encoding_matches_get_dummies(bundle, row):
+    reference = reference_row(bundle.feature_columns, *row)
+    encoded = encode(bundle.encoder, *row)
+    np.testing.assert_array_equal(encoded, reference.to_numpy())
+    np.testing.assert_allclose(bundle.predict(encoded), bundle.model.predict(reference))
+
+
+def test_known_rows(bundle):
+    columns = bundle.feature_columns
+    encoded = encode(bundle.encoder, *ROWS[0])[0]
+    row = dict(zip(columns, encoded))
+    assert row["budget_google"] == 3000 and row["pct_google"] == 0.3 and row["pct_linkedin"] == 0.05
+    assert (row["total_budget"], row["aov"], row["age"], row["campaign_days"]) == (10000, 300, 35, 30)
+    assert [row[c] for c in columns if c.startswith("gender_")] == [1, 0, 0]
+    assert [row[c] for c in columns if c.startswith("income_level_")] == [0, 1, 0]
+
+    unseen = dict(zip(columns, encode(bundle.encoder, *ROWS[3])[0]))
+    assert not any(unseen[c] for c in columns if c.startswith(("gender_", "income_level_")))
+    assert unseen["age"] == 41 and unseen["pct_tiktok"] == 0.25
+
+
+def test_column_order_follows_feature_columns():
+    columns = ["gender_woman", "pct_google", "age", "budget_google", "income_level_low", "unused", "total_budget"]
+    encoder = FeatureEncoder(columns)
+    encoded = encode(encoder, *ROWS[1])
+    np.testing.assert_array_equal(encoded, [[1, 1, 22, 5000, 1, 0, 5000]])
+    np.testing.assert_array_equal(encoded, reference_row(columns, *ROWS[1]).to_numpy())
+
+
+def test_encoding_into_a_shared_buffer(bundle):
+    encoder = bundle.encoder
+    buffer = encoder.allocate(len(ROWS))
+    for i, row in enumerate(ROWS):
+        encoded = encoder.encode(row[0], np.array([row[1]], dtype=float), *row[2:], out=buffer[i:i + 1])
+        assert np.shares_memory(encoded, buffer)
+    expected = np.vstack([reference_row(bundle.feature_columns, *row).to_numpy() for row in ROWS])
+    np.testing.assert_array_equal(buffer, expected)
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Tests for the /health status on full and light (no torch) deployments
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+def state(value):
+    return {"state": value, "version": None, "load_seconds": None, "loading_for_seconds": None, "error": None}
+
+
+@pytest.mark.parametrize("states, status", [
+    ({"campaign": "ready", "creative": "ready"}, "healthy"),
+    ({"campaign": "ready", "creative": "unavailable"}, "healthy"),
+    ({"campaign": "ready", "creative": "loading"}, "degraded"),
+    ({"campaign": "failed", "creative": "unavailable"}, "degraded"),
+    ({"campaign": "unavailable", "creative": "unavailable"}, "degraded"),
+])
+def test_health_status(monkeypatch, states, status):
+    monkeypatch.setattr(main, "model_states", lambda: {name: state(value) for name, value in states.items()})
+    body = TestClient(main.app).get("/health").json()
+    assert body["status"] == status
+    assert body["services"]["ml_models"] == (status == "healthy")
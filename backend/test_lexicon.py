@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for the word-bounded keyword lexicon and the creative checks built on it
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.services.lexicon import Lexicon, creative_lexicon, trie_pattern
+from app.services.ml_service import MLService
+
+
+def test_trie_pattern_shares_prefixes():
+    assert trie_pattern(["sale", "save", "shop"]) == "s(?:a(?:le|ve)|hop)"
+    assert trie_pattern(["new", "news"]) == "new(?:s)?"
+
+
+@pytest.mark.parametrize("text, hits", [
+    ("Shop Now", ["shop", "now"]),
+    ("SHOP NOW!!!", ["shop", "now"]),
+    ("Know more", []),
+    ("Shopping for yourself", []),
+    ("Get started, it's free - save today", ["get", "free", "save", "today"]),
+    ("", []),
+    (None, []),
+])
+def test_scan_matches_whole_words_only(text, hits):
+    assert creative_lexicon.scan(text).hits == hits
+
+
+def test_counts_per_category():
+    match = creative_lexicon.scan("Free shipping, free returns: save now")
+    assert match.distinct("engagement") == 2 and match.occurrences("engagement") == 3
+    assert match.distinct("urgency") == 3
+    assert match.distinct("action") == 0 and match.distinct("cta_action") == 1
+
+
+def test_longer_entry_wins_over_its_prefix():
+    lexicon = Lexicon({"cta": ["sign", "sign up"]})
+    assert lexicon.scan("Sign up today").hits == ["sign up"]
+    assert lexicon.scan("Sign here").hits == ["sign"]
+
+
+@pytest.mark.parametrize("cta, score", [
+    ("Shop Now", 8.0),
+    ("Buy today", 8.0),
+    ("Act now", 8.0),
+    ("Get it", 8.0),
+    # Substring hits the old check counted
+    ("Know more", 6.0),
+    ("Shopping guide", 6.0),
+    ("Forget it", 6.0),
+    ("Country of origin", 6.0),
+    ("Learn more", 6.0),
+])
+def test_cta_action_check_uses_word_boundaries(cta, score):
+    assert MLService.creative_field_features("cta", cta, "instagram")["score"] == score
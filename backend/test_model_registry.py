@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for model hot reload, rollback and per-request version pinning
+"""
+import sys
+import os
+import asyncio
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from app.core.model_registry import ModelRegistry
+from app.models.types import MLCampaignOptimizationRequest, MLCreativeScoreRequest
+from app.services import ml_service
+from app.services.ml_service import MLService
+
+
+class FakeBundle:
+    def __init__(self, version):
+        self.version = version
+
+    def describe(self):
+        return {"version": self.version}
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = ModelRegistry(history_size=2)
+    monkeypatch.setattr(ml_service, "model_registry", registry)
+    return registry
+
+
+def loader(version):
+    return lambda: FakeBundle(version)
+
+
+def failing_loader():
+    raise FileNotFoundError("campaign_optimizer_usd.pkl is missing")
+
+
+def reload(loader_fn):
+    return asyncio.run(ml_service.reload_model("campaign", loader_fn))
+
+
+def test_successful_load_activates_new_version(registry):
+    assert reload(loader("v1")) == {"status": "activated", "version": "v1", "previous_version": None}
+    assert reload(loader("v2"))["previous_version"] == "v1"
+    assert registry.active("campaign").version == "v2"
+    status = registry.status()["campaign"]
+    assert status["state"] == "ready" and status["previous_versions"] == ["v1"]
+
+
+def test_failed_load_keeps_current_version(registry):
+    reload(loader("v1"))
+    outcome = reload(failing_loader)
+    assert outcome["status"] == "failed" and "missing" in outcome["error"]
+    assert registry.active("campaign").version == "v1"
+    status = registry.status()["campaign"]
+    assert status["state"] == "ready" and "missing" in status["last_error"] and not status["loading"]
+
+
+def test_failed_first_load_reports_failed(registry):
+    reload(failing_loader)
+    assert registry.active("campaign") is None
+    assert registry.state("campaign") == "failed"
+
+
+def test_overlapping_reload_is_busy(registry):
+    assert registry.begin_load("campaign")
+    assert reload(loader("v1"))["status"] == "busy"
+    registry.end_load("campaign")
+
+
+def test_rollback(registry):
+    with pytest.raises(LookupError):
+        ml_service.rollback_ml_model("campaign")
+    for version in ("v1", "v2", "v3"):
+        reload(loader(version))
+    assert ml_service.rollback_ml_model("campaign") == {"status": "activated", "version": "v2"}
+    assert ml_service.rollback_ml_model("campaign")["version"] == "v1"
+    with pytest.raises(LookupError):
+        ml_service.rollback_ml_model("campaign")
+
+
+def test_request_stays_pinned_during_swap(registry):
+    registry.activate("campaign", FakeBundle("v1"))
+    started, swapped = threading.Event(), threading.Event()
+
+    def job():
+        before = ml_service.current_campaign_model().version
+        started.set()
+        swapped.wait(5)
+        return before, ml_service.current_campaign_model().version
+
+    async def run():
+        task = asyncio.ensure_future(ml_service.run_inference(ml_service.tree_executor, job))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        registry.activate("campaign", FakeBundle("v2"))
+        swapped.set()
+        return await task
+
+    assert asyncio.run(run()) == ("v1", "v1")
+    assert ml_service.current_campaign_model().version == "v2"
+
+
+def test_fallback_responses_carry_rules_version(registry):
+    creative = asyncio.run(MLService._score_creative_content_fallback(
+        MLCreativeScoreRequest(title="Summer Sale", description="Free shipping.", cta="Shop Now", channel="instagram")
+    ))
+    campaign = asyncio.run(MLService._optimize_campaign_budget_fallback(MLCampaignOptimizationRequest(
+        total_budget=10000, aov=300, age=35, gender="all", income_level="high",
+        creative_quality=0.8, campaign_days=30, target_margin=0.25
+    )))
+    assert creative.model_version == campaign.model_version == ml_service.RULES_MODEL_VERSION
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the simplex samplers used by the campaign optimizer
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pytest
+
+from app.services.sampling import cube_to_simplex, sample_simplex, sobol_points
+
+
+def sorted_rows(points):
+    return points[np.lexsort(points.T[::-1])]
+
+
+@pytest.mark.parametrize("sampler", ["dirichlet", "sobol"])
+@pytest.mark.parametrize("parts", [1, 2, 6])
+def test_points_lie_on_the_simplex(sampler, parts):
+    points = sample_simplex(256, parts, np.random.RandomState(0), sampler=sampler)
+    assert points.shape == (256, parts)
+    assert np.all(points >= 0)
+    assert np.allclose(points.sum(axis=1), 1.0)
+
+
+@pytest.mark.parametrize("sampler", ["dirichlet", "sobol"])
+def test_same_seed_gives_same_points(sampler):
+    first = sample_simplex(64, 6, np.random.RandomState(7), sampler=sampler)
+    assert np.array_equal(first, sample_simplex(64, 6, np.random.RandomState(7), sampler=sampler))
+    assert not np.array_equal(first, sample_simplex(64, 6, np.random.RandomState(8), sampler=sampler))
+    generator = sample_simplex(64, 6, np.random.default_rng(7), sampler=sampler)
+    assert np.array_equal(generator, sample_simplex(64, 6, np.random.default_rng(7), sampler=sampler))
+
+
+def test_sampler_dispatch():
+    alpha = np.array([1.0, 2.0, 3.0])
+    assert np.array_equal(sample_simplex(10, 3, np.random.RandomState(1), alpha=alpha),
+                          np.random.RandomState(1).dirichlet(alpha, size=10))
+    assert np.array_equal(sample_simplex(10, 3, np.random.RandomState(1), sampler="sobol"),
+                          cube_to_simplex(sobol_points(10, 2, np.random.RandomState(1))))
+    assert sample_simplex(5, 0, np.random.RandomState(1)).shape == (5, 0)
+    with pytest.raises(ValueError):
+        sample_simplex(5, 3, np.random.RandomState(1), sampler="halton")
+
+
+def test_unscrambled_sobol_matches_reference_sequence():
+    qmc = pytest.importorskip("scipy.stats.qmc")
+    reference = qmc.Sobol(5, scramble=False).random(64)
+    assert np.allclose(sorted_rows(sobol_points(64, 5)), sorted_rows(reference), atol=1e-9)
+
+
+def test_scrambled_sobol_keeps_stratification():
+    unscrambled = sobol_points(64, 5)
+    for seed in range(3):
+        points = sobol_points(64, 5, np.random.RandomState(seed))
+        assert not np.allclose(sorted_rows(points), sorted_rows(unscrambled))
+        # Every 1-D projection has one point per 1/64 cell, and the first two
+        # dimensions one point per cell of an 8 x 8 grid
+        for j in range(5):
+            assert len(set((points[:, j] * 64).astype(int))) == 64
+        assert len(set(map(tuple, (points[:, :2] * 8).astype(int)))) == 64